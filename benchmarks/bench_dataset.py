@@ -0,0 +1,97 @@
+"""
+Benchmark for utils.task_dataset.TaskDataset, the engine behind the detail views.
+
+Builds a synthetic task workbook and times, without Qt, what a detail view
+does with it: the first load (parse + cache), a reload from the cache,
+filtering, sorting, a batch of row edits saved back to the workbook, and an
+export of the filtered rows. Afterwards it checks that the saved workbook
+reads back equal to the edited data.
+
+Usage:
+    python -m benchmarks.bench_dataset --rows 50000 --edits 20
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils.excel_cache as excel_cache
+from utils.excel_stream import write_excel_streaming
+from utils.task_dataset import TaskDataset
+
+UNITS = ["Phòng PV01", "Phòng PC02", "Công an quận 1", "Công an huyện Bình Chánh"]
+SURNAMES = ["Nguyễn", "Trần", "Lê", "Phạm", "Hoàng", "Đặng"]
+
+
+def build_workbook(path, rows, seed=0):
+    """Write a styled task workbook with names, years, scores and units."""
+    rng = random.Random(seed)
+    df = pd.DataFrame({
+        "Họ và tên": [f"{rng.choice(SURNAMES)} Văn {rng.randrange(rows)}" for _ in range(rows)],
+        "Năm sinh": [rng.randint(1960, 2000) for _ in range(rows)],
+        "Điểm": [round(rng.uniform(5, 10), 2) for _ in range(rows)],
+        "Đơn vị": [rng.choice(UNITS) for _ in range(rows)],
+    })
+    write_excel_streaming(path, list(df.columns), [df])
+
+
+def timed(label, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    print(f"{label:<32}{time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--edits", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Keep the benchmark's entries out of the application's cache
+        excel_cache.CACHE_DIR = os.path.join(tmp, "cache")
+        workbook = os.path.join(tmp, "bench.xlsx")
+        build_workbook(workbook, args.rows)
+        print(f"rows: {args.rows}, edits: {args.edits}")
+
+        dataset = TaskDataset(workbook)
+        timed("load (parse + cache)", dataset.load)
+        timed("load (cached)", dataset.load)
+
+        mask = timed("filter 'nguyễn'", dataset.filter, global_term="nguyễn")
+        timed("filter approximate 'tran van'", dataset.filter, global_term="tran van", approximate=True)
+        timed("filter column 'Đơn vị'", dataset.filter, column="Đơn vị", column_term="phòng")
+        positions = timed("sort filtered by 'Điểm'", dataset.positions, mask, sort_column=2, ascending=False)
+
+        rng = random.Random(1)
+
+        def edit_rows():
+            for _ in range(args.edits):
+                dataset.update_row(rng.randrange(dataset.row_count()), {1: str(rng.randint(1960, 2000))})
+            dataset.delete_row(0)
+
+        timed(f"{args.edits} edits + 1 delete", edit_rows)
+        expected = dataset.df.copy()
+        timed("save edits to workbook", dataset.save)
+
+        timed("export filtered (.xlsx)", dataset.export, os.path.join(tmp, "out.xlsx"), positions)
+        timed("export filtered (.csv)", dataset.export, os.path.join(tmp, "out.csv"), positions)
+
+        saved = pd.read_excel(workbook)
+
+    if not saved.equals(expected):
+        print("MISMATCH: saved workbook differs from the edited data")
+        return 1
+    print("saved workbook matches the edited data")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
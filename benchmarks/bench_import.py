@@ -0,0 +1,150 @@
+"""
+Benchmark for utils.excel_manager.import_excel_data.
+
+Builds a synthetic workbook, imports it into a throw-away SQLite database with
+the previous row-by-row implementation and with the current bulk one, checks
+that both produce the same people/awards and prints rows per second.
+
+Usage:
+    python -m benchmarks.bench_import --rows 20000 --award-columns 4
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import Base
+from models.task import Task
+from models.person import Person
+from models.award import Award
+from models.award_catalog import AwardCatalog
+from utils.excel_manager import import_excel_data, parse_award_text
+
+AWARD_TITLES = [
+    "Chiến sĩ thi đua cơ sở",
+    "Giấy khen",
+    "Bằng khen",
+    "Lao động tiên tiến",
+    "Chiến sĩ tiên tiến",
+]
+
+
+def legacy_import_excel_data(file_path, task, session):
+    """Row-by-row import as it was before the bulk engine (baseline)."""
+    df = pd.read_excel(file_path)
+    if df.empty:
+        return
+    name_column = df.columns[0]
+    for _, row in df.iterrows():
+        name = row[name_column]
+        if not pd.isna(name) and str(name).strip():
+            name = str(name).strip()
+            person = session.query(Person).filter(
+                Person.name == name,
+                Person.task_id == task.id
+            ).first()
+            if not person:
+                person = Person(name=name, task_id=task.id)
+                session.add(person)
+                session.flush()
+            for col in df.columns[1:]:
+                award_text = row[col]
+                if not pd.isna(award_text) and str(award_text).strip():
+                    award_name, award_year = parse_award_text(award_text)
+                    # Titles are looked up in the catalog the same row-by-row way
+                    title = session.query(AwardCatalog).filter(
+                        AwardCatalog.name == award_name, AwardCatalog.category == col
+                    ).first()
+                    if not title:
+                        title = AwardCatalog(name=award_name, category=col)
+                        session.add(title)
+                        session.flush()
+                    award = session.query(Award).filter(
+                        Award.catalog_id == title.id,
+                        Award.year == award_year,
+                        Award.person_id == person.id
+                    ).first()
+                    if not award:
+                        session.add(Award(catalog_id=title.id, year=award_year, person_id=person.id))
+
+
+def build_workbook(path, rows, award_columns, seed=0):
+    """Write a synthetic task workbook with duplicate names and empty cells."""
+    rng = random.Random(seed)
+    data = {"Họ và tên": [f"Nguyễn Văn {rng.randrange(rows // 2 or 1)}" for _ in range(rows)]}
+    for col in range(award_columns):
+        values = []
+        for _ in range(rows):
+            roll = rng.random()
+            if roll < 0.3:
+                values.append(None)
+            elif roll < 0.8:
+                values.append(f"{rng.choice(AWARD_TITLES)} ({rng.randint(2015, 2025)})")
+            else:
+                values.append(rng.choice(AWARD_TITLES))
+        data[f"Danh hiệu {col + 1}"] = values
+    pd.DataFrame(data).to_excel(path, index=False)
+
+
+def run_import(import_func, workbook, db_path):
+    """Import the workbook into a fresh database; return (seconds, snapshot)."""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    task = Task(name="Benchmark", year=2025, unit="Bench", excel_path=workbook,
+                created_at=datetime.now().date())
+    session.add(task)
+    session.commit()
+
+    start = time.perf_counter()
+    import_func(workbook, task, session)
+    session.commit()
+    elapsed = time.perf_counter() - start
+
+    snapshot = sorted(
+        session.query(Person.name, AwardCatalog.name, AwardCatalog.category, Award.year)
+        .join(Award, Award.person_id == Person.id)
+        .join(AwardCatalog, AwardCatalog.id == Award.catalog_id)
+        .all()
+    )
+    person_count = session.query(Person).count()
+    session.close()
+    engine.dispose()
+    return elapsed, (person_count, snapshot)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--award-columns", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workbook = os.path.join(tmp, "bench.xlsx")
+        build_workbook(workbook, args.rows, args.award_columns)
+
+        before, before_data = run_import(legacy_import_excel_data, workbook, os.path.join(tmp, "before.db"))
+        after, after_data = run_import(import_excel_data, workbook, os.path.join(tmp, "after.db"))
+
+    if before_data != after_data:
+        print("MISMATCH: bulk import produced different people/awards")
+        return 1
+
+    print(f"rows: {args.rows}, award columns: {args.award_columns}")
+    print(f"before (row-by-row): {before:8.2f}s  {args.rows / before:10.0f} rows/s")
+    print(f"after  (bulk):       {after:8.2f}s  {args.rows / after:10.0f} rows/s")
+    print(f"speed-up: {before / after:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
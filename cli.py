@@ -0,0 +1,557 @@
+"""
+Command-line interface for batch jobs, without the GUI.
+
+Runs the same merge, import and export code as the application against its
+database, so nightly jobs can process hundreds of tasks from a script:
+
+    python cli.py merge --all "inbox/{task_id}/*.xlsx" --json
+    python cli.py import --task 12 "archive/**/*.xlsx" --fuzzy-threshold 0.85
+    python cli.py export --year 2024 --output exports --format csv
+    python cli.py reindex --all --stale-only
+    python cli.py stats
+    python cli.py holders "Chiến sĩ thi đua" --year 2024
+    python cli.py person "nguyen van a"
+
+Tasks are chosen with --task (repeatable), --year or --all. Input patterns
+are globs ("**" recurses); "{task_id}" in a pattern is replaced by the id of
+each task. With --json every event is printed on stdout as one JSON object
+per line, and messages of the library code go to stderr.
+
+Exit status: 0 on success, 1 if a task or file failed, 2 for invalid
+arguments, 130 when interrupted. The first Ctrl+C stops at the next safe
+point (a running merge is rolled back), a second one aborts.
+
+PySide6 is never imported, and pandas/openpyxl only once a command needs
+them, so the interface starts quickly.
+"""
+import argparse
+import contextlib
+import glob
+import json
+import multiprocessing
+import os
+import re
+import signal
+import sys
+import threading
+import time
+from datetime import date
+
+EXIT_OK = 0
+EXIT_FAILED = 1
+EXIT_USAGE = 2
+EXIT_INTERRUPTED = 130
+
+EXPORT_CHOICES = ("xlsx", "csv", "parquet")
+
+# Set by the first Ctrl+C; commands stop at their next checkpoint
+_interrupted = threading.Event()
+
+
+class UsageError(Exception):
+    """Invalid arguments found after parsing, e.g. an unknown task id."""
+
+
+def _describe(event, fields):
+    """One line of text for an event (the output without --json)."""
+    subject = f"[task {fields['task']}] " if fields.get("task") is not None else ""
+    if event == "progress":
+        return f"{subject}{fields['stage']} {fields['done']}/{fields['total']}"
+    label = fields.get("status", event)
+    details = ", ".join(
+        f"{key}={value}" for key, value in fields.items()
+        if key not in ("task", "status") and value not in (None, [], "")
+    )
+    return f"{subject}{label}: {details}" if details else f"{subject}{label}"
+
+
+class Reporter:
+    """Writes the events of a command as text lines or JSON lines."""
+
+    def __init__(self, stream, json_lines=False):
+        self.stream = stream
+        self.json_lines = json_lines
+        # Outcomes reported through result()
+        self.counts = {"ok": 0, "failed": 0, "skipped": 0}
+
+    def emit(self, event, **fields):
+        if self.json_lines:
+            line = json.dumps({"event": event, **fields}, ensure_ascii=False, default=str)
+        else:
+            line = _describe(event, fields)
+        self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def result(self, status, **fields):
+        """Report the outcome of one task or file: "ok", "failed" or "skipped"."""
+        self.counts[status] += 1
+        self.emit("result", status=status, **fields)
+
+    def progress(self, stage, done, total, task=None):
+        self.emit("progress", task=task, stage=stage, done=done, total=total)
+
+
+def expand_inputs(patterns, task_id=None):
+    """
+    Files matching glob patterns, in order and without duplicates.
+
+    Args:
+        patterns: Glob patterns; "{task_id}" is replaced by task_id first
+        task_id: Task the files are collected for
+
+    Returns:
+        Absolute paths; directories and Excel lock files (~$name.xlsx) are left out
+    """
+    files = {}
+    for pattern in patterns:
+        if task_id is not None:
+            pattern = pattern.replace("{task_id}", str(task_id))
+        for path in sorted(glob.glob(os.path.expanduser(pattern), recursive=True)):
+            if os.path.isfile(path) and not os.path.basename(path).startswith("~$"):
+                files.setdefault(os.path.abspath(path), None)
+    return list(files)
+
+
+def _select_tasks(session, args, default_all=False):
+    """
+    (id, name, year, unit, excel_path, rows_source_hash) rows of the chosen tasks.
+
+    Plain rows rather than Task objects, so they stay usable after the
+    session is closed.
+    """
+    from models.task import Task
+
+    query = session.query(
+        Task.id, Task.name, Task.year, Task.unit, Task.excel_path, Task.rows_source_hash
+    )
+    if args.task:
+        found = {task.id: task for task in query.filter(Task.id.in_(args.task))}
+        missing = [task_id for task_id in args.task if task_id not in found]
+        if missing:
+            raise UsageError("Unknown task id: " + ", ".join(str(task_id) for task_id in missing))
+        return [found[task_id] for task_id in dict.fromkeys(args.task)]
+    if args.year is not None:
+        query = query.filter(Task.year == args.year)
+    elif not (args.all or default_all):
+        raise UsageError("Choose the tasks with --task, --year or --all")
+    return query.order_by(Task.id).all()
+
+
+def _collect_inputs(tasks, patterns):
+    """Pair each task with its input files; fails if no pattern matches anything."""
+    jobs = [(task, expand_inputs(patterns, task.id)) for task in tasks]
+    if not any(files for _, files in jobs):
+        raise UsageError("No file matches " + " ".join(patterns))
+    return jobs
+
+
+def cmd_merge(args, reporter):
+    """Merge new input files into each task's workbook and import their rows."""
+    from database.db_manager import session_scope
+    from models.task import Task
+    from utils.excel_manager import MergeCancelled, merge_incremental
+
+    with session_scope() as session:
+        tasks = _select_tasks(session, args)
+    for task, files in _collect_inputs(tasks, args.inputs):
+        if _interrupted.is_set():
+            return
+        if not files:
+            reporter.result("skipped", task=task.id, reason="no input files")
+            continue
+
+        reporter.emit("start", task=task.id, name=task.name, files=len(files))
+        try:
+            with session_scope() as session:
+                result = merge_incremental(
+                    session.get(Task, task.id), files, session,
+                    progress=lambda stage, done, total, task_id=task.id:
+                        reporter.progress(stage, done, total, task=task_id),
+                    is_cancelled=_interrupted.is_set
+                )
+        except MergeCancelled:
+            reporter.result("skipped", task=task.id, reason="interrupted, rolled back")
+            return
+        except Exception as e:
+            reporter.result("failed", task=task.id, error=str(e))
+            continue
+
+        # Files that could not be read fail the task; the others stay merged
+        reporter.result(
+            "failed" if result["failed"] else "ok", task=task.id,
+            merged=len(result["merged"]), already_merged=len(result["skipped"]), rows=result["rows"],
+            errors=[f"{file}: {error}" for file, error in result["failed"]]
+        )
+
+
+def cmd_import(args, reporter):
+    """Import people and awards from input files into each task, one file per transaction."""
+    from database.db_manager import session_scope
+    from models.task import Task
+    from utils.excel_manager import import_excel_data
+
+    with session_scope() as session:
+        tasks = _select_tasks(session, args)
+    for task, files in _collect_inputs(tasks, args.inputs):
+        if not files:
+            reporter.result("skipped", task=task.id, reason="no input files")
+            continue
+        for done, file in enumerate(files):
+            if _interrupted.is_set():
+                return
+            try:
+                with session_scope() as session:
+                    import_excel_data(
+                        file, session.get(Task, task.id), session,
+                        chunk_size=args.chunk_size, fuzzy_threshold=args.fuzzy_threshold
+                    )
+            except Exception as e:
+                reporter.result("failed", task=task.id, file=file, error=str(e))
+            else:
+                reporter.result("ok", task=task.id, file=file)
+            reporter.progress("import", done + 1, len(files), task=task.id)
+
+
+def _export_path(output_dir, task, file_format):
+    safe_name = re.sub(r'[^\w\s-]', '', task.name).strip().replace(' ', '_')
+    return os.path.join(output_dir, f"{task.id}_{safe_name}.{file_format}")
+
+
+def _export_task(task_id, excel_path, file_path, search, db_path=None):
+    """Export the rows of one task; module-level so it can run in a worker process."""
+    from database.db_manager import configure_engine
+    from utils.task_dataset import TaskDataset
+
+    if db_path is not None:
+        configure_engine(db_path)
+    dataset = TaskDataset(excel_path, task_id)
+    dataset.load()
+    positions = None
+    if search:
+        positions = dataset.positions(dataset.filter(global_term=search, approximate=True))
+    return dataset.export(file_path, positions)
+
+
+def cmd_export(args, reporter):
+    """Write the rows of each task (optionally only those matching --search) to a file."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    from database import db_manager
+    from utils.data_export import parquet_available
+
+    if args.format == "parquet" and not parquet_available():
+        raise UsageError("Parquet export needs pyarrow or fastparquet")
+
+    with db_manager.session_scope() as session:
+        tasks = _select_tasks(session, args)
+    os.makedirs(args.output, exist_ok=True)
+    jobs = [
+        (task, (task.id, task.excel_path, _export_path(args.output, task, args.format), args.search, args.db))
+        for task in tasks
+    ]
+
+    def report(task, file_path, rows=None, error=None):
+        if error is None:
+            reporter.result("ok", task=task.id, file=file_path, rows=rows)
+        else:
+            reporter.result("failed", task=task.id, file=file_path, error=str(error))
+
+    workers = min(args.workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for task, job in jobs:
+            if _interrupted.is_set():
+                return
+            try:
+                report(task, job[2], rows=_export_task(*job))
+            except Exception as e:
+                report(task, job[2], error=e)
+        return
+
+    # Worker processes open their own connections; none may be inherited
+    db_manager.engine.dispose()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [(task, job[2], executor.submit(_export_task, *job)) for task, job in jobs]
+        for task, file_path, future in futures:
+            if _interrupted.is_set():
+                for _, _, pending in futures:
+                    pending.cancel()
+                return
+            try:
+                report(task, file_path, rows=future.result())
+            except Exception as e:
+                report(task, file_path, error=e)
+
+
+def cmd_reindex(args, reporter):
+    """
+    Rebuild what the database derives from the task workbooks.
+
+    Each workbook is streamed again in chunks to rebuild the task's row
+    store and, unless --rows-only, to re-import its people and awards, so
+    memory use does not grow with the workbook; finally the task search
+    index (FTS) is rebuilt.
+    """
+    import pandas as pd
+
+    from database import db_manager
+    from database.fts import create_task_fts
+    from database.task_rows import append_rows, store_rows
+    from models.task import Task
+    from utils.excel_cache import file_fingerprint
+    from utils.excel_manager import IMPORT_BATCH_ROWS, import_dataframe
+    from utils.excel_stream import iter_excel_chunks, read_excel_header
+
+    with db_manager.session_scope() as session:
+        tasks = _select_tasks(session, args)
+
+    pending = []
+    for task in tasks:
+        if not os.path.exists(task.excel_path):
+            reporter.result("failed", task=task.id, error=f"File not found: {task.excel_path}")
+            continue
+        # Hashed before parsing: if the file changes meanwhile the store reads as stale
+        content_hash = file_fingerprint(task.excel_path)[3]
+        if args.stale_only and task.rows_source_hash == content_hash:
+            reporter.result("skipped", task=task.id, reason="row store is current")
+            continue
+        pending.append((task, content_hash))
+
+    for done, (task, content_hash) in enumerate(pending, start=1):
+        if _interrupted.is_set():
+            return
+        rows = 0
+        try:
+            with db_manager.session_scope() as session:
+                stored_task = session.get(Task, task.id)
+                for chunk in iter_excel_chunks(task.excel_path, IMPORT_BATCH_ROWS):
+                    if rows:
+                        append_rows(session, task.id, chunk, content_hash)
+                    else:
+                        store_rows(session, task.id, chunk, content_hash)
+                    if not args.rows_only:
+                        import_dataframe(chunk, stored_task, session)
+                    rows += len(chunk)
+                if not rows:
+                    store_rows(session, task.id, pd.DataFrame(columns=read_excel_header(task.excel_path)), content_hash)
+        except Exception as e:
+            reporter.result("failed", task=task.id, error=str(e))
+        else:
+            reporter.result("ok", task=task.id, rows=rows)
+        reporter.progress("reindex", done, len(pending))
+
+    if _interrupted.is_set():
+        return
+    with db_manager.engine.begin() as connection:
+        reporter.emit("fts", available=create_task_fts(connection))
+
+
+def _row_store_state(task):
+    from utils.excel_cache import file_fingerprint
+
+    if not os.path.exists(task.excel_path):
+        return "missing workbook"
+    if task.rows_source_hash is None:
+        return "empty"
+    return "current" if task.rows_source_hash == file_fingerprint(task.excel_path)[3] else "stale"
+
+
+def cmd_stats(args, reporter):
+    """Print row, people and award counts per task and for the whole database."""
+    from sqlalchemy import func
+
+    from database import db_manager
+    from database.fts import task_fts_available
+    from models.award import Award
+    from models.award_catalog import AwardCatalog
+    from models.merge_ledger import MergeLedgerEntry
+    from models.person import Person
+    from models.person_identity import PersonIdentity
+    from models.task_row import TaskRow
+
+    with db_manager.session_scope() as session:
+        tasks = _select_tasks(session, args, default_all=True)
+        people = dict(session.query(Person.task_id, func.count(Person.id)).group_by(Person.task_id))
+        awards = dict(
+            session.query(Person.task_id, func.count(Award.id))
+            .join(Award, Award.person_id == Person.id).group_by(Person.task_id)
+        )
+        rows = dict(session.query(TaskRow.task_id, func.count(TaskRow.id)).group_by(TaskRow.task_id))
+        merged = dict(
+            session.query(MergeLedgerEntry.task_id, func.count(MergeLedgerEntry.id))
+            .group_by(MergeLedgerEntry.task_id)
+        )
+        identities = session.query(func.count(PersonIdentity.id)).scalar()
+        titles = session.query(func.count(AwardCatalog.id)).scalar()
+        fts = task_fts_available(session)
+
+    for task in tasks:
+        reporter.emit(
+            "task", task=task.id, name=task.name, year=task.year, unit=task.unit,
+            rows=rows.get(task.id, 0), row_store=_row_store_state(task),
+            people=people.get(task.id, 0), awards=awards.get(task.id, 0),
+            merged_files=merged.get(task.id, 0)
+        )
+    reporter.emit(
+        "totals", database=db_manager.engine.url.database, tasks=len(tasks),
+        rows=sum(rows.get(task.id, 0) for task in tasks),
+        people=sum(people.get(task.id, 0) for task in tasks),
+        awards=sum(awards.get(task.id, 0) for task in tasks),
+        identities=identities, award_titles=titles, fts=fts
+    )
+
+
+def cmd_holders(args, reporter):
+    """List the people holding an award, optionally in one year."""
+    from database.award_catalog import award_holders
+    from database.db_manager import session_scope
+
+    with session_scope() as session:
+        for person, year in award_holders(session, args.award, args.year, args.category):
+            reporter.emit("holder", task=person.task_id, name=person.name, year=year)
+
+
+def cmd_person(args, reporter):
+    """List every award of a person over all tasks, whatever the spelling of the name."""
+    from database.db_manager import session_scope
+    from database.person_registry import find_identities, person_awards
+
+    with session_scope() as session:
+        identities = find_identities(session, args.name, args.unit, args.birth_date)
+        if not identities:
+            raise UsageError(f"No person named {args.name}")
+        rows = person_awards(session, [identity.id for identity in identities])
+        for task, name, award, category, year in rows:
+            reporter.emit(
+                "award", task=task.id, task_name=task.name, name=name,
+                award=award, category=category, year=year
+            )
+
+
+def _positive_int(text):
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1: {text}")
+    return value
+
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--db", help="SQLite database file (default: the application's data.db)")
+    common.add_argument("--json", action="store_true", help="print events as JSON lines on stdout")
+
+    tasks = argparse.ArgumentParser(add_help=False)
+    tasks.add_argument("--task", type=int, action="append", metavar="ID",
+                       help="task id; repeat for several tasks")
+    tasks.add_argument("--year", type=int, help="every task of a year")
+    tasks.add_argument("--all", action="store_true", help="every task")
+
+    workers = argparse.ArgumentParser(add_help=False)
+    workers.add_argument("--workers", type=_positive_int,
+                         help="worker processes for exporting (default: CPU count)")
+
+    parser = argparse.ArgumentParser(
+        prog="cli.py", description=__doc__.strip().splitlines()[0],
+        epilog="Exit status: 0 success, 1 a task or file failed, 2 invalid arguments, 130 interrupted."
+    )
+    commands = parser.add_subparsers(dest="command", required=True, metavar="COMMAND")
+
+    merge = commands.add_parser("merge", parents=[common, tasks], help=cmd_merge.__doc__)
+    merge.add_argument("inputs", nargs="+", metavar="PATTERN", help="input files or globs")
+    merge.set_defaults(handler=cmd_merge)
+
+    import_ = commands.add_parser("import", parents=[common, tasks], help=cmd_import.__doc__)
+    import_.add_argument("inputs", nargs="+", metavar="PATTERN", help="input files or globs")
+    import_.add_argument("--chunk-size", type=_positive_int,
+                         help="stream each sheet in chunks of this many rows")
+    import_.add_argument("--fuzzy-threshold", type=float,
+                         help="join unmatched names to the most similar person (0..1)")
+    import_.set_defaults(handler=cmd_import)
+
+    export = commands.add_parser("export", parents=[common, tasks, workers], help=cmd_export.__doc__)
+    export.add_argument("--output", required=True, metavar="DIR",
+                        help="directory receiving one <id>_<name> file per task")
+    export.add_argument("--format", choices=EXPORT_CHOICES, default="xlsx")
+    export.add_argument("--search", help="only rows containing this text (accents and case ignored)")
+    export.set_defaults(handler=cmd_export)
+
+    reindex = commands.add_parser(
+        "reindex", parents=[common, tasks],
+        help="Rebuild row stores, people, awards and the task search index."
+    )
+    reindex.add_argument("--stale-only", action="store_true",
+                         help="skip tasks whose row store matches the workbook")
+    reindex.add_argument("--rows-only", action="store_true",
+                         help="rebuild the row stores without re-importing people and awards")
+    reindex.set_defaults(handler=cmd_reindex)
+
+    stats = commands.add_parser("stats", parents=[common, tasks], help=cmd_stats.__doc__)
+    stats.set_defaults(handler=cmd_stats)
+
+    holders = commands.add_parser("holders", parents=[common], help=cmd_holders.__doc__)
+    holders.add_argument("award", help="award title as stored, e.g. \"Giấy khen\"")
+    holders.add_argument("--year", type=int, help="only awards of this year")
+    holders.add_argument("--category", help="only awards read from this column header")
+    holders.set_defaults(handler=cmd_holders)
+
+    person = commands.add_parser("person", parents=[common], help=cmd_person.__doc__)
+    person.add_argument("name", help="name in any spelling (accents and case ignored)")
+    person.add_argument("--unit", help="only the identity registered with this unit")
+    person.add_argument("--birth-date", type=date.fromisoformat, metavar="YYYY-MM-DD",
+                        help="only the identity registered with this date of birth")
+    person.set_defaults(handler=cmd_person)
+    return parser
+
+
+def _open_database(db_path):
+    from database import db_manager
+
+    if db_path is not None:
+        db_path = os.path.abspath(db_path)
+        if not os.path.exists(db_path):
+            raise UsageError(f"Database not found: {db_path}")
+        db_manager.configure_engine(db_path)
+    db_manager.init_db()
+    return db_path
+
+
+def _on_interrupt(signum, frame):
+    if _interrupted.is_set():
+        raise KeyboardInterrupt
+    _interrupted.set()
+    print("Stopping after the current step (Ctrl+C again to abort)", file=sys.stderr)
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    reporter = Reporter(sys.stdout, json_lines=args.json)
+    previous_handler = signal.signal(signal.SIGINT, _on_interrupt)
+    start = time.perf_counter()
+    try:
+        # stdout carries only the events; progress prints of the library go to stderr
+        with contextlib.redirect_stdout(sys.stderr):
+            args.db = _open_database(args.db)
+            args.handler(args, reporter)
+    except UsageError as e:
+        reporter.emit("error", error=str(e))
+        return EXIT_USAGE
+    except KeyboardInterrupt:
+        _interrupted.set()
+    except Exception as e:
+        reporter.emit("error", error=str(e))
+        return EXIT_FAILED
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    reporter.emit(
+        "summary", command=args.command, seconds=round(time.perf_counter() - start, 3),
+        interrupted=_interrupted.is_set(), **reporter.counts
+    )
+    if _interrupted.is_set():
+        return EXIT_INTERRUPTED
+    return EXIT_FAILED if reporter.counts["failed"] else EXIT_OK
+
+
+if __name__ == "__main__":
+    # Required for the worker processes in frozen builds
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -0,0 +1,78 @@
+"""
+Dictionary encoding of award titles.
+
+Every distinct (title, column header) pair is stored once in award_catalog
+and awards reference it by integer id, so the repeated titles of large imports cost one integer per
+award and "who holds award X" is an indexed lookup on (catalog_id, year).
+"""
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.db_manager import IN_BATCH
+from models.award_catalog import AwardCatalog
+from models.award import Award
+from models.person import Person
+
+
+def catalog_ids(session, titles):
+    """
+    Return catalog ids for award titles, adding the titles not seen before.
+    
+    Args:
+        session: Database session
+        titles: Iterable of (name, category) pairs; the category is the
+            column header the title was read from
+        
+    Returns:
+        Dict mapping each (name, category) pair to its catalog id
+    """
+    pairs = list(dict.fromkeys(titles))
+    if not pairs:
+        return {}
+    
+    session.execute(
+        sqlite_insert(AwardCatalog).on_conflict_do_nothing(index_elements=["name", "category"]),
+        [{"name": name, "category": str(category)} for name, category in pairs]
+    )
+    
+    names = list(dict.fromkeys(name for name, _ in pairs))
+    ids = {}
+    for start in range(0, len(names), IN_BATCH):
+        batch = names[start:start + IN_BATCH]
+        for name, category, catalog_id in (
+            session.query(AwardCatalog.name, AwardCatalog.category, AwardCatalog.id)
+            .filter(AwardCatalog.name.in_(batch))
+        ):
+            ids[(name, category)] = catalog_id
+    return {(name, category): ids[(name, str(category))] for name, category in pairs}
+
+
+def award_holders(session, award_name, year=None, category=None):
+    """
+    Query the people holding an award, optionally in one year.
+    
+    The title is resolved to its catalog ids first (one per column header it
+    was imported under), so the scan over awards uses the integer index on
+    (catalog_id, year).
+    
+    Args:
+        session: Database session
+        award_name: Award title
+        year: Optional award year
+        category: Optional column header; all headers if None
+    
+    Returns:
+        Query of distinct (Person, year) rows; empty if the title is not in
+        the catalog
+    """
+    catalog = session.query(AwardCatalog.id).filter(AwardCatalog.name == award_name)
+    if category is not None:
+        catalog = catalog.filter(AwardCatalog.category == category)
+    catalog_ids = [catalog_id for (catalog_id,) in catalog]
+    query = session.query(Person, Award.year).join(Award, Award.person_id == Person.id)
+    if not catalog_ids:
+        return query.filter(False)
+    
+    query = query.filter(Award.catalog_id.in_(catalog_ids)).distinct()
+    if year is not None:
+        query = query.filter(Award.year == year)
+    return query.order_by(Award.year, Person.name)
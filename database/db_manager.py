@@ -1,6 +1,9 @@
 import os
 import sqlite3
-from sqlalchemy import create_engine, Column, Integer, String, Text, Date, ForeignKey
+import threading
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Date, ForeignKey
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
@@ -8,11 +11,81 @@ from sqlalchemy.orm import sessionmaker, relationship
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_PATH = os.path.join(BASE_DIR, 'data.db')
 
+# SQLite performance profile, applied to every new connection.
+# WAL lets the GUI keep reading while a background import writes, NORMAL
+# synchronous is durable in WAL mode, and busy_timeout makes a connection wait
+# for a writer instead of failing with "database is locked".
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -65536,        # negative = KiB, i.e. 64 MB page cache
+    'mmap_size': 268435456,      # 256 MB memory-mapped I/O
+    'temp_store': 'MEMORY',
+    'busy_timeout': 30000,       # milliseconds
+}
+
+# Connection pool shared by the GUI thread and background workers
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
+# Bound parameters per IN query (SQLite's default limit is 999)
+IN_BATCH = 900
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas):
+    """Run PRAGMA statements on a raw DB-API connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+def create_db_engine(db_path=DB_PATH, pragmas=None, echo=False):
+    """
+    Create an engine for a SQLite file with the performance profile applied.
+    
+    Args:
+        db_path: Path to the SQLite database file
+        pragmas: PRAGMA name -> value overrides merged over SQLITE_PRAGMAS
+        echo: Log SQL statements
+    """
+    profile = dict(SQLITE_PRAGMAS)
+    if pragmas:
+        profile.update(pragmas)
+    
+    # Pooled connections may be handed to any thread (one at a time), so the
+    # sqlite3 same-thread check is disabled; the pool does the serialization
+    new_engine = create_engine(
+        f'sqlite:///{db_path}',
+        echo=echo,
+        poolclass=QueuePool,
+        pool_size=POOL_SIZE,
+        max_overflow=MAX_OVERFLOW,
+        connect_args={
+            'check_same_thread': False,
+            'timeout': profile.get('busy_timeout', 30000) / 1000,
+        },
+    )
+    
+    @event.listens_for(new_engine, 'connect')
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, profile)
+    
+    return new_engine
+
 # Create SQLAlchemy engine and session
-engine = create_engine(f'sqlite:///{DB_PATH}', echo=False)
+engine = create_db_engine(DB_PATH)
 Session = sessionmaker(bind=engine)
 Base = declarative_base()
 
+def configure_engine(db_path=DB_PATH, pragmas=None):
+    """Point the shared engine and Session at another database file or profile."""
+    global engine
+    engine.dispose()
+    engine = create_db_engine(db_path, pragmas)
+    Session.configure(bind=engine)
+    return engine
+
 def init_db():
     """Initialize the database by creating all tables."""
     # Create directory for database if it doesn't exist
@@ -20,14 +93,58 @@ def init_db():
     
     # Import models to ensure they are registered with Base
     from models.task import Task
+    from models.person_identity import PersonIdentity
     from models.person import Person
+    from models.award_catalog import AwardCatalog
     from models.award import Award
+    from models.merge_ledger import MergeLedgerEntry
+    from models.task_row import TaskColumn, TaskRow
     
     # Create all tables
     Base.metadata.create_all(engine)
     
+    # Upgrade databases created by older versions in place
+    from database.migrations import upgrade_db
+    upgrade_db(engine)
+    
     return engine
 
+# Engine that init_db() last ran on (see ensure_db)
+_initialized_engine = None
+# Serializes ensure_db(): the GUI warms the database up on a pool thread
+_init_lock = threading.Lock()
+
+def ensure_db():
+    """
+    Run init_db() unless it already ran on the current engine.
+    
+    Safe to call from several threads; a caller arriving while another
+    thread initializes waits for it instead of migrating a second time.
+    """
+    global _initialized_engine
+    with _init_lock:
+        if _initialized_engine is not engine:
+            _initialized_engine = init_db()
+        return engine
+
 def get_session():
     """Get a new database session."""
     return Session()
+
+@contextmanager
+def session_scope():
+    """
+    Provide a session that commits on success and rolls back on error.
+    
+    Each thread should use its own session; background workers can open one
+    with this helper while the GUI keeps using get_session().
+    """
+    session = Session()
+    try:
+        yield session
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    finally:
+        session.close()
@@ -0,0 +1,128 @@
+"""
+FTS5 full-text index over tasks (name, unit, description).
+
+The index lives in the tasks_fts virtual table, keyed by task id and kept in
+sync by triggers. Matching ignores case and diacritics: the unicode61
+tokenizer folds accents, and "đ"/"Đ", which Unicode does not decompose, is
+replaced by "d" in the triggers and in queries. So "cong an" finds "Công an"
+and "dong nai" finds "Đồng Nai".
+"""
+import re
+
+from sqlalchemy import Float, Integer, text
+from sqlalchemy.exc import OperationalError
+
+FTS_TABLE = 'tasks_fts'
+
+# Column weights for bm25: a hit in the name counts most, then unit
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+
+def _fold_sql(expression):
+    """SQL expression replacing đ/Đ, which unicode61 cannot fold by itself."""
+    return f"replace(replace(coalesce({expression}, ''), 'đ', 'd'), 'Đ', 'D')"
+
+
+def _insert_sql(prefix):
+    return (
+        f"INSERT INTO {FTS_TABLE}(rowid, name, unit, description) VALUES ("
+        f"{prefix}.id, {_fold_sql(prefix + '.name')}, {_fold_sql(prefix + '.unit')}, "
+        f"{_fold_sql(prefix + '.description')});"
+    )
+
+
+def create_task_fts(connection):
+    """
+    Create the FTS table and its triggers and index existing tasks.
+
+    Args:
+        connection: SQLAlchemy connection inside a transaction
+
+    Returns:
+        True if the index exists afterwards, False if this SQLite build has no FTS5
+    """
+    try:
+        connection.execute(text(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+            "name, unit, description, tokenize='unicode61 remove_diacritics 2')"
+        ))
+    except OperationalError:
+        return False
+
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ai AFTER INSERT ON tasks BEGIN
+            {_insert_sql('new')}
+        END
+    """))
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_ad AFTER DELETE ON tasks BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+        END
+    """))
+    create_update_trigger(connection)
+
+    # Index the tasks that existed before the table
+    connection.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    connection.execute(text(
+        f"INSERT INTO {FTS_TABLE}(rowid, name, unit, description) "
+        f"SELECT id, {_fold_sql('name')}, {_fold_sql('unit')}, {_fold_sql('description')} FROM tasks"
+    ))
+    return True
+
+
+def create_update_trigger(connection):
+    """
+    Create the trigger re-indexing a task when an indexed column changes.
+
+    It only fires on updates of name, unit or description, so bookkeeping
+    writes to tasks (e.g. rows_source_hash on every merge) leave the index alone.
+    """
+    connection.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS tasks_fts_au AFTER UPDATE OF name, unit, description ON tasks BEGIN
+            DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+            {_insert_sql('new')}
+        END
+    """))
+
+
+def task_fts_available(session):
+    """Check whether the database has the tasks FTS index."""
+    try:
+        return session.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": FTS_TABLE}
+        ).first() is not None
+    except OperationalError:
+        return False
+
+
+def build_fts_query(search_term):
+    """
+    Turn free text into an FTS5 query: every word must match as a prefix.
+
+    Returns:
+        The MATCH expression, or None if the text has no searchable words
+    """
+    folded = search_term.replace('đ', 'd').replace('Đ', 'D')
+    words = re.findall(r'\w+', folded)
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def task_search_subquery(search_term):
+    """
+    Selectable of (task_id, rank) for tasks matching the search term.
+
+    Lower rank means a better match (bm25). Returns None when the term has no
+    searchable words.
+    """
+    fts_query = build_fts_query(search_term)
+    if fts_query is None:
+        return None
+
+    weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+    return text(
+        f"SELECT rowid AS task_id, bm25({FTS_TABLE}, {weights}) AS rank "
+        f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :fts_query"
+    ).bindparams(fts_query=fts_query).columns(task_id=Integer, rank=Float).subquery('task_search')
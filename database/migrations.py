@@ -0,0 +1,241 @@
+"""
+In-place schema upgrades for existing data.db files.
+
+Base.metadata.create_all only creates missing tables, so anything added to an
+existing table (indexes, columns, ...) is applied here. The schema version is
+kept in SQLite's PRAGMA user_version; each migration runs once, in order,
+inside its own transaction.
+"""
+from sqlalchemy import text
+
+
+def get_schema_version(connection):
+    """Return the schema version stored in the database file."""
+    return connection.execute(text("PRAGMA user_version")).scalar() or 0
+
+
+def _set_schema_version(connection, version):
+    connection.execute(text(f"PRAGMA user_version = {int(version)}"))
+
+
+def _columns(connection, table):
+    """Column names of a table (empty if it does not exist)."""
+    return {row[1] for row in connection.execute(text(f"PRAGMA table_info({table})"))}
+
+
+def _add_lookup_indexes(connection):
+    """Version 1: unique lookup indexes on people/awards, filter index on tasks."""
+    # Merge duplicate people of a task into the oldest row before the unique
+    # index can be created
+    connection.execute(text("""
+        UPDATE awards SET person_id = (
+            SELECT MIN(p2.id) FROM people p1
+            JOIN people p2 ON p2.task_id = p1.task_id AND p2.name = p1.name
+            WHERE p1.id = awards.person_id
+        )
+    """))
+    connection.execute(text("""
+        DELETE FROM people WHERE id NOT IN (
+            SELECT MIN(id) FROM people GROUP BY task_id, name
+        )
+    """))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_people_task_name ON people (task_id, name)"
+    ))
+
+    # Awards created with the catalog layout (version 3) already have their index
+    if "name" in _columns(connection, "awards"):
+        # Drop duplicate awards, keeping the oldest row
+        connection.execute(text("""
+            DELETE FROM awards WHERE id NOT IN (
+                SELECT MIN(id) FROM awards GROUP BY person_id, name, year
+            )
+        """))
+        connection.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS ix_awards_person_name_year ON awards (person_id, name, year)"
+        ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_year_unit ON tasks (year, unit)"
+    ))
+
+
+def _add_task_fts(connection):
+    """Version 2: FTS5 search index over tasks (skipped if FTS5 is unavailable)."""
+    from database.fts import create_task_fts
+    create_task_fts(connection)
+
+
+def _add_award_catalog(connection):
+    """Version 3: move award titles into award_catalog, awards keep the id."""
+    if "name" not in _columns(connection, "awards"):
+        return
+
+    connection.execute(text("""
+        CREATE TABLE IF NOT EXISTS award_catalog (
+            id INTEGER NOT NULL PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            category VARCHAR(255)
+        )
+    """))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_award_catalog_name ON award_catalog (name)"
+    ))
+    # Titles in order of first use; the source column is not known for old rows
+    connection.execute(text("""
+        INSERT OR IGNORE INTO award_catalog (name)
+        SELECT name FROM awards GROUP BY name ORDER BY MIN(id)
+    """))
+
+    # SQLite cannot drop a column in use by an index, so rebuild the table
+    connection.execute(text("""
+        CREATE TABLE awards_new (
+            id INTEGER NOT NULL PRIMARY KEY,
+            catalog_id INTEGER NOT NULL REFERENCES award_catalog (id),
+            year INTEGER NOT NULL,
+            person_id INTEGER NOT NULL REFERENCES people (id)
+        )
+    """))
+    connection.execute(text("""
+        INSERT INTO awards_new (id, catalog_id, year, person_id)
+        SELECT awards.id, award_catalog.id, awards.year, awards.person_id
+        FROM awards JOIN award_catalog ON award_catalog.name = awards.name
+    """))
+    connection.execute(text("DROP TABLE awards"))
+    connection.execute(text("ALTER TABLE awards_new RENAME TO awards"))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX ix_awards_person_award_year ON awards (person_id, catalog_id, year)"
+    ))
+    connection.execute(text(
+        "CREATE INDEX ix_awards_catalog_year ON awards (catalog_id, year)"
+    ))
+
+
+def _add_person_identities(connection):
+    """Version 4: link every person to a cross-task identity by normalized name."""
+    from utils.names import normalize_name
+
+    if "identity_id" not in _columns(connection, "people"):
+        connection.execute(text(
+            "ALTER TABLE people ADD COLUMN identity_id INTEGER REFERENCES person_identities (id)"
+        ))
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_people_identity ON people (identity_id)"
+    ))
+
+    people = connection.execute(text(
+        "SELECT id, name FROM people WHERE identity_id IS NULL ORDER BY id"
+    )).fetchall()
+    keys = {}
+    for _, name in people:
+        key = normalize_name(name)
+        if key:
+            keys.setdefault(key, name.strip())
+    if not keys:
+        return
+
+    # person_identities was created by create_all, with its partial unique index
+    connection.execute(
+        text(
+            "INSERT OR IGNORE INTO person_identities (normalized_name, display_name) "
+            "VALUES (:normalized_name, :display_name)"
+        ),
+        [{"normalized_name": key, "display_name": name} for key, name in keys.items()]
+    )
+    identity_ids = dict(connection.execute(text(
+        "SELECT normalized_name, id FROM person_identities "
+        "WHERE unit IS NULL AND birth_date IS NULL"
+    )).fetchall())
+    connection.execute(
+        text("UPDATE people SET identity_id = :identity_id WHERE id = :id"),
+        [
+            {"id": person_id, "identity_id": identity_ids[normalize_name(name)]}
+            for person_id, name in people
+            if normalize_name(name) in identity_ids
+        ]
+    )
+
+
+def _add_task_list_index(connection):
+    """Version 5: index in task list order for keyset pagination."""
+    connection.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_tasks_year_desc_name ON tasks (year DESC, name, id)"
+    ))
+
+
+def _add_task_rows(connection):
+    """Version 6: per-task row store; rows are filled from the workbook on first use."""
+    if "rows_source_hash" not in _columns(connection, "tasks"):
+        connection.execute(text("ALTER TABLE tasks ADD COLUMN rows_source_hash VARCHAR(64)"))
+
+
+def _narrow_task_fts_trigger(connection):
+    """Version 7: re-index a task in FTS only when name, unit or description change."""
+    from database.fts import FTS_TABLE, create_update_trigger
+
+    exists = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {"name": FTS_TABLE}).first()
+    if exists is None:
+        return
+    connection.execute(text("DROP TRIGGER IF EXISTS tasks_fts_au"))
+    create_update_trigger(connection)
+
+
+def _key_award_catalog_by_category(connection):
+    """Version 8: store a title once per column header instead of once overall."""
+    connection.execute(text("DROP INDEX IF EXISTS ix_award_catalog_name"))
+    connection.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS ix_award_catalog_name_category "
+        "ON award_catalog (name, category)"
+    ))
+
+
+def _drop_row_search_text(connection):
+    """Version 9: drop the unused folded search text of stored rows."""
+    if "search_text" in _columns(connection, "task_rows"):
+        connection.execute(text("ALTER TABLE task_rows DROP COLUMN search_text"))
+
+
+# (version, migration) pairs, applied in order
+MIGRATIONS = [
+    (1, _add_lookup_indexes),
+    (2, _add_task_fts),
+    (3, _add_award_catalog),
+    (4, _add_person_identities),
+    (5, _add_task_list_index),
+    (6, _add_task_rows),
+    (7, _narrow_task_fts_trigger),
+    (8, _key_award_catalog_by_category),
+    (9, _drop_row_search_text),
+]
+
+# Migrations that free a lot of pages; the file is compacted afterwards
+VACUUM_AFTER = {3, 9}
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def upgrade_db(engine):
+    """
+    Bring an existing database up to SCHEMA_VERSION.
+
+    Args:
+        engine: SQLAlchemy engine of the database to upgrade
+
+    Returns:
+        List of the versions that were applied
+    """
+    applied = []
+    for version, migration in MIGRATIONS:
+        with engine.begin() as connection:
+            if get_schema_version(connection) >= version:
+                continue
+            migration(connection)
+            _set_schema_version(connection, version)
+        applied.append(version)
+
+    # VACUUM cannot run inside a transaction
+    if VACUUM_AFTER.intersection(applied):
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.execute(text("VACUUM"))
+    return applied
@@ -0,0 +1,158 @@
+"""
+Person identities across tasks.
+
+Person rows belong to one task; person_identities holds one row per real
+person, keyed by the normalized name (utils.names.normalize_name) plus an
+optional unit and date of birth. Every Person links to an identity, so all
+awards of a person over all tasks and years are found through the indexes on
+people (identity_id) and awards (person_id, ...) instead of a name scan.
+"""
+from sqlalchemy import text, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from database.db_manager import IN_BATCH
+from models.award import Award
+from models.award_catalog import AwardCatalog
+from models.person import Person
+from models.person_identity import PersonIdentity
+from models.task import Task
+from utils.names import NameMatcher, normalize_name
+
+# Identities created by imports carry neither unit nor date of birth
+NAME_ONLY = text('unit IS NULL AND birth_date IS NULL')
+
+
+def link_identities(session, task_id, names=None):
+    """
+    Link the people of a task that have no identity yet.
+    
+    Missing name-only identities are inserted in one batch, then the people
+    are updated in one executemany.
+    
+    Args:
+        session: Database session
+        task_id: Task whose people are linked
+        names: Only consider these names (e.g. the rows just imported)
+    
+    Returns:
+        Number of people linked
+    """
+    query = session.query(Person.id, Person.name).filter(
+        Person.task_id == task_id, Person.identity_id.is_(None)
+    )
+    if names is None:
+        unlinked = query.all()
+    else:
+        unlinked = []
+        for start in range(0, len(names), IN_BATCH):
+            unlinked.extend(query.filter(Person.name.in_(names[start:start + IN_BATCH])).all())
+    if not unlinked:
+        return 0
+    
+    keys = {}
+    for _, name in unlinked:
+        key = normalize_name(name)
+        if key:
+            keys.setdefault(key, name.strip())
+    if not keys:
+        return 0
+    
+    session.execute(
+        sqlite_insert(PersonIdentity).on_conflict_do_nothing(
+            index_elements=["normalized_name"], index_where=NAME_ONLY
+        ),
+        [{"normalized_name": key, "display_name": name} for key, name in keys.items()]
+    )
+    
+    identity_ids = {}
+    names = list(keys)
+    for start in range(0, len(names), IN_BATCH):
+        identity_ids.update(
+            session.query(PersonIdentity.normalized_name, PersonIdentity.id)
+            .filter(
+                PersonIdentity.normalized_name.in_(names[start:start + IN_BATCH]),
+                PersonIdentity.unit.is_(None),
+                PersonIdentity.birth_date.is_(None)
+            )
+            .all()
+        )
+    
+    links = [
+        {"id": person_id, "identity_id": identity_ids[normalize_name(name)]}
+        for person_id, name in unlinked
+        if normalize_name(name) in identity_ids
+    ]
+    if links:
+        session.execute(update(Person), links)
+    return len(links)
+
+
+def people_by_key(session, task_id, keys):
+    """
+    Map normalized names to people already stored in a task.
+    
+    Finds a person whatever the spelling of the name in the task ("Nguyen van
+    A" for "Nguyễn Văn A"); if several rows share a key the oldest one wins.
+    
+    Returns:
+        Dict normalized name -> person id
+    """
+    keys = list(keys)
+    person_ids = {}
+    for start in range(0, len(keys), IN_BATCH):
+        rows = (
+            session.query(PersonIdentity.normalized_name, Person.id)
+            .join(Person, Person.identity_id == PersonIdentity.id)
+            .filter(
+                PersonIdentity.normalized_name.in_(keys[start:start + IN_BATCH]),
+                Person.task_id == task_id
+            )
+            .order_by(Person.id)
+            .all()
+        )
+        for key, person_id in rows:
+            person_ids.setdefault(key, person_id)
+    return person_ids
+
+
+def task_name_matcher(session, task_id, threshold):
+    """NameMatcher over the people of a task, with person ids as values."""
+    matcher = NameMatcher(threshold=threshold)
+    for person_id, name in session.query(Person.id, Person.name).filter(Person.task_id == task_id):
+        matcher.add(name, person_id)
+    return matcher
+
+
+def find_identities(session, name, unit=None, birth_date=None):
+    """Identities matching a name (any spelling) and the given details."""
+    query = session.query(PersonIdentity).filter(
+        PersonIdentity.normalized_name == normalize_name(name)
+    )
+    if unit is not None:
+        query = query.filter(PersonIdentity.unit == unit)
+    if birth_date is not None:
+        query = query.filter(PersonIdentity.birth_date == birth_date)
+    return query.all()
+
+
+def person_awards(session, identity_ids):
+    """
+    Query every award of the given identities over all tasks.
+    
+    Args:
+        session: Database session
+        identity_ids: Ids of PersonIdentity rows (see find_identities)
+        
+    Returns:
+        Query of (Task, Person.name, award name, category, year) rows,
+        newest year first
+    """
+    return (
+        session.query(Task, Person.name, AwardCatalog.name, AwardCatalog.category, Award.year)
+        .select_from(Person)
+        .join(Task, Task.id == Person.task_id)
+        .join(Award, Award.person_id == Person.id)
+        .join(AwardCatalog, AwardCatalog.id == Award.catalog_id)
+        .filter(Person.identity_id.in_(list(identity_ids)))
+        .order_by(Award.year.desc(), Task.name)
+    )
@@ -0,0 +1,192 @@
+"""
+Per-task row store.
+
+The rows of each task sheet are kept in task_rows (one JSON array per row,
+in the column order of task_columns), so opening a task reads SQLite instead
+of parsing its .xlsx. The workbook stays the interchange format: the store
+remembers the content hash of the workbook it mirrors (Task.rows_source_hash)
+and is rebuilt from the file whenever someone changed the file outside the
+application. Merges append to it and edits from the detail views are applied
+to it together with the workbook.
+"""
+import json
+from datetime import date, datetime, time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import delete, func, insert, update
+
+from models.task import Task
+from models.task_row import TaskColumn, TaskRow
+
+# Rows per INSERT batch
+INSERT_BATCH = 5000
+
+
+def _json_default(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat(sep=" ") if isinstance(value, datetime) else value.isoformat()
+    return str(value)
+
+
+def _encode_rows(df):
+    """JSON text of every row, missing cells as null."""
+    values = df.astype(object).where(df.notna(), None)
+    return [
+        json.dumps(list(row), ensure_ascii=False, default=_json_default)
+        for row in values.itertuples(index=False, name=None)
+    ]
+
+
+def _insert_rows(session, task_id, df, first_position):
+    texts = _encode_rows(df)
+    for start in range(0, len(texts), INSERT_BATCH):
+        session.execute(insert(TaskRow), [
+            {
+                "task_id": task_id,
+                "position": first_position + offset,
+                "data": texts[offset],
+            }
+            for offset in range(start, min(start + INSERT_BATCH, len(texts)))
+        ])
+
+
+def rows_current(session, task_id, content_hash):
+    """Whether the stored rows of a task mirror the workbook with this content hash."""
+    stored = session.query(Task.rows_source_hash).filter(Task.id == task_id).scalar()
+    return stored is not None and stored == content_hash
+
+
+def store_rows(session, task_id, df, content_hash):
+    """
+    Replace the stored rows and columns of a task with a DataFrame.
+
+    Args:
+        session: Database session (the caller commits)
+        task_id: Task the rows belong to
+        df: The task sheet as read from the workbook
+        content_hash: Content hash of that workbook
+    """
+    session.execute(delete(TaskRow).where(TaskRow.task_id == task_id))
+    session.execute(delete(TaskColumn).where(TaskColumn.task_id == task_id))
+    if len(df.columns):
+        session.execute(insert(TaskColumn), [
+            {"task_id": task_id, "position": position, "name": str(name), "dtype": str(dtype)}
+            for position, (name, dtype) in enumerate(df.dtypes.items())
+        ])
+    _insert_rows(session, task_id, df, 0)
+    session.execute(update(Task).where(Task.id == task_id).values(rows_source_hash=content_hash))
+
+
+def append_rows(session, task_id, df, content_hash=None):
+    """
+    Append rows after the stored ones, e.g. the new rows of a merge.
+
+    Only valid while the store is current; the caller checks rows_current()
+    against the workbook as it was before the rows were appended to it.
+
+    Args:
+        session: Database session (the caller commits)
+        task_id: Task the rows belong to
+        df: Rows to append, in the stored column order
+        content_hash: Content hash of the workbook after the append; None
+            when it is not written yet (see mark_rows_current)
+    """
+    count = session.query(func.count(TaskRow.id)).filter(TaskRow.task_id == task_id).scalar()
+    _insert_rows(session, task_id, df, count)
+    if content_hash is not None:
+        mark_rows_current(session, task_id, content_hash)
+
+
+def mark_rows_current(session, task_id, content_hash):
+    """Record that the stored rows mirror the workbook with this content hash."""
+    session.execute(update(Task).where(Task.id == task_id).values(rows_source_hash=content_hash))
+
+
+def apply_row_patches(session, task_id, patches, content_hash):
+    """
+    Apply the edits of utils.excel_patch.apply_row_patches to the stored rows.
+
+    Args:
+        session: Database session (the caller commits)
+        task_id: Task the rows belong to
+        patches: ("update", position, {column_index: value}) and
+            ("delete", position, None), applied in order
+        content_hash: Content hash of the workbook after the same edits
+    """
+    for operation, position, values in patches:
+        if operation == "update":
+            row = session.query(TaskRow).filter(
+                TaskRow.task_id == task_id, TaskRow.position == position
+            ).first()
+            if row is None:
+                continue
+            data = json.loads(row.data)
+            for column, value in values.items():
+                if column >= len(data):
+                    data.extend([None] * (column + 1 - len(data)))
+                data[column] = None if value is None or pd.isna(value) else value
+            row.data = json.dumps(data, ensure_ascii=False, default=_json_default)
+        elif operation == "delete":
+            session.execute(delete(TaskRow).where(
+                TaskRow.task_id == task_id, TaskRow.position == position
+            ))
+            # Shift in two steps: through negative positions, so the unique
+            # (task_id, position) index never sees two equal rows
+            later = (TaskRow.task_id == task_id) & (TaskRow.position > position)
+            session.execute(update(TaskRow).where(later).values(position=-TaskRow.position))
+            session.execute(update(TaskRow).where(
+                TaskRow.task_id == task_id, TaskRow.position < 0
+            ).values(position=-TaskRow.position - 1))
+        else:
+            raise ValueError(f"Unknown patch operation: {operation}")
+    session.flush()
+    session.execute(update(Task).where(Task.id == task_id).values(rows_source_hash=content_hash))
+
+
+def task_columns(session, task_id):
+    """(name, dtype) of the stored columns of a task, in order."""
+    return session.query(TaskColumn.name, TaskColumn.dtype).filter(
+        TaskColumn.task_id == task_id
+    ).order_by(TaskColumn.position).all()
+
+
+def _restore_dtypes(df, columns):
+    """Give columns back the dtypes they had when stored where the values allow it."""
+    for col, (_, dtype) in enumerate(columns):
+        series = df.iloc[:, col]
+        if str(series.dtype) == dtype:
+            continue
+        try:
+            if dtype.startswith("datetime64"):
+                restored = pd.to_datetime(series)
+            elif dtype == "object":
+                restored = series.astype(object)
+            else:
+                restored = series.astype(dtype)
+        except (TypeError, ValueError):
+            # e.g. text typed into a date column during an edit
+            continue
+        df.isetitem(col, restored)
+    return df
+
+
+def load_rows(session, task_id):
+    """
+    Return the stored rows of a task as a DataFrame, or None if there are none.
+    """
+    columns = task_columns(session, task_id)
+    if not columns:
+        return None
+    texts = session.query(TaskRow.data).filter(TaskRow.task_id == task_id).order_by(TaskRow.position)
+    # One json.loads over all rows is much faster than one call per row
+    rows = json.loads("[" + ",".join(text for (text,) in texts) + "]")
+    width = len(columns)
+    for values in rows:
+        if len(values) != width:
+            values[:] = (values + [None] * width)[:width]
+    df = pd.DataFrame(rows, columns=[name for name, _ in columns])
+    return _restore_dtypes(df, columns)
+
@@ -1,20 +1,56 @@
+import time
+
+# Reference point of the startup measurement (--startup-time)
+STARTED_AT = time.perf_counter()
+
 import sys
 from PySide6.QtWidgets import QApplication
 from ui.main_window import MainWindow
-from database.db_manager import init_db
+
+# Command-line flag: print the startup timings and quit
+STARTUP_TIME_FLAG = "--startup-time"
+
+def measure_startup(app, window, marks):
+    """
+    Print the time to first paint and to a ready database, then quit.
+    
+    If the database cannot be initialized the timings are printed up to
+    the failure and the application exits with status 1.
+
+    Args:
+        app: The application
+        window: The main window, not shown yet
+        marks: (label, perf_counter) pairs recorded so far
+    """
+    def mark(label):
+        marks.append((label, time.perf_counter()))
+
+    def report(label, status):
+        mark(label)
+        print("startup: " + ", ".join(
+            f"{label} {(moment - STARTED_AT) * 1000:.0f} ms" for label, moment in marks
+        ))
+        app.exit(status)
+
+    window.first_painted.connect(lambda: mark("first paint"))
+    window.database_ready.connect(lambda: report("database ready", 0))
+    window.database_failed.connect(lambda message: report("database failed", 1))
 
 def main():
     """Main entry point for the application."""
-    # Initialize the database
-    init_db()
-    
+    marks = [("imports", time.perf_counter())]
+
     # Create the application
     app = QApplication(sys.argv)
-    
-    # Create and show the main window
+
+    # Create and show the main window; the database is initialized by the
+    # window right after its first paint
     window = MainWindow()
+    marks.append(("window", time.perf_counter()))
+    if STARTUP_TIME_FLAG in sys.argv:
+        measure_startup(app, window, marks)
     window.show()
-    
+
     # Run the application
     sys.exit(app.exec_())
 
@@ -1,18 +1,31 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, ForeignKey, Index
+from sqlalchemy.ext.associationproxy import association_proxy
 from sqlalchemy.orm import relationship
 from database.db_manager import Base
+from models.award_catalog import AwardCatalog  # noqa: F401 (registers the catalog table)
 
 class Award(Base):
     """Award model representing an award given to a person."""
     __tablename__ = 'awards'
+    __table_args__ = (
+        # A person holds a given award once per year
+        Index('ix_awards_person_award_year', 'person_id', 'catalog_id', 'year', unique=True),
+        # "Who holds award X (in year Y)" lookups
+        Index('ix_awards_catalog_year', 'catalog_id', 'year'),
+    )
     
     id = Column(Integer, primary_key=True)
-    name = Column(String(255), nullable=False)
+    catalog_id = Column(Integer, ForeignKey('award_catalog.id'), nullable=False)
     year = Column(Integer, nullable=False)
     person_id = Column(Integer, ForeignKey('people.id'), nullable=False)
     
     # Relationships
     person = relationship("Person", back_populates="awards")
+    catalog = relationship("AwardCatalog", back_populates="awards", lazy="joined")
+    
+    # Title and category live in the catalog
+    name = association_proxy("catalog", "name")
+    category = association_proxy("catalog", "category")
     
     def __repr__(self):
         return f"<Award(id={self.id}, name='{self.name}', year={self.year})>"
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Index
+from sqlalchemy.orm import relationship
+from database.db_manager import Base
+
+class AwardCatalog(Base):
+    """Distinct award title per column header; awards reference it by id instead of repeating the name."""
+    __tablename__ = 'award_catalog'
+    __table_args__ = (
+        # Each title is stored once per column header
+        Index('ix_award_catalog_name_category', 'name', 'category', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    name = Column(String(255), nullable=False)
+    # Column header the title was imported from (NULL for titles migrated
+    # from databases that did not record it)
+    category = Column(String(255))
+    
+    # Relationships
+    awards = relationship("Award", back_populates="catalog")
+    
+    def __repr__(self):
+        return f"<AwardCatalog(id={self.id}, name='{self.name}', category='{self.category}')>"
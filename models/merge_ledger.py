@@ -0,0 +1,24 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
+from sqlalchemy.orm import relationship
+from database.db_manager import Base
+
+class MergeLedgerEntry(Base):
+    """Record of an input file already merged into a task's workbook."""
+    __tablename__ = 'merge_ledger'
+    __table_args__ = (
+        # The same file content is merged into a task only once
+        Index('ix_merge_ledger_task_hash', 'task_id', 'content_hash', unique=True),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
+    file_name = Column(String(512), nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    row_count = Column(Integer, nullable=False)
+    merged_at = Column(DateTime, nullable=False)
+    
+    # Relationships
+    task = relationship("Task", back_populates="merge_ledger")
+    
+    def __repr__(self):
+        return f"<MergeLedgerEntry(id={self.id}, task_id={self.task_id}, file_name='{self.file_name}', rows={self.row_count})>"
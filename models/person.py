@@ -1,18 +1,27 @@
-from sqlalchemy import Column, Integer, String, ForeignKey
+from sqlalchemy import Column, Integer, String, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.db_manager import Base
+from models.person_identity import PersonIdentity  # noqa: F401 (registers the identity table)
 
 class Person(Base):
     """Person model representing an individual in a task."""
     __tablename__ = 'people'
+    __table_args__ = (
+        # One row per name within a task; also serves the import lookups
+        Index('ix_people_task_name', 'task_id', 'name', unique=True),
+        # All task rows of one person
+        Index('ix_people_identity', 'identity_id'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
     task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
+    identity_id = Column(Integer, ForeignKey('person_identities.id'))
     
     # Relationships
     task = relationship("Task", back_populates="people")
     awards = relationship("Award", back_populates="person", cascade="all, delete-orphan")
+    identity = relationship("PersonIdentity", back_populates="people")
     
     def __repr__(self):
         return f"<Person(id={self.id}, name='{self.name}')>"
@@ -0,0 +1,31 @@
+from sqlalchemy import Column, Integer, String, Date, Index, text
+from sqlalchemy.orm import relationship
+from database.db_manager import Base
+
+class PersonIdentity(Base):
+    """One real person across tasks; per-task Person rows link to it."""
+    __tablename__ = 'person_identities'
+    __table_args__ = (
+        # Cross-task lookups by name
+        Index('ix_person_identities_name', 'normalized_name', 'unit', 'birth_date'),
+        # Imports only know the name: one unqualified identity per name
+        Index(
+            'ix_person_identities_name_only', 'normalized_name', unique=True,
+            sqlite_where=text('unit IS NULL AND birth_date IS NULL')
+        ),
+    )
+    
+    id = Column(Integer, primary_key=True)
+    # Key from utils.names.normalize_name
+    normalized_name = Column(String(255), nullable=False)
+    # Name as first seen, for display
+    display_name = Column(String(255), nullable=False)
+    # Optional details telling apart different people with the same name
+    unit = Column(String(255))
+    birth_date = Column(Date)
+    
+    # Relationships
+    people = relationship("Person", back_populates="identity")
+    
+    def __repr__(self):
+        return f"<PersonIdentity(id={self.id}, name='{self.display_name}', unit='{self.unit}')>"
@@ -1,11 +1,15 @@
 import os
-from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Date, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.db_manager import Base
 
 class Task(Base):
     """Task model representing a mission/task with associated Excel file."""
     __tablename__ = 'tasks'
+    __table_args__ = (
+        # Year/unit filters and ordering in the task list
+        Index('ix_tasks_year_unit', 'year', 'unit'),
+    )
     
     id = Column(Integer, primary_key=True)
     name = Column(String(255), nullable=False)
@@ -14,9 +18,12 @@ class Task(Base):
     description = Column(Text, nullable=True)
     excel_path = Column(String(512), nullable=False)
     created_at = Column(Date, nullable=False)
-    
+    # Content hash of the workbook that task_rows was last synced with
+    rows_source_hash = Column(String(64), nullable=True)
+
     # Relationships
     people = relationship("Person", back_populates="task", cascade="all, delete-orphan")
+    merge_ledger = relationship("MergeLedgerEntry", back_populates="task", cascade="all, delete-orphan")
     
     def __repr__(self):
         return f"<Task(id={self.id}, name='{self.name}', year={self.year}, unit='{self.unit}')>"
@@ -111,3 +118,6 @@ class Task(Base):
                 print(f"Error removing old folder: {str(e)}")
         
         return True
+
+# Task list order (year desc, name, id); keyset pages walk this index
+Index('ix_tasks_year_desc_name', Task.year.desc(), Task.name, Task.id)
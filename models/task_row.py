@@ -0,0 +1,43 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, Index, delete, event
+from database.db_manager import Base
+from models.task import Task
+
+class TaskColumn(Base):
+    """Column of a task sheet: its header, position and pandas dtype."""
+    __tablename__ = 'task_columns'
+    __table_args__ = (
+        Index('ix_task_columns_task_position', 'task_id', 'position', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
+    position = Column(Integer, nullable=False)
+    name = Column(String(255), nullable=False)
+    # str() of the column dtype when stored, used to restore dates etc.
+    dtype = Column(String(64), nullable=False)
+
+    def __repr__(self):
+        return f"<TaskColumn(task_id={self.task_id}, position={self.position}, name='{self.name}')>"
+
+class TaskRow(Base):
+    """One data row of a task sheet, stored as a JSON array in column order."""
+    __tablename__ = 'task_rows'
+    __table_args__ = (
+        # Row order of a task
+        Index('ix_task_rows_task_position', 'task_id', 'position', unique=True),
+    )
+
+    id = Column(Integer, primary_key=True)
+    task_id = Column(Integer, ForeignKey('tasks.id'), nullable=False)
+    # 0-based row position; sheet row = position + 2
+    position = Column(Integer, nullable=False)
+    data = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<TaskRow(task_id={self.task_id}, position={self.position})>"
+
+@event.listens_for(Task, 'before_delete')
+def _delete_task_rows(mapper, connection, task):
+    """Remove a deleted task's rows with two bulk statements instead of an ORM cascade."""
+    connection.execute(delete(TaskRow).where(TaskRow.task_id == task.id))
+    connection.execute(delete(TaskColumn).where(TaskColumn.task_id == task.id))
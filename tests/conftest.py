@@ -0,0 +1,58 @@
+"""
+Shared fixtures: a throw-away database and workbook cache per test.
+
+The application code uses the module-level engine of database.db_manager,
+so the `db` fixture points that engine at a temporary file for the duration
+of a test.
+"""
+from datetime import date
+
+import pytest
+
+import utils.excel_cache as excel_cache
+from database import db_manager
+from utils.excel_stream import write_excel_streaming
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep parsed-workbook cache entries out of the application's cache."""
+    monkeypatch.setattr(excel_cache, "CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "test.db")
+
+
+@pytest.fixture
+def db(db_path):
+    """An initialized, empty database; yields its engine."""
+    db_manager.configure_engine(db_path)
+    db_manager.init_db()
+    yield db_manager.engine
+    db_manager.configure_engine(db_manager.DB_PATH)
+
+
+@pytest.fixture
+def write_workbook(tmp_path):
+    """Write a DataFrame as a task workbook; returns the path."""
+    def write(name, df):
+        path = str(tmp_path / name)
+        write_excel_streaming(path, list(df.columns), [df])
+        return path
+    return write
+
+
+@pytest.fixture
+def make_task(db):
+    """Store a task whose workbook is at excel_path; returns its id."""
+    from models.task import Task
+
+    def make(excel_path, name="Nhiệm vụ", year=2024, unit="Phòng PV01"):
+        with db_manager.session_scope() as session:
+            task = Task(name=name, year=year, unit=unit, excel_path=excel_path, created_at=date(2024, 1, 1))
+            session.add(task)
+            session.flush()
+            return task.id
+    return make
@@ -0,0 +1,161 @@
+import json
+
+import pandas as pd
+import pytest
+
+import cli
+from database import db_manager
+from database.task_rows import load_rows, rows_current
+from models.task import Task
+from utils.excel_cache import file_fingerprint
+from utils.excel_manager import create_excel_template, import_dataframe
+
+COLUMNS = ["Họ và tên", "Danh hiệu thi đua"]
+
+
+def run_cli(capsys, db_path, *args):
+    """Run a command with --json; returns (exit status, events)."""
+    status = cli.main([*args, "--db", db_path, "--json"])
+    return status, [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def _import(task_id, rows):
+    with db_manager.session_scope() as session:
+        import_dataframe(pd.DataFrame(rows, columns=COLUMNS), session.get(Task, task_id), session)
+
+
+def test_holders_lists_people_of_an_award(capsys, db_path, make_task):
+    first, second = make_task("a.xlsx"), make_task("b.xlsx")
+    _import(first, [["Nguyễn Văn A", "Giấy khen (2023)"], ["Trần Thị B", "Giấy khen (2022)"]])
+    _import(second, [["Lê Văn C", "Giấy khen (2023)"], ["Phạm D", "Chiến sĩ thi đua (2023)"]])
+
+    status, events = run_cli(capsys, db_path, "holders", "Giấy khen", "--year", "2023")
+    assert status == cli.EXIT_OK
+    holders = [(e["task"], e["name"], e["year"]) for e in events if e["event"] == "holder"]
+    assert holders == [(second, "Lê Văn C", 2023), (first, "Nguyễn Văn A", 2023)]
+
+    status, events = run_cli(capsys, db_path, "holders", "Không có")
+    assert [e["event"] for e in events] == ["summary"]
+
+
+def test_person_lists_awards_over_all_tasks(capsys, db_path, make_task):
+    first = make_task("a.xlsx", name="Nhiệm vụ 1")
+    second = make_task("b.xlsx", name="Nhiệm vụ 2")
+    _import(first, [["Nguyễn Văn A", "Giấy khen (2022)"], ["Trần Thị B", "Giấy khen (2022)"]])
+    _import(second, [["NGUYỄN VĂN A", "Chiến sĩ thi đua (2024)"]])
+
+    status, events = run_cli(capsys, db_path, "person", "nguyen van a")
+    assert status == cli.EXIT_OK
+    awards = [(e["task"], e["name"], e["award"], e["year"]) for e in events if e["event"] == "award"]
+    assert awards == [
+        (second, "NGUYỄN VĂN A", "Chiến sĩ thi đua", 2024),
+        (first, "Nguyễn Văn A", "Giấy khen", 2022),
+    ]
+
+    status, events = run_cli(capsys, db_path, "person", "Không Ai")
+    assert status == cli.EXIT_USAGE
+
+
+def _results(events):
+    return [e for e in events if e["event"] == "result"]
+
+
+@pytest.fixture
+def task_with_input(tmp_path, write_workbook, make_task):
+    """A task with a fresh workbook and one team file next to it; returns (id, workbook)."""
+    workbook = str(tmp_path / "task.xlsx")
+    create_excel_template(workbook, COLUMNS)
+    task_id = make_task(workbook)
+    write_workbook("doi1.xlsx", pd.DataFrame([
+        ["Nguyễn Văn A", "Giấy khen (2023)"],
+        ["Trần Thị B", "Chiến sĩ thi đua (2024)"],
+    ], columns=COLUMNS))
+    return task_id, workbook
+
+
+def test_merge_appends_input_files(capsys, db_path, tmp_path, task_with_input):
+    task_id, workbook = task_with_input
+    pattern = str(tmp_path / "doi*.xlsx")
+
+    status, events = run_cli(capsys, db_path, "merge", "--task", str(task_id), pattern)
+    assert status == cli.EXIT_OK
+    assert _results(events) == [{
+        "event": "result", "status": "ok", "task": task_id,
+        "merged": 1, "already_merged": 0, "rows": 2, "errors": [],
+    }]
+    assert pd.read_excel(workbook)["Họ và tên"].tolist() == ["Nguyễn Văn A", "Trần Thị B"]
+
+    # Merging the same file again appends nothing
+    status, events = run_cli(capsys, db_path, "merge", "--all", pattern)
+    assert status == cli.EXIT_OK
+    assert [(e["merged"], e["already_merged"], e["rows"]) for e in _results(events)] == [(0, 1, 0)]
+    assert len(pd.read_excel(workbook)) == 2
+
+
+def test_merge_without_matching_files_is_a_usage_error(capsys, db_path, tmp_path, task_with_input):
+    status, events = run_cli(capsys, db_path, "merge", "--all", str(tmp_path / "none*.xlsx"))
+    assert status == cli.EXIT_USAGE
+    assert events[0]["event"] == "error"
+
+
+def test_reindex_rebuilds_row_store_people_and_awards(capsys, db_path, tmp_path, task_with_input):
+    task_id, workbook = task_with_input
+    run_cli(capsys, db_path, "merge", "--all", str(tmp_path / "doi*.xlsx"))
+    with db_manager.session_scope() as session:
+        session.get(Task, task_id).rows_source_hash = None
+
+    status, events = run_cli(capsys, db_path, "reindex", "--all", "--stale-only")
+    assert status == cli.EXIT_OK
+    assert [(e["status"], e["rows"]) for e in _results(events)] == [("ok", 2)]
+    with db_manager.session_scope() as session:
+        assert rows_current(session, task_id, file_fingerprint(workbook)[3])
+        assert load_rows(session, task_id)["Họ và tên"].tolist() == ["Nguyễn Văn A", "Trần Thị B"]
+
+    # The store now mirrors the workbook, so there is nothing left to do
+    status, events = run_cli(capsys, db_path, "reindex", "--all", "--stale-only")
+    assert status == cli.EXIT_OK
+    assert [e["status"] for e in _results(events)] == ["skipped"]
+
+
+def test_reindex_reports_missing_workbook(capsys, db_path, make_task):
+    make_task("/nonexistent/task.xlsx")
+    status, events = run_cli(capsys, db_path, "reindex", "--all")
+    assert status == cli.EXIT_FAILED
+    assert [e["status"] for e in _results(events)] == ["failed"]
+
+
+def test_export_writes_one_file_per_task(capsys, db_path, tmp_path, task_with_input):
+    task_id, _ = task_with_input
+    run_cli(capsys, db_path, "merge", "--all", str(tmp_path / "doi*.xlsx"))
+    output = tmp_path / "out"
+
+    status, events = run_cli(capsys, db_path, "export", "--all", "--output", str(output), "--format", "csv")
+    assert status == cli.EXIT_OK
+    [result] = _results(events)
+    assert result["status"] == "ok" and result["rows"] == 2
+    assert result["file"] == str(output / f"{task_id}_Nhiệm_vụ.csv")
+    assert pd.read_csv(result["file"])["Họ và tên"].tolist() == ["Nguyễn Văn A", "Trần Thị B"]
+
+    status, events = run_cli(
+        capsys, db_path, "export", "--all", "--output", str(output), "--search", "tran thi"
+    )
+    assert status == cli.EXIT_OK
+    [result] = _results(events)
+    assert result["rows"] == 1
+    assert pd.read_excel(result["file"])["Họ và tên"].tolist() == ["Trần Thị B"]
+
+
+def test_stats_counts_rows_people_and_awards(capsys, db_path, tmp_path, task_with_input, make_task):
+    task_id, _ = task_with_input
+    run_cli(capsys, db_path, "merge", "--all", str(tmp_path / "doi*.xlsx"))
+    empty = make_task(str(tmp_path / "missing.xlsx"), name="Trống")
+
+    status, events = run_cli(capsys, db_path, "stats")
+    assert status == cli.EXIT_OK
+    tasks = {e["task"]: e for e in events if e["event"] == "task"}
+    assert {key: tasks[task_id][key] for key in ("rows", "row_store", "people", "awards", "merged_files")} == {
+        "rows": 2, "row_store": "current", "people": 2, "awards": 2, "merged_files": 1,
+    }
+    assert tasks[empty]["row_store"] == "missing workbook"
+    [totals] = [e for e in events if e["event"] == "totals"]
+    assert (totals["tasks"], totals["rows"], totals["people"], totals["awards"]) == (2, 2, 2, 2)
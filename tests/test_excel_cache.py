@@ -0,0 +1,66 @@
+import os
+
+import pandas as pd
+import pytest
+
+import utils.excel_cache as excel_cache
+from utils.excel_cache import (
+    clear_cache, evict_cache, file_fingerprint, invalidate_cache, read_excel_cached
+)
+
+
+@pytest.fixture
+def workbook(write_workbook):
+    return write_workbook("task.xlsx", pd.DataFrame({"Họ và tên": ["Nguyễn Văn A"], "Năm": [2024]}))
+
+
+def _entries():
+    if not os.path.isdir(excel_cache.CACHE_DIR):
+        return []
+    return sorted(os.listdir(excel_cache.CACHE_DIR))
+
+
+def test_second_read_is_served_from_the_cache(workbook, monkeypatch):
+    first = read_excel_cached(workbook)
+    assert len(_entries()) == 1
+
+    def parse(*args, **kwargs):
+        raise AssertionError("workbook parsed again")
+    monkeypatch.setattr(excel_cache.pd, "read_excel", parse)
+    pd.testing.assert_frame_equal(read_excel_cached(workbook), first)
+
+
+def test_rewritten_workbook_gets_a_new_entry(workbook, write_workbook):
+    read_excel_cached(workbook)
+    old_entries = _entries()
+    old_hash = file_fingerprint(workbook)[3]
+
+    write_workbook("task.xlsx", pd.DataFrame({"Họ và tên": ["Trần Thị B", "Lê Văn C"], "Năm": [2023, 2024]}))
+    assert file_fingerprint(workbook)[3] != old_hash
+    assert read_excel_cached(workbook)["Họ và tên"].tolist() == ["Trần Thị B", "Lê Văn C"]
+    # The entry of the old content is replaced, not kept beside the new one
+    new_entries = _entries()
+    assert len(new_entries) == 1 and new_entries != old_entries
+
+
+def test_invalidate_and_evict(workbook, write_workbook):
+    other = write_workbook("other.xlsx", pd.DataFrame({"Họ và tên": ["Phạm Thị D"]}))
+    read_excel_cached(workbook)
+    read_excel_cached(other)
+    assert len(_entries()) == 2
+
+    invalidate_cache(workbook)
+    assert len(_entries()) == 1
+
+    read_excel_cached(workbook)
+    evict_cache(max_bytes=1)
+    assert _entries() == []
+
+    read_excel_cached(workbook)
+    clear_cache()
+    assert _entries() == []
+
+
+def test_read_arguments_bypass_the_cache(workbook):
+    assert read_excel_cached(workbook, usecols=[0]).columns.tolist() == ["Họ và tên"]
+    assert _entries() == []
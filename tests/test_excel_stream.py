@@ -0,0 +1,38 @@
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils.excel_manager import append_rows_to_excel, create_excel_template
+from utils.excel_stream import CELL_STYLE, HEADER_STYLE, iter_excel_chunks, write_excel_streaming
+
+
+def test_mixed_column_keeps_each_value_type(tmp_path):
+    path = str(tmp_path / "mixed.xlsx")
+    values = [datetime(2024, 1, 2), 1985, "Giấy khen (2023)", 5, None, 2.5]
+    write_excel_streaming(path, ["Giá trị"], [pd.DataFrame({"Giá trị": values}, dtype=object)])
+
+    ws = load_workbook(path).active
+    cells = [row[0] for row in ws.iter_rows(min_row=2)]
+    assert [cell.value for cell in cells] == values
+    # Only the date cell carries a date format
+    assert cells[0].is_date
+    assert not any(cell.is_date for cell in cells[1:])
+    assert {cell.style for cell in cells} == {CELL_STYLE}
+
+
+def test_template_and_append_share_the_task_styles(tmp_path):
+    path = str(tmp_path / "task.xlsx")
+    create_excel_template(path, ["Họ và tên", "Năm sinh"])
+    assert list(iter_excel_chunks(path)) == []
+
+    rows = pd.DataFrame({"Họ và tên": ["Nguyễn Văn A", "Trần Thị B"], "Năm sinh": [1985, None]})
+    assert append_rows_to_excel(path, [rows.iloc[:1], rows.iloc[1:]]) == 2
+    assert append_rows_to_excel(path, [pd.DataFrame({"Họ và tên": ["Lê Văn C"], "Năm sinh": [1990]})]) == 1
+
+    ws = load_workbook(path).active
+    assert [cell.style for cell in ws[1]] == [HEADER_STYLE, HEADER_STYLE]
+    assert [[cell.value for cell in row] for row in ws.iter_rows(min_row=2)] == [
+        ["Nguyễn Văn A", 1985], ["Trần Thị B", None], ["Lê Văn C", 1990],
+    ]
+    assert {cell.style for row in ws.iter_rows(min_row=2) for cell in row} == {CELL_STYLE}
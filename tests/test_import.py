@@ -0,0 +1,152 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from database import db_manager
+from database.award_catalog import award_holders
+from database.person_registry import task_name_matcher
+from models.award import Award
+from models.person import Person
+from models.task import Task
+from utils.excel_manager import _resolve_people, extract_awards, import_dataframe, import_excel_data
+
+COLUMNS = ["Họ và tên", "Danh hiệu thi đua", "Khen thưởng"]
+
+
+def _records(df):
+    return [tuple(row) for row in df.itertuples(index=False, name=None)]
+
+
+def test_extract_awards_one_row_per_person_award_year():
+    df = pd.DataFrame([
+        ["Nguyễn Văn A", "Chiến sĩ thi đua (2023)", "Giấy khen (2022)"],
+        ["Trần Thị B", None, " Giấy khen (2023) "],
+        # Same award again for A: dropped
+        ["Nguyễn Văn A", "Chiến sĩ thi đua (2023)", None],
+    ], columns=COLUMNS)
+
+    assert _records(extract_awards(df)) == [
+        ("Nguyễn Văn A", "Chiến sĩ thi đua", 2023, "Danh hiệu thi đua"),
+        ("Nguyễn Văn A", "Giấy khen", 2022, "Khen thưởng"),
+        ("Trần Thị B", "Giấy khen", 2023, "Khen thưởng"),
+    ]
+
+
+def test_extract_awards_without_year_uses_current_year():
+    df = pd.DataFrame([["Nguyễn Văn A", "Giấy khen", None]], columns=COLUMNS)
+    assert _records(extract_awards(df)) == [
+        ("Nguyễn Văn A", "Giấy khen", datetime.now().year, "Danh hiệu thi đua"),
+    ]
+
+
+@pytest.mark.parametrize("df", [
+    # Names listed, no awards yet
+    pd.DataFrame([["Nguyễn Văn A", np.nan, np.nan], ["Trần Thị B", np.nan, np.nan]], columns=COLUMNS),
+    # Awards without names
+    pd.DataFrame([[np.nan, "Giấy khen (2023)", np.nan]], columns=COLUMNS),
+])
+def test_extract_awards_sheet_without_pairs_is_empty(df):
+    awards = extract_awards(df)
+    assert awards.empty
+    assert list(awards.columns) == ["person", "award_name", "year", "category"]
+
+
+def test_extract_awards_keeps_cell_text_as_written():
+    # factorize() alone would treat 5 and 5.0 as one value
+    df = pd.DataFrame({"Họ và tên": ["A", "A"], "Điểm": pd.Series([5, 5.0], dtype=object)})
+    assert list(extract_awards(df)["award_name"]) == ["5", "5.0"]
+
+
+def _people_and_awards(task_id):
+    with db_manager.session_scope() as session:
+        people = sorted(name for (name,) in session.query(Person.name).filter(Person.task_id == task_id))
+        awards = sorted(
+            (person.name, award.name, award.year)
+            for person, award in session.query(Person, Award)
+            .join(Award, Award.person_id == Person.id).filter(Person.task_id == task_id)
+        )
+    return people, awards
+
+
+def test_import_dataframe_matches_spellings_and_is_idempotent(make_task):
+    task_id = make_task("task.xlsx")
+    df = pd.DataFrame([
+        ["Nguyễn Văn A", "Giấy khen (2023)", None],
+        ["nguyen  van a", "Chiến sĩ thi đua (2023)", None],
+        ["Trần Thị B", None, None],
+    ], columns=COLUMNS)
+
+    for _ in range(2):
+        with db_manager.session_scope() as session:
+            import_dataframe(df, session.get(Task, task_id), session)
+
+    people, awards = _people_and_awards(task_id)
+    assert people == ["Nguyễn Văn A", "Trần Thị B"]
+    assert awards == [
+        ("Nguyễn Văn A", "Chiến sĩ thi đua", 2023),
+        ("Nguyễn Văn A", "Giấy khen", 2023),
+    ]
+
+
+def test_same_title_under_two_headers_keeps_both_categories(make_task):
+    task_id = make_task("task.xlsx")
+    df = pd.DataFrame([
+        ["Nguyễn Văn A", "Giấy khen (2023)", None],
+        ["Trần Thị B", None, "Giấy khen (2023)"],
+    ], columns=COLUMNS)
+    with db_manager.session_scope() as session:
+        import_dataframe(df, session.get(Task, task_id), session)
+        categories = sorted(
+            (person.name, award.category)
+            for person, award in session.query(Person, Award).join(Award, Award.person_id == Person.id)
+        )
+        holders = award_holders(session, "Giấy khen", category=COLUMNS[2])
+        assert [person.name for person, _ in holders] == ["Trần Thị B"]
+        assert len(award_holders(session, "Giấy khen").all()) == 2
+    assert categories == [("Nguyễn Văn A", COLUMNS[1]), ("Trần Thị B", COLUMNS[2])]
+
+
+def test_import_names_without_awards(make_task):
+    task_id = make_task("task.xlsx")
+    df = pd.DataFrame([["Nguyễn Văn A", np.nan, np.nan]], columns=COLUMNS)
+    with db_manager.session_scope() as session:
+        import_dataframe(df, session.get(Task, task_id), session)
+    assert _people_and_awards(task_id) == (["Nguyễn Văn A"], [])
+
+
+def test_resolve_people_links_identities_across_tasks(make_task):
+    first, second = make_task("a.xlsx"), make_task("b.xlsx")
+    with db_manager.session_scope() as session:
+        ids_a = _resolve_people(session, first, ["Nguyễn Văn A"])
+        ids_b = _resolve_people(session, second, ["NGUYỄN VĂN A"])
+        identities = {
+            session.get(Person, ids_a["Nguyễn Văn A"]).identity_id,
+            session.get(Person, ids_b["NGUYỄN VĂN A"]).identity_id,
+        }
+    assert len(identities) == 1 and None not in identities
+
+
+def test_resolve_people_fuzzy_match(make_task):
+    task_id = make_task("task.xlsx")
+    with db_manager.session_scope() as session:
+        existing = _resolve_people(session, task_id, ["Nguyễn Văn Thành"])["Nguyễn Văn Thành"]
+        matcher = task_name_matcher(session, task_id, 0.6)
+        typo = _resolve_people(session, task_id, ["Nguyễn Văn Thàng"], matcher)
+        unrelated = _resolve_people(session, task_id, ["Lê Thị Hoa"], matcher)
+    assert typo["Nguyễn Văn Thàng"] == existing
+    assert unrelated["Lê Thị Hoa"] != existing
+
+
+def test_import_excel_data_chunked_equals_whole(make_task, write_workbook):
+    df = pd.DataFrame(
+        [[f"Người {i % 7}", f"Giấy khen ({2015 + i % 5})", None] for i in range(40)], columns=COLUMNS
+    )
+    path = write_workbook("input.xlsx", df)
+    whole, chunked = make_task("a.xlsx"), make_task("b.xlsx")
+    with db_manager.session_scope() as session:
+        import_excel_data(path, session.get(Task, whole), session)
+        import_excel_data(path, session.get(Task, chunked), session, chunk_size=6)
+    assert _people_and_awards(whole) == _people_and_awards(chunked)
+    assert len(_people_and_awards(whole)[1]) == 35
@@ -0,0 +1,188 @@
+import pandas as pd
+import pytest
+
+from database import db_manager
+from database.task_rows import load_rows, rows_current
+from models.merge_ledger import MergeLedgerEntry
+from models.task import Task
+from utils.excel_cache import file_fingerprint
+import utils.excel_manager as excel_manager
+from utils.excel_manager import MergeCancelled, create_excel_template, merge_incremental
+
+COLUMNS = ["Họ và tên", "Danh hiệu"]
+
+
+@pytest.fixture
+def template(tmp_path):
+    path = str(tmp_path / "task.xlsx")
+    create_excel_template(path, COLUMNS)
+    return path
+
+
+@pytest.fixture
+def team_files(write_workbook):
+    return [
+        write_workbook("doi1.xlsx", pd.DataFrame({
+            "Họ và tên": ["Nguyễn Văn A", "Trần Thị B"],
+            "Danh hiệu": ["CSTĐ", "LĐTT"],
+        })),
+        write_workbook("doi2.xlsx", pd.DataFrame({
+            "Họ và tên": ["Lê Văn C"],
+            "Danh hiệu": ["CSTĐ"],
+        })),
+    ]
+
+
+def _merge(task_id, files, **kwargs):
+    with db_manager.session_scope() as session:
+        task = session.get(Task, task_id)
+        return merge_incremental(task, files, session, **kwargs)
+
+
+def _assert_store_mirrors(task_id, workbook):
+    saved = pd.read_excel(workbook)
+    with db_manager.session_scope() as session:
+        assert rows_current(session, task_id, file_fingerprint(workbook)[3])
+        stored = load_rows(session, task_id)
+    assert list(stored.columns) == list(saved.columns)
+    assert stored.astype(str).values.tolist() == saved.astype(str).values.tolist()
+    return saved
+
+
+def _ledger_size(task_id):
+    with db_manager.session_scope() as session:
+        return session.query(MergeLedgerEntry).filter(MergeLedgerEntry.task_id == task_id).count()
+
+
+def test_first_merge_into_fresh_template_seeds_row_store(template, team_files, make_task):
+    task_id = make_task(template)
+    result = _merge(task_id, team_files)
+    assert result["merged"] == team_files
+    assert result["rows"] == 3
+
+    saved = _assert_store_mirrors(task_id, template)
+    assert saved["Họ và tên"].tolist() == ["Nguyễn Văn A", "Trần Thị B", "Lê Văn C"]
+    assert _ledger_size(task_id) == 2
+
+
+def test_remerge_skips_ledgered_files_and_appends_new_ones(template, team_files, make_task):
+    task_id = make_task(template)
+    _merge(task_id, team_files[:1])
+
+    result = _merge(task_id, team_files)
+    assert result["skipped"] == team_files[:1]
+    assert result["merged"] == team_files[1:]
+    assert result["rows"] == 1
+
+    saved = _assert_store_mirrors(task_id, template)
+    assert len(saved) == 3
+    assert _ledger_size(task_id) == 2
+
+    # Nothing new: the workbook and the store stay as they are
+    assert _merge(task_id, team_files)["rows"] == 0
+    assert len(_assert_store_mirrors(task_id, template)) == 3
+
+
+def test_first_merge_keeps_rows_typed_into_the_workbook(write_workbook, team_files, make_task):
+    workbook = write_workbook("task.xlsx", pd.DataFrame({
+        "Họ và tên": ["Phạm Thị D"],
+        "Danh hiệu": ["LĐTT"],
+    }))
+    task_id = make_task(workbook)
+    _merge(task_id, team_files[1:])
+
+    saved = _assert_store_mirrors(task_id, workbook)
+    assert saved["Họ và tên"].tolist() == ["Phạm Thị D", "Lê Văn C"]
+
+
+def test_changed_copy_of_a_merged_file_adds_only_its_new_rows(template, team_files, write_workbook, make_task):
+    task_id = make_task(template)
+    _merge(task_id, team_files[:1])
+
+    # The team sends its sheet again with one more row at the end
+    write_workbook("doi1.xlsx", pd.DataFrame({
+        "Họ và tên": ["Nguyễn Văn A", "Trần Thị B", "Phạm Thị D"],
+        "Danh hiệu": ["CSTĐ", "LĐTT", "LĐTT"],
+    }))
+    result = _merge(task_id, team_files[:1])
+    assert result["merged"] == team_files[:1]
+    assert result["rows"] == 1
+
+    saved = _assert_store_mirrors(task_id, template)
+    assert saved["Họ và tên"].tolist() == ["Nguyễn Văn A", "Trần Thị B", "Phạm Thị D"]
+    assert _ledger_size(task_id) == 2
+
+    # A copy without new rows is recorded but appends nothing
+    write_workbook("doi1.xlsx", pd.DataFrame({
+        "Họ và tên": ["Nguyễn Văn A", "Trần Thị B", "Phạm Thị D"],
+        "Danh hiệu": ["CSTĐ", "LĐTT", "CSTĐ"],
+    }))
+    assert _merge(task_id, team_files[:1])["rows"] == 0
+    assert len(_assert_store_mirrors(task_id, template)) == 3
+    assert _ledger_size(task_id) == 3
+
+
+def _people(count, start=0):
+    return pd.DataFrame({
+        "Họ và tên": [f"Cán bộ {number}" for number in range(start, start + count)],
+        "Danh hiệu": ["LĐTT"] * count,
+    })
+
+
+def test_files_are_streamed_in_chunks(template, write_workbook, make_task, monkeypatch):
+    monkeypatch.setattr(excel_manager, "IMPORT_BATCH_ROWS", 2)
+    task_id = make_task(template)
+    report = write_workbook("doi1.xlsx", _people(3))
+    _merge(task_id, [report, write_workbook("doi2.xlsx", _people(2, start=10))])
+
+    # The re-sent copy continues inside the second chunk
+    write_workbook("doi1.xlsx", _people(7))
+    progress = []
+    result = _merge(task_id, [report], progress=lambda *event: progress.append(event))
+    assert result["rows"] == 4
+    assert progress[-1] == ("write", 1, 1)
+
+    saved = _assert_store_mirrors(task_id, template)
+    assert saved["Họ và tên"].tolist() == (
+        _people(3)["Họ và tên"].tolist() + _people(2, start=10)["Họ và tên"].tolist()
+        + _people(4, start=3)["Họ và tên"].tolist()
+    )
+
+
+def test_cancelled_merge_leaves_workbook_and_database_unchanged(template, team_files, make_task, monkeypatch):
+    monkeypatch.setattr(excel_manager, "IMPORT_BATCH_ROWS", 1)
+    task_id = make_task(template)
+    _merge(task_id, team_files[:1])
+    with open(template, "rb") as f:
+        before = f.read()
+
+    checks = []
+
+    def cancel_late():
+        # Let the first chunk of the new file through, then cancel
+        checks.append(None)
+        return len(checks) > 2
+
+    session = db_manager.get_session()
+    try:
+        with pytest.raises(MergeCancelled):
+            merge_incremental(session.get(Task, task_id), team_files, session, is_cancelled=cancel_late)
+        session.rollback()
+    finally:
+        session.close()
+
+    with open(template, "rb") as f:
+        assert f.read() == before
+    assert len(_assert_store_mirrors(task_id, template)) == 2
+    assert _ledger_size(task_id) == 1
+
+
+def test_unreadable_file_is_reported_and_left_out(template, team_files, tmp_path, make_task):
+    broken = tmp_path / "hong.xlsx"
+    broken.write_bytes(b"not a workbook")
+    task_id = make_task(template)
+
+    result = _merge(task_id, [str(broken)] + team_files)
+    assert [file for file, _ in result["failed"]] == [str(broken)]
+    assert result["merged"] == team_files
+    assert len(_assert_store_mirrors(task_id, template)) == 3
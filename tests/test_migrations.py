@@ -0,0 +1,139 @@
+from sqlalchemy import create_engine, text
+
+from database import db_manager
+from database.migrations import SCHEMA_VERSION, get_schema_version, upgrade_db
+
+# Schema of data.db files written before the first migration
+BASELINE_SCHEMA = [
+    """CREATE TABLE tasks (
+        id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, year INTEGER NOT NULL,
+        unit VARCHAR(255) NOT NULL, description TEXT, excel_path VARCHAR(512) NOT NULL,
+        created_at DATE NOT NULL)""",
+    """CREATE TABLE people (
+        id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL,
+        task_id INTEGER NOT NULL REFERENCES tasks (id))""",
+    """CREATE TABLE awards (
+        id INTEGER NOT NULL PRIMARY KEY, name VARCHAR(255) NOT NULL, year INTEGER NOT NULL,
+        person_id INTEGER NOT NULL REFERENCES people (id))""",
+]
+
+
+def _create_baseline_db(path):
+    engine = create_engine(f"sqlite:///{path}")
+    with engine.begin() as connection:
+        for statement in BASELINE_SCHEMA:
+            connection.execute(text(statement))
+        connection.execute(text(
+            "INSERT INTO tasks VALUES (1, 'Đồng Nai', 2023, 'Công an tỉnh', NULL, 'a.xlsx', '2023-01-01')"
+        ))
+        # Person 2 duplicates person 1; award 3 duplicates award 1
+        connection.execute(text(
+            "INSERT INTO people VALUES (1, 'Nguyễn Văn A', 1), (2, 'Nguyễn Văn A', 1), (3, 'Trần Thị B', 1)"
+        ))
+        connection.execute(text("""
+            INSERT INTO awards VALUES
+                (1, 'Giấy khen', 2023, 1), (2, 'Chiến sĩ thi đua', 2023, 1),
+                (3, 'Giấy khen', 2023, 2), (4, 'Giấy khen', 2022, 3)
+        """))
+    engine.dispose()
+
+
+def _scalar(connection, sql):
+    return connection.execute(text(sql)).scalar()
+
+
+def test_new_database_is_at_current_version(db):
+    with db.connect() as connection:
+        assert get_schema_version(connection) == SCHEMA_VERSION
+    assert upgrade_db(db) == []
+
+
+def test_baseline_database_is_upgraded_in_place(db_path):
+    _create_baseline_db(db_path)
+    db_manager.configure_engine(db_path)
+    try:
+        db_manager.init_db()
+        with db_manager.engine.connect() as connection:
+            assert get_schema_version(connection) == SCHEMA_VERSION
+
+            # v1: duplicate people and awards merged into the oldest rows
+            assert _scalar(connection, "SELECT COUNT(*) FROM people") == 2
+            awards = connection.execute(text("""
+                SELECT people.name, award_catalog.name, awards.year FROM awards
+                JOIN people ON people.id = awards.person_id
+                JOIN award_catalog ON award_catalog.id = awards.catalog_id
+                ORDER BY awards.id
+            """)).fetchall()
+            # v3: titles moved into the catalog
+            assert [tuple(row) for row in awards] == [
+                ("Nguyễn Văn A", "Giấy khen", 2023),
+                ("Nguyễn Văn A", "Chiến sĩ thi đua", 2023),
+                ("Trần Thị B", "Giấy khen", 2022),
+            ]
+            assert _scalar(connection, "SELECT COUNT(*) FROM award_catalog") == 2
+            # v8: titles are unique per column header
+            assert _scalar(connection, "SELECT sql FROM sqlite_master WHERE name = 'ix_award_catalog_name'") is None
+            assert _scalar(
+                connection, "SELECT 1 FROM sqlite_master WHERE name = 'ix_award_catalog_name_category'"
+            ) == 1
+
+            # v2: existing tasks are in the FTS index, searchable without diacritics
+            assert _scalar(connection, "SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'dong nai'") == 1
+
+            # v4: every person linked to an identity
+            assert _scalar(connection, "SELECT COUNT(*) FROM people WHERE identity_id IS NULL") == 0
+
+            # v6: row store column, empty until the task is opened
+            assert _scalar(connection, "SELECT rows_source_hash FROM tasks WHERE id = 1") is None
+    finally:
+        db_manager.configure_engine(db_manager.DB_PATH)
+
+
+def _fts_name(connection, task_id):
+    return _scalar(connection, f"SELECT name FROM tasks_fts WHERE rowid = {task_id}")
+
+
+def test_fts_reindexes_only_on_indexed_columns(db, make_task):
+    task_id = make_task("a.xlsx", name="Đồng Nai")
+    with db.begin() as connection:
+        # Marker: survives as long as the trigger leaves the row alone
+        connection.execute(text(f"UPDATE tasks_fts SET name = 'marker' WHERE rowid = {task_id}"))
+        connection.execute(text(f"UPDATE tasks SET rows_source_hash = 'abc' WHERE id = {task_id}"))
+        assert _fts_name(connection, task_id) == "marker"
+
+        connection.execute(text(f"UPDATE tasks SET name = 'Bình Dương' WHERE id = {task_id}"))
+        assert _scalar(connection, "SELECT rowid FROM tasks_fts WHERE tasks_fts MATCH 'binh duong'") == task_id
+
+
+def test_fts_update_trigger_is_narrowed_by_upgrade(db):
+    with db.begin() as connection:
+        # The trigger as version 6 databases have it
+        connection.execute(text("DROP TRIGGER tasks_fts_au"))
+        connection.execute(text("""
+            CREATE TRIGGER tasks_fts_au AFTER UPDATE ON tasks BEGIN
+                DELETE FROM tasks_fts WHERE rowid = old.id;
+            END
+        """))
+        connection.execute(text("PRAGMA user_version = 6"))
+
+    assert upgrade_db(db) == [7, 8, 9]
+    with db.connect() as connection:
+        trigger_sql = _scalar(connection, "SELECT sql FROM sqlite_master WHERE name = 'tasks_fts_au'")
+    assert "UPDATE OF name, unit, description" in trigger_sql
+
+
+def test_row_search_text_is_dropped_by_upgrade(db, make_task):
+    task_id = make_task("a.xlsx")
+    with db.begin() as connection:
+        # task_rows as version 8 databases have it
+        connection.execute(text("ALTER TABLE task_rows ADD COLUMN search_text TEXT NOT NULL DEFAULT ''"))
+        connection.execute(text(
+            f"INSERT INTO task_rows (task_id, position, data, search_text) VALUES ({task_id}, 0, '[1]', '1')"
+        ))
+        connection.execute(text("PRAGMA user_version = 8"))
+
+    assert upgrade_db(db) == [9]
+    with db.connect() as connection:
+        columns = {row[1] for row in connection.execute(text("PRAGMA table_info(task_rows)"))}
+        assert "search_text" not in columns
+        assert _scalar(connection, "SELECT data FROM task_rows") == "[1]"
@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.search_index import SearchIndex
+
+
+@pytest.fixture
+def index():
+    return SearchIndex(pd.DataFrame({
+        "Họ và tên": ["Nguyễn Văn An", "Trần Thị Bình", "Lê Văn Chi", None],
+        "Chức vụ": ["Đội trưởng", "Cán bộ", "cán bộ", "Cán bộ"],
+        "Năm sinh": [1980, 1985, 1990, 1995],
+    }))
+
+
+def _rows(mask):
+    return np.flatnonzero(mask).tolist()
+
+
+def test_empty_query_selects_every_row(index):
+    assert _rows(index.filter()) == [0, 1, 2, 3]
+
+
+def test_global_search_ignores_case_unless_asked(index):
+    assert _rows(index.filter(global_term="CÁN BỘ")) == [1, 2, 3]
+    assert _rows(index.filter(global_term="Cán bộ", case_sensitive=True)) == [1, 3]
+
+
+def test_global_search_matches_any_cell_but_not_across_cells(index):
+    assert _rows(index.filter(global_term="1985")) == [1]
+    # The row text joins cells with a separator nobody types
+    assert _rows(index.filter(global_term="An Đội")) == []
+
+
+def test_exact_match_needs_the_whole_cell(index):
+    assert _rows(index.filter(global_term="Cán", exact_match=True)) == []
+    assert _rows(index.filter(global_term="cán bộ", exact_match=True)) == [1, 2, 3]
+    # The detail view limits exact match to the column filter
+    assert _rows(index.filter(global_term="Văn", exact_match=True, global_exact_match=False)) == [0, 2]
+
+
+def test_column_filter_combines_with_global_search(index):
+    assert _rows(index.filter(column="Chức vụ", column_term="bộ")) == [1, 2, 3]
+    assert _rows(index.filter(global_term="Văn", column="Chức vụ", column_term="bộ")) == [2]
+    assert _rows(index.filter(column="Năm sinh", column_term="1990", exact_match=True)) == [2]
+    # A missing cell is empty text, not "None"
+    assert _rows(index.filter(column="Họ và tên", column_term="none")) == []
+
+
+def test_approximate_search_ignores_diacritics_and_matches_similar_names(index):
+    assert _rows(index.filter(global_term="doi truong", approximate=True)) == [0]
+    assert _rows(index.filter(column="Họ và tên", column_term="tran thi binh",
+                              exact_match=True, approximate=True)) == [1]
+    # A typo in the name column still finds the person
+    assert 1 in _rows(index.filter(column="Họ và tên", column_term="Trần Thị Bìn", approximate=True))
+
+
+def test_edits_and_deletes_are_reindexed(index):
+    frame = pd.DataFrame({
+        "Họ và tên": ["Nguyễn Văn An", "Trần Thị Bình", "Lê Văn Chi", None],
+        "Chức vụ": ["Đội trưởng", "Đội phó", "cán bộ", "Cán bộ"],
+        "Năm sinh": [1980, 1985, 1990, 1995],
+    })
+    index.filter(global_term="doi", approximate=True)  # builds the folded text
+    index.update_row(1, frame)
+    assert _rows(index.filter(global_term="đội phó")) == [1]
+    assert _rows(index.filter(global_term="doi pho", approximate=True)) == [1]
+
+    index.remove_row(0)
+    assert index.row_count == 3
+    assert _rows(index.filter(global_term="đội")) == [0]
+    assert _rows(index.filter(global_term="cán bộ")) == [1, 2]
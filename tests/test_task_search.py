@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import select
+
+from database import db_manager
+from database.fts import build_fts_query, task_fts_available, task_search_subquery
+from models.task import Task
+
+
+@pytest.fixture
+def tasks(db, make_task):
+    return {
+        "dong_nai": make_task("a.xlsx", name="Thi đua Đồng Nai", unit="Công an tỉnh"),
+        "binh_duong": make_task("b.xlsx", name="Khen thưởng Bình Dương", unit="Phòng PV01"),
+        "cong_tac": make_task("c.xlsx", name="Tổng kết công tác", unit="Đội Đồng Nai"),
+    }
+
+
+def _search(term):
+    """Matching task ids, best match first."""
+    search = task_search_subquery(term)
+    with db_manager.session_scope() as session:
+        assert task_fts_available(session)
+        rows = session.execute(
+            select(Task.id).join(search, search.c.task_id == Task.id).order_by(search.c.rank, Task.id)
+        ).all()
+    return [task_id for (task_id,) in rows]
+
+
+def test_fts_query_is_a_prefix_match_of_every_word():
+    # Only đ is replaced here; the tokenizer folds the other diacritics
+    assert build_fts_query("Đồng nai") == '"Dồng"* "nai"*'
+    assert build_fts_query(" - ") is None
+    assert task_search_subquery("!!") is None
+
+
+def test_search_ignores_case_and_diacritics(tasks):
+    assert _search("binh duong") == [tasks["binh_duong"]]
+    assert _search("KHEN THƯỞNG") == [tasks["binh_duong"]]
+    assert _search("cong an") == [tasks["dong_nai"]]
+
+
+def test_words_are_prefixes_and_must_all_match(tasks):
+    assert _search("pv0") == [tasks["binh_duong"]]
+    assert _search("tong ket dong") == [tasks["cong_tac"]]
+    assert _search("thi dua binh") == []
+
+
+def test_name_hits_rank_above_unit_hits(tasks):
+    assert _search("dong nai") == [tasks["dong_nai"], tasks["cong_tac"]]
+
+
+def test_new_and_deleted_tasks_follow_the_index(tasks, make_task):
+    added = make_task("d.xlsx", name="Sơ kết Long An")
+    assert _search("long an") == [added]
+    with db_manager.session_scope() as session:
+        session.delete(session.get(Task, added))
+    assert _search("long an") == []
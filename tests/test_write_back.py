@@ -0,0 +1,68 @@
+import pandas as pd
+import pytest
+
+from database import db_manager
+from database.task_rows import load_rows, rows_current
+from utils.excel_cache import file_fingerprint
+from utils.task_dataset import TaskDataset, save_row_patches
+
+
+@pytest.fixture
+def workbook(write_workbook):
+    return write_workbook("task.xlsx", pd.DataFrame({
+        "Họ và tên": ["Nguyễn Văn A", "Trần Thị B", "Lê Văn C", "Phạm Thị D"],
+        "Năm sinh": [1980, 1985, 1990, 1995],
+        "Chức vụ": ["Đội trưởng", "Cán bộ", "Cán bộ", "Phó đội trưởng"],
+    }))
+
+
+def _edit(dataset):
+    dataset.update_row(1, {1: "1986", 2: "Đội phó"})
+    dataset.delete_row(0)
+    # Text typed into the numeric column
+    dataset.update_row(2, {1: "không rõ"})
+
+
+def test_edits_are_written_to_workbook_and_row_store(workbook, make_task):
+    task_id = make_task(workbook)
+    dataset = TaskDataset(workbook, task_id)
+    dataset.load()
+    _edit(dataset)
+    assert dataset.pending_count() == 3
+    assert dataset.save() == 3
+    assert dataset.pending_count() == 0
+
+    saved = pd.read_excel(workbook)
+    assert saved["Họ và tên"].tolist() == ["Trần Thị B", "Lê Văn C", "Phạm Thị D"]
+    assert saved["Năm sinh"].tolist() == [1986, 1990, "không rõ"]
+    assert saved["Chức vụ"].tolist() == ["Đội phó", "Cán bộ", "Phó đội trưởng"]
+
+    with db_manager.session_scope() as session:
+        assert rows_current(session, task_id, file_fingerprint(workbook)[3])
+        stored = load_rows(session, task_id)
+    assert stored.astype(str).values.tolist() == saved.astype(str).values.tolist()
+
+    # A fresh load reads the store and sees the same rows
+    assert TaskDataset(workbook, task_id).load().astype(str).values.tolist() == saved.astype(str).values.tolist()
+
+
+def test_unchanged_text_records_no_edit(workbook):
+    dataset = TaskDataset(workbook)
+    dataset.load()
+    assert dataset.update_row(0, {0: "Nguyễn Văn A", 1: "1980"}) == {}
+    assert dataset.save() == 0
+
+
+def test_stale_row_store_is_left_for_a_rebuild(workbook, make_task, write_workbook):
+    task_id = make_task(workbook)
+    dataset = TaskDataset(workbook, task_id)
+    dataset.load()
+    patches = [("update", 0, {2: "Trưởng phòng"})]
+
+    # The workbook changes outside the application before the edit is saved
+    write_workbook("task.xlsx", pd.DataFrame({"Họ và tên": ["X"], "Năm sinh": [2000], "Chức vụ": ["Y"]}))
+    save_row_patches(workbook, task_id, patches)
+
+    with db_manager.session_scope() as session:
+        assert not rows_current(session, task_id, file_fingerprint(workbook)[3])
+    assert TaskDataset(workbook, task_id).load().values.tolist() == [["X", 2000, "Trưởng phòng"]]
@@ -0,0 +1,35 @@
+from PySide6.QtCore import QObject, QRunnable, Signal
+
+
+class WarmUpSignals(QObject):
+    """Signals emitted by a DatabaseWarmUp (QRunnable cannot emit by itself)."""
+    ready = Signal()
+    failed = Signal(str)
+
+
+class DatabaseWarmUp(QRunnable):
+    """
+    Creates/upgrades the tables and opens a pooled connection on a pool thread.
+
+    Migrations (and the VACUUM some of them run) can take seconds on a large
+    database; running them here keeps the freshly painted window responsive.
+    Exactly one of the signals is emitted.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.signals = WarmUpSignals()
+
+    def run(self):
+        # Imported here: SQLAlchemy and the models are not needed for the first paint
+        from sqlalchemy import text
+        from database.db_manager import ensure_db, session_scope
+
+        try:
+            ensure_db()
+            with session_scope() as session:
+                session.execute(text("SELECT 1"))
+        except Exception as e:
+            self.signals.failed.emit(str(e))
+            return
+        self.signals.ready.emit()
@@ -0,0 +1,148 @@
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from utils.task_dataset import sort_positions
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """
+    Read-only table model serving cells straight from a pandas DataFrame.
+
+    Cells are produced on demand in data(), so only the rows the view actually
+    paints are ever converted to text. Filtering and sorting never copy the
+    DataFrame: the model keeps an array of row positions into it and the view
+    shows exactly those rows, in that order.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._df = None
+        self._values = []
+        self._headers = []
+        self._filter_rows = np.arange(0)
+        self._rows = np.arange(0)
+        self._sort_column = -1
+        self._sort_order = Qt.AscendingOrder
+
+    def set_dataframe(self, dataframe):
+        """Show a new DataFrame, clearing any row filter."""
+        self.beginResetModel()
+        self._df = dataframe
+        if dataframe is None:
+            self._values = []
+            self._headers = []
+            self._filter_rows = np.arange(0)
+        else:
+            # One object array per column so data() is a plain array lookup
+            self._values = [dataframe.iloc[:, col].to_numpy(dtype=object)
+                            for col in range(len(dataframe.columns))]
+            self._headers = [str(column) for column in dataframe.columns]
+            self._filter_rows = np.arange(len(dataframe))
+        self._rows = self._sorted(self._filter_rows)
+        self.endResetModel()
+
+    def set_rows(self, positions):
+        """Restrict the view to the given row positions of the DataFrame."""
+        self.beginResetModel()
+        self._filter_rows = np.asarray(positions, dtype=np.int64)
+        self._rows = self._sorted(self._filter_rows)
+        self.endResetModel()
+
+    def set_row_mask(self, mask):
+        """Restrict the view to the rows where a boolean mask is True."""
+        self.set_rows(np.flatnonzero(np.asarray(mask, dtype=bool)))
+
+    def _view_row(self, position):
+        """View row showing a DataFrame position, or -1 if it is filtered out."""
+        rows = np.flatnonzero(self._rows == position)
+        return int(rows[0]) if len(rows) else -1
+
+    def update_source_row(self, position):
+        """Re-read one edited DataFrame row, repainting only that row."""
+        for col, values in enumerate(self._values):
+            values[position] = self._df.iat[position, col]
+
+        if self._sort_column >= 0:
+            # The edit may move the row within the current sort order
+            self.sort(self._sort_column, self._sort_order)
+            return
+        row = self._view_row(position)
+        if row >= 0:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self._headers) - 1))
+
+    def remove_source_row(self, position, dataframe):
+        """
+        Drop one row without resetting the model.
+
+        Args:
+            position: Position of the removed row in the previous DataFrame
+            dataframe: The DataFrame after the row was dropped (re-indexed)
+        """
+        row = self._view_row(position)
+        if row >= 0:
+            self.beginRemoveRows(QModelIndex(), row, row)
+        self._df = dataframe
+        self._values = [np.delete(values, position) for values in self._values]
+        # Later rows move up by one position
+        filter_rows = self._filter_rows[self._filter_rows != position]
+        self._filter_rows = filter_rows - (filter_rows > position)
+        rows = self._rows[self._rows != position]
+        self._rows = rows - (rows > position)
+        if row >= 0:
+            self.endRemoveRows()
+
+    def source_row(self, row):
+        """Map a view row to its position in the DataFrame."""
+        return int(self._rows[row])
+
+    def visible_positions(self):
+        """Return the DataFrame positions of the rows currently shown, in view order."""
+        return self._rows.copy()
+
+    def visible_dataframe(self):
+        """Return the rows currently shown as a DataFrame slice with original dtypes."""
+        if self._df is None:
+            return pd.DataFrame()
+        return self._df.iloc[self._rows]
+
+    def dataframe(self):
+        return self._df
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self._headers)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        value = self._values[index.column()][self._rows[index.row()]]
+        return str(value) if pd.notna(value) else ""
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        """Sort the visible rows by a column without touching the DataFrame."""
+        self.layoutAboutToBeChanged.emit()
+        self._sort_column = column
+        self._sort_order = order
+        self._rows = self._sorted(self._filter_rows)
+        self.layoutChanged.emit()
+
+    def _sorted(self, positions):
+        """Order row positions by the current sort column, if any."""
+        if self._sort_column < 0 or self._sort_column >= len(self._values):
+            return positions
+        return sort_positions(self._values[self._sort_column], positions,
+                              self._sort_order == Qt.AscendingOrder)
@@ -0,0 +1,39 @@
+from PySide6.QtCore import QObject, Signal
+
+
+class DomainEvents(QObject):
+    """
+    Application-wide notifications about changed data.
+
+    Widgets that change tasks emit here; views subscribe and apply just the
+    change instead of reloading everything. Every event bumps `version`, so a
+    view that remembers the version it last synced to can tell whether it is
+    stale without touching the database.
+    """
+
+    task_created = Signal(int)
+    task_updated = Signal(int)
+    task_deleted = Signal(int)
+    # People/awards of a task changed (merge or import)
+    import_finished = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.version = 0
+        # Connected first, so subscribers already see the new version
+        for signal in (self.task_created, self.task_updated, self.task_deleted, self.import_finished):
+            signal.connect(self._bump)
+
+    def _bump(self, task_id):
+        self.version += 1
+
+
+_events = None
+
+
+def domain_events():
+    """Return the shared event bus, creating it on first use."""
+    global _events
+    if _events is None:
+        _events = DomainEvents()
+    return _events
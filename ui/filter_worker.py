@@ -0,0 +1,105 @@
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+# Delay after the last keystroke before a filter is started
+DEBOUNCE_MS = 250
+
+
+class FilterSignals(QObject):
+    """Signals emitted by a FilterTask (QRunnable cannot emit by itself)."""
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class FilterTask(QRunnable):
+    """Runs one SearchIndex.filter query on a pool thread."""
+
+    def __init__(self, generation, search_index, query, is_current):
+        super().__init__()
+        self.generation = generation
+        self.search_index = search_index
+        self.query = query
+        self.is_current = is_current
+        self.signals = FilterSignals()
+
+    def run(self):
+        if not self.is_current(self.generation):
+            return
+        try:
+            mask = self.search_index.filter(
+                is_cancelled=lambda: not self.is_current(self.generation),
+                **self.query
+            )
+        except Exception as e:
+            self.signals.failed.emit(self.generation, str(e))
+            return
+        if mask is not None:
+            self.signals.finished.emit(self.generation, mask)
+
+
+class BackgroundFilter(QObject):
+    """
+    Debounced, cancellable filtering of a SearchIndex off the GUI thread.
+
+    schedule() restarts a short timer on every keystroke. When the timer
+    fires, snapshot() is called on the GUI thread to collect the current
+    (search_index, query) and the query runs on a single worker thread. Every
+    new query supersedes the previous one: stale tasks stop at their next
+    cancellation check and their results are dropped, so only the latest
+    mask is ever delivered through `finished`.
+    """
+
+    finished = Signal(object)
+    failed = Signal(str)
+
+    def __init__(self, snapshot, delay_ms=DEBOUNCE_MS, parent=None):
+        super().__init__(parent)
+        self.snapshot = snapshot
+        self._generation = 0
+        # Signals of the latest task; the thread pool owns the task itself
+        self._signals = None
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.run_now)
+
+        # One thread: a newer query waits behind the previous one, which
+        # notices it is stale and stops, instead of competing for the CPU
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def schedule(self):
+        """Start (or restart) the debounce timer."""
+        self._timer.start()
+
+    def run_now(self):
+        """Start filtering immediately with the current query."""
+        self._timer.stop()
+        self.cancel()
+
+        snapshot = self.snapshot()
+        if snapshot is None:
+            return
+        search_index, query = snapshot
+
+        task = FilterTask(self._generation, search_index, query, self.is_current)
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        self._signals = task.signals
+        self._pool.start(task)
+
+    def cancel(self):
+        """Invalidate any pending or running query."""
+        self._timer.stop()
+        self._generation += 1
+
+    def is_current(self, generation):
+        return generation == self._generation
+
+    def _on_finished(self, generation, mask):
+        if self.is_current(generation):
+            self.finished.emit(mask)
+
+    def _on_failed(self, generation, message):
+        if self.is_current(generation):
+            self.failed.emit(message)
@@ -5,23 +5,47 @@ from PySide6.QtWidgets import (
     QPushButton, QLabel, QMessageBox, QComboBox, QLineEdit
 )
 from PySide6.QtGui import QColor, QPalette, QFont, QIcon
-from PySide6.QtCore import Qt
-
-from ui.task_creation import TaskCreationWidget
-from ui.task_merge import TaskMergeWidget
-from ui.task_list import TaskListWidget
+from PySide6.QtCore import Qt, QThreadPool, QTimer, Signal
 
 # Define color scheme
 PRIMARY_COLOR = "#4CAF50"  # Green
 SECONDARY_COLOR = "#FFFFFF"  # White
 ACCENT_COLOR = "#2E7D32"  # Dark Green
 
+# (thuộc tính, tiêu đề) của các tab theo thứ tự; widget được tạo khi mở tab lần đầu
+TABS = (
+    ("task_creation_tab", "Tạo Nhiệm Vụ"),
+    ("task_merge_tab", "Trộn File"),
+    ("task_list_tab", "Danh Sách Nhiệm Vụ"),
+)
+
 class MainWindow(QMainWindow):
-    """Main application window with tabs for different functionalities."""
+    """
+    Main application window with tabs for different functionalities.
+    
+    Only the first tab is built before the window is shown; the others (and
+    the pandas/openpyxl/SQLAlchemy code behind them) are loaded when they are
+    opened for the first time. The database is initialized on a pool thread
+    right after the first paint; a tab that needs it earlier waits for it.
+    """
+    
+    # Emitted once, after the window was painted for the first time
+    first_painted = Signal()
+    # Emitted once the database is initialized and connected
+    database_ready = Signal()
+    # Emitted instead of database_ready when the initialization failed
+    database_failed = Signal(str)
     
     def __init__(self):
         super().__init__()
         
+        self.painted = False
+        self.database_warm = False
+        self.database_warm_up = None
+        self.task_creation_tab = None
+        self.task_merge_tab = None
+        self.task_list_tab = None
+        
         self.setWindowTitle("Quản Lý Nhiệm Vụ - Công An")
         self.setMinimumSize(1000, 700)
         self.setup_ui()
@@ -51,18 +75,14 @@ class MainWindow(QMainWindow):
         # Create tab widget
         self.tab_widget = QTabWidget()
         
-        # Create tabs
-        self.task_creation_tab = TaskCreationWidget()
-        self.task_merge_tab = TaskMergeWidget()
-        self.task_list_tab = TaskListWidget()
-        
-        # Connect signals between tabs
-        self.task_creation_tab.task_created.connect(self.on_task_created)
+        # Mỗi tab là một trang trống, widget thật được đặt vào khi mở lần đầu
+        for _, title in TABS:
+            page = QWidget()
+            QVBoxLayout(page).setContentsMargins(0, 0, 0, 0)
+            self.tab_widget.addTab(page, title)
+        self.ensure_tab(0)
         
-        # Add tabs to tab widget
-        self.tab_widget.addTab(self.task_creation_tab, "Tạo Nhiệm Vụ")
-        self.tab_widget.addTab(self.task_merge_tab, "Trộn File")
-        self.tab_widget.addTab(self.task_list_tab, "Danh Sách Nhiệm Vụ")
+        # Các tab tự cập nhật qua domain_events() khi dữ liệu thay đổi
         
         # Connect tab change signal to handle tab switching
         self.tab_widget.currentChanged.connect(self.on_tab_changed)
@@ -76,25 +96,89 @@ class MainWindow(QMainWindow):
         
         main_layout.addLayout(footer_layout)
     
+    def ensure_tab(self, index):
+        """Build the widget of a tab if it was not opened before; returns it."""
+        attribute = TABS[index][0]
+        widget = getattr(self, attribute)
+        if widget is not None:
+            return widget
+        
+        if index == 0:
+            # Tab tạo nhiệm vụ chỉ cần CSDL khi lưu nên không chờ khởi tạo
+            from ui.task_creation import TaskCreationWidget
+            widget = TaskCreationWidget()
+        else:
+            self.require_database()
+            if index == 1:
+                from ui.task_merge import TaskMergeWidget
+                widget = TaskMergeWidget()
+            else:
+                from ui.task_list import TaskListWidget
+                widget = TaskListWidget()
+        
+        self.tab_widget.widget(index).layout().addWidget(widget)
+        setattr(self, attribute, widget)
+        return widget
+    
+    def warm_up_database(self):
+        """Start initializing the database on a pool thread, once."""
+        if self.database_warm_up is not None:
+            return
+        from ui.database_warm_up import DatabaseWarmUp
+        
+        self.database_warm_up = DatabaseWarmUp()
+        self.database_warm_up.signals.ready.connect(self.on_database_ready)
+        self.database_warm_up.signals.failed.connect(self.on_database_failed)
+        QThreadPool.globalInstance().start(self.database_warm_up)
+    
+    def on_database_ready(self):
+        """The database is initialized and connected."""
+        self.database_warm = True
+        self.database_ready.emit()
+    
+    def on_database_failed(self, message):
+        """Report a database that could not be initialized."""
+        self.database_failed.emit(message)
+        QMessageBox.critical(self, "Lỗi", f"Không thể khởi tạo cơ sở dữ liệu: {message}")
+    
+    def require_database(self):
+        """Initialize the database now, waiting for a warm-up still running."""
+        if self.database_warm:
+            return
+        from database.db_manager import ensure_db
+        
+        try:
+            # Chờ lượt khởi tạo đang chạy nền (nếu có) rồi bỏ qua vì đã xong
+            ensure_db()
+        except Exception as e:
+            QMessageBox.critical(self, "Lỗi", f"Không thể khởi tạo cơ sở dữ liệu: {str(e)}")
+    
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self.painted:
+            self.painted = True
+            # Khởi tạo CSDL sau khi cửa sổ đã hiện lên
+            QTimer.singleShot(0, self.first_painted.emit)
+            QTimer.singleShot(0, self.warm_up_database)
+    
     def on_tab_changed(self, index):
         """Handle tab change events."""
-        # If switching to task list tab (index 2), refresh the data
+        self.ensure_tab(index)
+        # Changes are applied as they happen; only catch up if one was missed
         if index == 2:  # Task list tab
-            self.task_list_tab.refresh_data()
+            self.task_list_tab.sync()
             # Make sure we're showing the task list view, not the detail view
-            if hasattr(self.task_list_tab, 'stacked_widget') and hasattr(self.task_list_tab, 'main_content'):
-                self.task_list_tab.show_task_list()
-        # If switching to merge tab (index 1), refresh the task list
+            self.task_list_tab.stacked_widget.setCurrentWidget(self.task_list_tab.main_content)
         elif index == 1:  # Merge tab
-            self.task_merge_tab.load_tasks()
-    
-    def on_task_created(self):
-        """Handle task creation event."""
-        # Refresh task list in merge tab
-        self.task_merge_tab.load_tasks()
-        # Also refresh task list tab
-        self.task_list_tab.refresh_data()
+            self.task_merge_tab.sync()
     
+    def closeEvent(self, event):
+        """Stop background merges before the window closes."""
+        # Lượt trộn đang chạy sẽ rollback; chờ để không bị dừng giữa lúc ghi file
+        if self.task_merge_tab is not None:
+            self.task_merge_tab.merge_queue.cancel_all()
+            self.task_merge_tab.merge_queue.wait()
+        super().closeEvent(event)
 
     
     def apply_styles(self):
@@ -0,0 +1,133 @@
+import itertools
+import threading
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal
+
+from database.db_manager import get_session
+from models.task import Task
+
+
+class MergeJobSignals(QObject):
+    """Signals emitted by a MergeJob from its worker thread."""
+    started = Signal(int)
+    progress = Signal(int, str, int, int)
+    finished = Signal(int, object)
+    failed = Signal(int, str)
+    cancelled = Signal(int)
+
+
+class MergeJob(QRunnable):
+    """Merge and import a task's new files on a pool thread."""
+
+    def __init__(self, job_id, task_id, task_name, files):
+        super().__init__()
+        self.job_id = job_id
+        self.task_id = task_id
+        self.task_name = task_name
+        self.files = list(files)
+        self.signals = MergeJobSignals()
+        # Shared with the queue, which never touches the runnable itself once
+        # the thread pool owns (and deletes) it
+        self.cancel_event = threading.Event()
+
+    def is_cancelled(self):
+        return self.cancel_event.is_set()
+
+    def run(self):
+        # pandas/openpyxl are only loaded once a merge actually runs
+        from utils.excel_manager import merge_incremental, MergeCancelled
+
+        if self.is_cancelled():
+            self.signals.cancelled.emit(self.job_id)
+            return
+
+        self.signals.started.emit(self.job_id)
+        # Each worker uses its own session; the pooled engine is thread-safe
+        session = get_session()
+        try:
+            task = session.query(Task).filter(Task.id == self.task_id).first()
+            if not task:
+                raise ValueError("Không tìm thấy nhiệm vụ")
+
+            result = merge_incremental(
+                task, self.files, session,
+                progress=lambda stage, done, total: self.signals.progress.emit(self.job_id, stage, done, total),
+                is_cancelled=self.is_cancelled
+            )
+            session.commit()
+            self.signals.finished.emit(self.job_id, result)
+        except MergeCancelled:
+            session.rollback()
+            self.signals.cancelled.emit(self.job_id)
+        except Exception as e:
+            session.rollback()
+            self.signals.failed.emit(self.job_id, str(e))
+        finally:
+            session.close()
+
+
+class MergeJobQueue(QObject):
+    """
+    Runs merge jobs one after another on a background thread.
+
+    Jobs can be queued for several tasks while one is running; the GUI only
+    sees the forwarded signals. A queued job can be cancelled before it
+    starts, a running one stops between chunks and rolls back.
+    """
+
+    job_started = Signal(int)
+    job_progress = Signal(int, str, int, int)
+    job_finished = Signal(int, object)
+    job_failed = Signal(int, str)
+    job_cancelled = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = itertools.count(1)
+        # job id -> (signals, cancel event) of jobs queued or running
+        self._jobs = {}
+
+        # A single thread keeps jobs sequential and SQLite writes serialized
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def enqueue(self, task_id, task_name, files):
+        """Queue a merge of files into a task; returns the job id."""
+        job = MergeJob(next(self._ids), task_id, task_name, files)
+        job.signals.started.connect(self.job_started)
+        job.signals.progress.connect(self.job_progress)
+        job.signals.finished.connect(self._on_finished)
+        job.signals.failed.connect(self._on_failed)
+        job.signals.cancelled.connect(self._on_cancelled)
+        self._jobs[job.job_id] = (job.signals, job.cancel_event)
+        self._pool.start(job)
+        return job.job_id
+
+    def pending_count(self):
+        """Number of jobs queued or running."""
+        return len(self._jobs)
+
+    def cancel(self, job_id):
+        """Ask a queued or running job to stop at its next checkpoint."""
+        if job_id in self._jobs:
+            self._jobs[job_id][1].set()
+
+    def cancel_all(self):
+        for _, cancel_event in list(self._jobs.values()):
+            cancel_event.set()
+
+    def wait(self):
+        """Block until every queued job has ended."""
+        self._pool.waitForDone()
+
+    def _on_finished(self, job_id, result):
+        self._jobs.pop(job_id, None)
+        self.job_finished.emit(job_id, result)
+
+    def _on_failed(self, job_id, message):
+        self._jobs.pop(job_id, None)
+        self.job_failed.emit(job_id, message)
+
+    def _on_cancelled(self, job_id):
+        self._jobs.pop(job_id, None)
+        self.job_cancelled.emit(job_id)
@@ -7,9 +7,7 @@ from PySide6.QtWidgets import (
 )
 from PySide6.QtCore import Qt, Signal
 
-from database.db_manager import get_session
-from models.task import Task
-from utils.excel_manager import create_excel_template
+from ui.events import domain_events
 
 class TaskCreationWidget(QWidget):
     """Widget for creating new tasks with Excel templates."""
@@ -168,6 +166,11 @@ class TaskCreationWidget(QWidget):
             return
         
         try:
+            # Nạp khi tạo nhiệm vụ để không làm chậm lúc mở ứng dụng
+            from database.db_manager import ensure_db, get_session
+            from models.task import Task
+            from utils.excel_manager import create_excel_template
+            
             # Create task folder first
             import re
             safe_task_name = re.sub(r'[^\w\s-]', '', task_name).strip().replace(' ', '_')
@@ -186,6 +189,7 @@ class TaskCreationWidget(QWidget):
             create_excel_template(excel_path, self.columns)
             
             # Save task to database with the correct path
+            ensure_db()
             session = get_session()
             new_task = Task(
                 name=task_name,
@@ -197,6 +201,7 @@ class TaskCreationWidget(QWidget):
             )
             session.add(new_task)
             session.commit()
+            task_id = new_task.id
             
             session.close()
             
@@ -207,6 +212,7 @@ class TaskCreationWidget(QWidget):
             
             # Emit signal to notify that a task has been created
             self.task_created.emit()
+            domain_events().task_created.emit(task_id)
             
             # Clear form
             self.task_name_edit.clear()
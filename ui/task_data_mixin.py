@@ -0,0 +1,377 @@
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime
+
+from PySide6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QLineEdit,
+    QMessageBox, QFileDialog, QMenu, QFormLayout
+)
+
+from models.task import Task
+from ui.filter_worker import BackgroundFilter
+from ui.workbook_writer import WorkbookWriteBack
+from utils.data_export import export_formats
+from utils.task_dataset import TaskDataset, is_filtering
+from database.db_manager import get_session
+
+# Mục đầu tiên của ô chọn cột: không lọc theo cột
+NO_COLUMN = "-- Chọn cột --"
+
+
+class TaskDataMixin:
+    """
+    Behaviour shared by the widgets that show a task's rows.
+
+    Loads the task into a TaskDataset, filters it in the background, edits
+    and deletes rows, writes the edits back and exports the visible rows.
+    The widget only builds its layout; it calls init_task_data() before
+    setup_ui() and must provide task_info_label, status_label, data_table
+    (showing table_model), global_search_input, column_combo,
+    column_value_input, case_sensitive_check, exact_match_check and
+    approximate_check.
+    """
+
+    # Whether "exact match" also applies to the global search (None: it does)
+    global_exact_match = None
+
+    def init_task_data(self, task_id=None):
+        """Create the dataset and its background filter and write-back."""
+        self.task_id = task_id
+        self.task = None
+        # Dữ liệu của nhiệm vụ: tải, chỉ mục, lọc, sửa và lưu
+        self.dataset = TaskDataset()
+        self.merged_file = None
+
+        # Lọc dữ liệu chạy nền sau khi ngừng gõ; chỉ kết quả mới nhất được hiển thị
+        self.background_filter = BackgroundFilter(self.filter_snapshot, parent=self)
+        self.background_filter.finished.connect(self.on_filter_finished)
+        self.background_filter.failed.connect(self.on_filter_failed)
+
+        # Các dòng đã sửa được ghi vào file Excel theo lô, ngoài luồng giao diện
+        self.write_back = WorkbookWriteBack(self.dataset, parent=self)
+        self.write_back.saved.connect(self.on_write_back_saved)
+        self.write_back.failed.connect(self.on_write_back_failed)
+
+    def fit_columns(self):
+        """Adjust column widths after new data was shown (nothing by default)."""
+
+    def save_pending(self):
+        """Stop filtering and write pending edits before the widget goes away."""
+        self.background_filter.cancel()
+        self.write_back.flush(wait=True)
+
+    def load_task_data(self, task_id):
+        """Load task data and find merged Excel file."""
+        try:
+            session = get_session()
+            self.task = session.query(Task).filter(Task.id == task_id).first()
+            session.close()
+
+            if not self.task:
+                self.status_label.setText(f"Không tìm thấy nhiệm vụ với ID: {task_id}")
+                return
+
+            # Cập nhật tiêu đề
+            self.task_info_label.setText(
+                f"Chi tiết nhiệm vụ: {self.task.name} - {self.task.unit} ({self.task.year})"
+            )
+            self.setWindowTitle(f"Chi tiết nhiệm vụ: {self.task.name}")
+
+            # Sử dụng file nguồn làm nguồn dữ liệu duy nhất
+            if self.task.excel_path and os.path.exists(self.task.excel_path):
+                self.merged_file = self.task.excel_path
+                self.load_excel_data(self.merged_file)
+            else:
+                self.status_label.setText(f"Không tìm thấy file Excel cho nhiệm vụ: {self.task.name}")
+
+        except Exception as e:
+            self.status_label.setText(f"Lỗi khi tải dữ liệu: {str(e)}")
+
+    def load_excel_data(self, file_path):
+        """Load data from Excel file into table."""
+        try:
+            # Lưu các thay đổi còn chờ trước khi đọc lại file
+            self.save_pending()
+
+            # Đọc dữ liệu từ kho dòng SQLite (hoặc từ file Excel nếu file đã thay đổi)
+            self.dataset.load(file_path, self.task.id if self.task else None)
+
+            self.status_label.setText(
+                f"Đã tải {self.dataset.row_count()} dòng dữ liệu từ {os.path.basename(file_path)}"
+            )
+
+            # Hiển thị dữ liệu trong bảng
+            self.populate_table(self.dataset.df)
+
+            # Cập nhật các tùy chọn lọc theo cột
+            self.update_column_filter_options()
+
+        except Exception as e:
+            self.status_label.setText(f"Lỗi khi đọc file Excel: {str(e)}")
+
+    def populate_table(self, dataframe):
+        """Populate table with dataframe data."""
+        # Kết quả lọc trên dữ liệu cũ không còn hợp lệ
+        self.background_filter.cancel()
+
+        # Model đọc dữ liệu theo yêu cầu, không tạo item cho từng ô
+        self.table_model.set_dataframe(dataframe)
+
+        if dataframe is not None and not dataframe.empty:
+            self.fit_columns()
+
+    def update_column_filter_options(self):
+        """Update column filter dropdown with available columns."""
+        if self.dataset.is_empty():
+            return
+
+        # Giữ lựa chọn hiện tại nếu cột vẫn còn
+        current_text = self.column_combo.currentText()
+
+        self.column_combo.clear()
+        self.column_combo.addItem(NO_COLUMN)
+        for column in self.dataset.df.columns:
+            self.column_combo.addItem(str(column))
+
+        index = self.column_combo.findText(current_text)
+        if index >= 0:
+            self.column_combo.setCurrentIndex(index)
+
+    def update_column_filter(self):
+        """Update column filter when selection changes."""
+        self.apply_filters()
+
+    def apply_filters(self):
+        """Apply all filters to the data (runs on a background thread)."""
+        self.background_filter.run_now()
+
+    def filter_snapshot(self):
+        """Collect the current filter values for the background filter."""
+        if self.dataset.is_empty():
+            return None
+
+        column_index = self.column_combo.currentIndex()
+        query = {
+            "global_term": self.global_search_input.text().strip(),
+            "column": self.column_combo.itemText(column_index) if column_index > 0 else None,
+            "column_term": self.column_value_input.text().strip(),
+            "case_sensitive": self.case_sensitive_check.isChecked(),
+            "exact_match": self.exact_match_check.isChecked(),
+            "approximate": self.approximate_check.isChecked(),
+            "global_exact_match": self.global_exact_match,
+        }
+        return self.dataset, query
+
+    def on_filter_finished(self, mask):
+        """Show the rows selected by the latest filter."""
+        if len(mask) != self.dataset.row_count():
+            return
+
+        self.table_model.set_row_mask(mask)
+        self.status_label.setText(f"Hiển thị {int(mask.sum())} / {self.dataset.row_count()} dòng dữ liệu")
+
+    def on_filter_failed(self, message):
+        """Report an error raised while filtering."""
+        self.status_label.setText(f"Lỗi khi áp dụng bộ lọc: {message}")
+
+    def reset_filters(self):
+        """Reset all filters."""
+        self.global_search_input.clear()
+        self.column_combo.setCurrentIndex(0)
+        self.column_value_input.clear()
+        self.case_sensitive_check.setChecked(False)
+        self.exact_match_check.setChecked(False)
+        self.approximate_check.setChecked(False)
+
+        # Bỏ kết quả lọc còn đang chạy cho các giá trị cũ
+        self.background_filter.cancel()
+
+        # Hiển thị lại toàn bộ dữ liệu
+        if self.dataset.df is not None:
+            self.table_model.set_row_mask(self.dataset.all_rows())
+            self.status_label.setText(f"Hiển thị tất cả {self.dataset.row_count()} dòng dữ liệu")
+
+    def open_source_file(self):
+        """Open the source Excel file for the task."""
+        if not self.task or not self.task.excel_path:
+            QMessageBox.warning(self, "Cảnh báo", "Không có file Excel cho nhiệm vụ này")
+            return
+
+        if not os.path.exists(self.task.excel_path):
+            QMessageBox.warning(
+                self, "Cảnh báo",
+                f"Không tìm thấy file Excel tại đường dẫn:\n{self.task.excel_path}"
+            )
+            return
+
+        try:
+            # Mở file Excel bằng ứng dụng mặc định
+            if os.name == 'nt':  # Windows
+                os.startfile(self.task.excel_path)
+            elif os.name == 'posix':  # macOS and Linux
+                subprocess.call(('open' if sys.platform == 'darwin' else 'xdg-open', self.task.excel_path))
+
+            QMessageBox.information(
+                self, "Thành công",
+                f"Đã mở file Excel:\n{os.path.basename(self.task.excel_path)}"
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Lỗi", f"Không thể mở file Excel: {str(e)}")
+
+    def show_context_menu(self, position):
+        """Show context menu for data table."""
+        if self.table_model.rowCount() == 0:
+            return
+
+        # Dòng dưới con trỏ, ánh xạ về vị trí trong dữ liệu (đã lọc/sắp xếp)
+        row = self.data_table.rowAt(position.y())
+        if row < 0:
+            return
+        row = self.table_model.source_row(row)
+
+        context_menu = QMenu(self)
+        edit_action = context_menu.addAction("Sửa dòng")
+        edit_action.triggered.connect(lambda: self.edit_record(row))
+        delete_action = context_menu.addAction("Xóa dòng")
+        delete_action.triggered.connect(lambda: self.delete_record(row))
+
+        context_menu.exec_(self.data_table.mapToGlobal(position))
+
+    def edit_record(self, row):
+        """Edit a record in the data table and sync back to Excel."""
+        if row >= self.dataset.row_count():
+            return
+
+        # Tạo dialog để chỉnh sửa
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Sửa dữ liệu")
+        dialog.setMinimumWidth(400)
+
+        layout = QVBoxLayout(dialog)
+        form_layout = QFormLayout()
+
+        # Tạo các trường nhập liệu cho mỗi cột (theo vị trí: tên cột có thể trùng)
+        fields = {}
+        for col, (header, text) in enumerate(self.dataset.row_texts(row)):
+            field = QLineEdit()
+            field.setText(text)
+            form_layout.addRow(str(header) + ":", field)
+            fields[col] = field
+
+        layout.addLayout(form_layout)
+
+        # Thêm các nút Lưu và Hủy
+        button_layout = QHBoxLayout()
+        save_button = QPushButton("Lưu")
+        cancel_button = QPushButton("Hủy")
+        save_button.clicked.connect(dialog.accept)
+        cancel_button.clicked.connect(dialog.reject)
+        button_layout.addWidget(save_button)
+        button_layout.addWidget(cancel_button)
+        layout.addLayout(button_layout)
+
+        if dialog.exec_() != QDialog.Accepted:
+            return
+
+        # Kết quả lọc đang chạy sẽ không còn đúng sau khi sửa
+        self.background_filter.cancel()
+
+        # Cập nhật dữ liệu và chỉ mục tìm kiếm (chỉ các ô đã thay đổi)
+        try:
+            changed = self.dataset.update_row(row, {col: field.text() for col, field in fields.items()})
+        except Exception as e:
+            QMessageBox.critical(self, "Lỗi", f"Không thể cập nhật dữ liệu: {str(e)}")
+            return
+        if not changed:
+            return
+
+        # Chỉ cập nhật dòng đã sửa trong bảng
+        self.table_model.update_source_row(row)
+        self.refilter()
+
+        # Ghi các ô đã sửa vào file Excel (gộp nhiều lần sửa thành một lần lưu)
+        self.write_back.schedule()
+        self.status_label.setText("Đã cập nhật dòng, đang lưu vào file Excel...")
+
+    def delete_record(self, row):
+        """Delete a record from the data table and sync back to Excel."""
+        if row >= self.dataset.row_count():
+            return
+
+        confirm = QMessageBox.question(
+            self, "Xác nhận xóa",
+            "Bạn có chắc chắn muốn xóa dòng này?",
+            QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+        )
+        if confirm != QMessageBox.Yes:
+            return
+
+        # Xóa dòng khỏi dữ liệu và chỉ mục tìm kiếm
+        self.background_filter.cancel()
+        self.dataset.delete_row(row)
+
+        # Chỉ bỏ dòng đó khỏi bảng
+        self.table_model.remove_source_row(row, self.dataset.df)
+        self.refilter()
+
+        # Xóa dòng tương ứng trong file Excel
+        self.write_back.schedule()
+        self.status_label.setText("Đã xóa dòng, đang lưu vào file Excel...")
+
+    def refilter(self):
+        """Re-run the active filter after rows changed, if there is one."""
+        snapshot = self.filter_snapshot()
+        if snapshot is None:
+            return
+        _, query = snapshot
+        if is_filtering(query):
+            self.background_filter.run_now()
+
+    def sync_to_excel(self):
+        """Write pending edits into the Excel file now and wait for it."""
+        if self.dataset.df is None or not self.merged_file:
+            return False
+
+        self.write_back.flush(wait=True)
+        return True
+
+    def on_write_back_saved(self, file_path, count):
+        """Report a batch of edits written to the workbook."""
+        self.status_label.setText(f"Đã lưu {count} thay đổi vào file {os.path.basename(file_path)}")
+
+    def on_write_back_failed(self, file_path, message):
+        """Report an edit batch that could not be written."""
+        QMessageBox.critical(self, "Lỗi", f"Không thể đồng bộ với file Excel: {message}")
+
+    def export_to_excel(self):
+        """Export the rows currently shown (filtered and sorted) to Excel, CSV or Parquet."""
+        # Xuất đúng các dòng đang hiển thị, giữ nguyên kiểu dữ liệu
+        if self.dataset.df is None or self.table_model.rowCount() == 0:
+            QMessageBox.warning(self, "Cảnh báo", "Không có dữ liệu để xuất")
+            return
+
+        file_name = f"{self.task.name}_filtered_{datetime.now().strftime('%d%m%Y')}"
+        safe_file_name = re.sub(r'[^\w\s-]', '', file_name).strip().replace(' ', '_')
+        default_path = os.path.join(os.path.dirname(self.task.excel_path), safe_file_name + ".xlsx")
+
+        formats = export_formats()
+        file_path, selected_filter = QFileDialog.getSaveFileName(
+            self, "Xuất dữ liệu", default_path, ";;".join(formats.values())
+        )
+        if not file_path:
+            return
+
+        # Thêm đuôi file theo định dạng đã chọn nếu người dùng không gõ
+        if os.path.splitext(file_path)[1].lower() not in formats:
+            extension = next((ext for ext, label in formats.items() if label == selected_filter), ".xlsx")
+            file_path += extension
+
+        try:
+            row_count = self.dataset.export(file_path, self.table_model.visible_positions())
+            QMessageBox.information(
+                self, "Thành công", f"Đã xuất {row_count} dòng dữ liệu ra file:\n{file_path}"
+            )
+        except Exception as e:
+            QMessageBox.critical(self, "Lỗi", f"Không thể xuất dữ liệu: {str(e)}")
@@ -1,11 +1,10 @@
 import os
-import pandas as pd
 import fnmatch
 import re
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
-    QComboBox, QLineEdit, QTableWidget, QTableWidgetItem,
-    QGroupBox, QMessageBox, QHeaderView, QSplitter, QMenu, QDialog,
+    QComboBox, QLineEdit, QTableWidget, QTableWidgetItem, QTableView,
+    QAbstractItemView, QGroupBox, QMessageBox, QHeaderView, QSplitter, QMenu, QDialog,
     QStackedWidget, QSizePolicy, QApplication, QStyle
 )
 from PySide6.QtCore import Qt, QPoint, Signal
@@ -14,7 +13,8 @@ from database.db_manager import get_session
 from models.task import Task
 from models.person import Person
 from models.award import Award
-from ui.task_detail_dialog import TaskDetailDialog
+from ui.events import domain_events
+from ui.task_list_model import TaskListModel
 
 class TaskListWidget(QWidget):
     """Widget for listing tasks and viewing people with their awards."""
@@ -24,10 +24,21 @@ class TaskListWidget(QWidget):
     
     def __init__(self):
         super().__init__()
+        # Version of the event bus the list was last brought up to date with
+        # (-1: not loaded yet, the first sync() loads it)
+        self.data_version = -1
         self.setup_ui()
         self.load_years()
         self.load_units()
         
+        # Chỉ cập nhật đúng nhiệm vụ thay đổi thay vì tải lại toàn bộ
+        events = domain_events()
+        events.task_created.connect(self.on_task_changed)
+        events.task_updated.connect(self.on_task_changed)
+        events.task_deleted.connect(self.on_task_deleted)
+        # Người/danh hiệu không hiển thị trong danh sách nhiệm vụ
+        events.import_finished.connect(self.mark_synced)
+        
     def setup_ui(self):
         """Set up the user interface."""
         main_layout = QVBoxLayout(self)
@@ -78,12 +89,13 @@ class TaskListWidget(QWidget):
         # Create a splitter for tasks and people
         splitter = QSplitter(Qt.Vertical)
         
-        self.tasks_table = QTableWidget()
-        self.tasks_table.setColumnCount(4)
-        self.tasks_table.setHorizontalHeaderLabels(["ID", "Tên nhiệm vụ", "Năm", "Đơn vị"])
+        # Nhiệm vụ được tải dần theo trang khi cuộn (TaskListModel)
+        self.tasks_model = TaskListModel(self)
+        self.tasks_table = QTableView()
+        self.tasks_table.setModel(self.tasks_model)
         self.tasks_table.horizontalHeader().setSectionResizeMode(1, QHeaderView.Stretch)
-        self.tasks_table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.tasks_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.tasks_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tasks_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
         self.tasks_table.clicked.connect(self.load_people)
         self.tasks_table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.tasks_table.customContextMenuRequested.connect(self.show_context_menu)
@@ -169,80 +181,39 @@ class TaskListWidget(QWidget):
     def filter_tasks(self):
         """Filter tasks based on selected criteria and search term."""
         try:
-            session = get_session()
-            query = session.query(Task)
-            
-            # Apply search filter (searches across name, unit, year, and description)
             search_term = self.search_edit.text().strip()
-            if search_term:
-                search_pattern = f"%{search_term}%"
-                
-                # Kiểm tra xem search_term có phải là năm không
-                try:
-                    year_search = int(search_term)
-                    query = query.filter(
-                        (Task.name.like(search_pattern)) | 
-                        (Task.unit.like(search_pattern)) | 
-                        (Task.description.like(search_pattern)) |
-                        (Task.year == year_search)  # Tìm kiếm chính xác theo năm
-                    )
-                except ValueError:
-                    # Nếu search_term không phải là số, chỉ tìm theo các trường văn bản
-                    query = query.filter(
-                        (Task.name.like(search_pattern)) | 
-                        (Task.unit.like(search_pattern)) | 
-                        (Task.description.like(search_pattern))
-                    )
-            
-            # Apply year filter if advanced filters are visible
-            if self.year_combo.currentIndex() > 0:
-                year = int(self.year_combo.currentText())
-                query = query.filter(Task.year == year)
-            
-            # Apply unit filter if advanced filters are visible
-            if self.unit_combo.currentIndex() > 0:
-                unit = self.unit_combo.currentText()
-                query = query.filter(Task.unit == unit)
-            
-            # Get filtered tasks
-            tasks = query.order_by(Task.year.desc(), Task.name).all()
+            year = int(self.year_combo.currentText()) if self.year_combo.currentIndex() > 0 else None
+            unit = self.unit_combo.currentText() if self.unit_combo.currentIndex() > 0 else None
             
-            # Clear tasks table
-            self.tasks_table.setRowCount(0)
-            
-            # Add tasks to table
-            for task in tasks:
-                row = self.tasks_table.rowCount()
-                self.tasks_table.insertRow(row)
-                
-                # Hiển thị đúng thông tin vào các cột tương ứng
-                self.tasks_table.setItem(row, 0, QTableWidgetItem(str(task.id)))
-                self.tasks_table.setItem(row, 1, QTableWidgetItem(task.name))
-                self.tasks_table.setItem(row, 2, QTableWidgetItem(str(task.year)))
-                self.tasks_table.setItem(row, 3, QTableWidgetItem(task.unit))
+            # Chỉ tải trang đầu; các trang sau được tải khi cuộn xuống
+            self.tasks_model.set_filters(search_term, year, unit)
             
             # Update status with result count
-            result_count = self.tasks_table.rowCount()
-            if search_term or self.year_combo.currentIndex() > 0 or self.unit_combo.currentIndex() > 0:
+            result_count = self.tasks_model.total_count()
+            if search_term or year is not None or unit is not None:
                 self.setStatusTip(f"Tìm thấy {result_count} nhiệm vụ phù hợp với điều kiện tìm kiếm")
             else:
                 self.setStatusTip(f"Hiển thị tất cả {result_count} nhiệm vụ")
             
-            session.close()
-            
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể lọc nhiệm vụ: {str(e)}")
     
+    def selected_row(self):
+        """Row of the selected task in the model, or None."""
+        rows = self.tasks_table.selectionModel().selectedRows()
+        return rows[0].row() if rows else None
+    
     def load_people(self):
         """Show task detail in a popup dialog."""
         try:
-            selected_items = self.tasks_table.selectedItems()
-            if not selected_items:
+            row = self.selected_row()
+            if row is None:
                 return
             
-            # Get task ID from the first column of the selected row
-            row = selected_items[0].row()
-            task_id = int(self.tasks_table.item(row, 0).text())
+            task_id = self.tasks_model.task_id(row)
+            
+            # Nạp khi mở lần đầu (kéo theo pandas)
+            from ui.task_detail_dialog import TaskDetailDialog
             
             # Tạo và hiển thị dialog chi tiết nhiệm vụ
             detail_dialog = TaskDetailDialog(task_id, self)
@@ -256,12 +227,12 @@ class TaskListWidget(QWidget):
     
     def edit_task(self):
         """Edit the selected task."""
-        selected_rows = self.tasks_table.selectedItems()
-        if not selected_rows:
+        row = self.selected_row()
+        if row is None:
             QMessageBox.warning(self, "Lỗi", "Vui lòng chọn nhiệm vụ để sửa")
             return
         
-        task_id = int(self.tasks_table.item(selected_rows[0].row(), 0).text())
+        task_id = self.tasks_model.task_id(row)
         
         try:
             session = get_session()
@@ -281,7 +252,7 @@ class TaskListWidget(QWidget):
                 # Save changes to database
                 session.commit()
                 QMessageBox.information(self, "Thành công", "Cập nhật nhiệm vụ thành công")
-                self.refresh_data()
+                domain_events().task_updated.emit(task_id)
             
             session.close()
             
@@ -290,13 +261,13 @@ class TaskListWidget(QWidget):
     
     def delete_task(self):
         """Delete the selected task."""
-        selected_rows = self.tasks_table.selectedItems()
-        if not selected_rows:
+        row = self.selected_row()
+        if row is None:
             QMessageBox.warning(self, "Lỗi", "Vui lòng chọn nhiệm vụ để xóa")
             return
         
-        task_id = int(self.tasks_table.item(selected_rows[0].row(), 0).text())
-        task_name = self.tasks_table.item(selected_rows[0].row(), 1).text()
+        task_id = self.tasks_model.task_id(row)
+        task_name = self.tasks_model.task_name(row)
         
         # Confirm deletion
         confirm = QMessageBox.question(
@@ -324,7 +295,7 @@ class TaskListWidget(QWidget):
             session.close()
             
             QMessageBox.information(self, "Thành công", f"Đã xóa nhiệm vụ '{task_name}'")
-            self.refresh_data()
+            domain_events().task_deleted.emit(task_id)
             
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể xóa nhiệm vụ: {str(e)}")
@@ -332,8 +303,7 @@ class TaskListWidget(QWidget):
     def show_context_menu(self, position):
         """Show context menu for task list."""
         # Get selected row
-        selected_rows = self.tasks_table.selectedItems()
-        if not selected_rows:
+        if self.selected_row() is None:
             return
         
         # Create context menu
@@ -359,3 +329,35 @@ class TaskListWidget(QWidget):
         self.load_units()
         self.filter_tasks()
         self.people_table.setRowCount(0)
+        self.mark_synced()
+    
+    def sync(self):
+        """Reload only if a change was missed since the last update."""
+        if self.data_version != domain_events().version:
+            self.refresh_data()
+    
+    def mark_synced(self, *args):
+        if self.data_version >= 0 or not args:
+            self.data_version = domain_events().version
+    
+    def on_task_changed(self, task_id):
+        """Show a created or edited task at its place in the list."""
+        if self.data_version < 0:
+            return
+        try:
+            self.tasks_model.apply_task(task_id)
+            # Năm/đơn vị mới có thể xuất hiện
+            self.load_years()
+            self.load_units()
+            self.mark_synced()
+        except Exception as e:
+            print(f"Lỗi khi cập nhật danh sách nhiệm vụ: {str(e)}")
+    
+    def on_task_deleted(self, task_id):
+        """Remove a deleted task from the list."""
+        if self.data_version < 0:
+            return
+        self.tasks_model.remove_task(task_id)
+        self.load_years()
+        self.load_units()
+        self.mark_synced()
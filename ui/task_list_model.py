@@ -0,0 +1,249 @@
+import bisect
+
+from sqlalchemy import and_, func, literal, or_, tuple_
+from PySide6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from database.db_manager import get_session
+from database.fts import task_fts_available, task_search_subquery
+from models.task import Task
+
+# Rows loaded per fetchMore(); larger than a screen, so the next page is
+# already there when the user scrolls
+PAGE_SIZE = 100
+
+# Sort key of tasks matched only by year, after every FTS hit (bm25 < 0)
+UNRANKED = 1e300
+
+HEADERS = ["ID", "Tên nhiệm vụ", "Năm", "Đơn vị"]
+
+
+class TaskListModel(QAbstractTableModel):
+    """
+    Task list loaded page by page with keyset pagination.
+
+    Rows are ordered by (year desc, name, id); with a search term the FTS
+    rank comes first. Each page continues after the key of the last loaded
+    row instead of using OFFSET, so a page costs the same wherever the user
+    has scrolled to. Only id, name, year and unit are selected, and views
+    ask for more pages through canFetchMore()/fetchMore() while scrolling.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        # Sort key of each loaded row, for placing single changed rows
+        self._keys = []
+        self._last_key = None
+        self._exhausted = True
+        self._search_term = ""
+        self._year = None
+        self._unit = None
+
+    def set_filters(self, search_term="", year=None, unit=None):
+        """Restart the list with new filters and load the first page."""
+        self.beginResetModel()
+        self._search_term = search_term
+        self._year = year
+        self._unit = unit
+        self._rows = []
+        self._keys = []
+        self._last_key = None
+        self._exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def refresh(self):
+        """Reload with the current filters."""
+        self.set_filters(self._search_term, self._year, self._unit)
+
+    def _query(self, session, columns):
+        """Query of the given columns with the current filters applied; returns (query, rank)."""
+        query = session.query(*columns)
+        rank = None
+
+        search_term = self._search_term
+        if search_term:
+            # Kiểm tra xem search_term có phải là năm không
+            try:
+                year_search = int(search_term)
+            except ValueError:
+                year_search = None
+
+            # Ưu tiên chỉ mục FTS5 (không phân biệt dấu, theo tiền tố, xếp hạng)
+            search = task_search_subquery(search_term) if task_fts_available(session) else None
+
+            if search is not None:
+                query = query.outerjoin(search, search.c.task_id == Task.id)
+                matched = search.c.task_id.isnot(None)
+                if year_search is not None:
+                    matched = matched | (Task.year == year_search)  # Tìm kiếm chính xác theo năm
+                query = query.filter(matched)
+                rank = func.coalesce(search.c.rank, literal(UNRANKED))
+            else:
+                search_pattern = f"%{search_term}%"
+                text_filter = (
+                    (Task.name.like(search_pattern)) |
+                    (Task.unit.like(search_pattern)) |
+                    (Task.description.like(search_pattern))
+                )
+                if year_search is not None:
+                    text_filter = text_filter | (Task.year == year_search)
+                query = query.filter(text_filter)
+
+        if self._year is not None:
+            query = query.filter(Task.year == self._year)
+        if self._unit is not None:
+            query = query.filter(Task.unit == self._unit)
+        return query, rank
+
+    def _after(self, rank, key):
+        """Condition selecting the rows that sort after key in (rank, year desc, name, id)."""
+        if rank is not None:
+            last_rank, year, name, task_id = key
+            return or_(
+                rank > last_rank,
+                and_(rank == last_rank, self._after(None, (year, name, task_id)))
+            )
+        year, name, task_id = key
+        # Spelled out (not a negated tuple) so the (year, name, id) index applies
+        return or_(
+            Task.year < year,
+            and_(Task.year == year, tuple_(Task.name, Task.id) > tuple_(name, task_id))
+        )
+
+    @staticmethod
+    def _sort_key(row, ranked):
+        """Python equivalent of the SQL order of a (id, name, year, unit[, rank]) row."""
+        task_id, name, year = row[0], row[1], row[2]
+        if ranked:
+            return (row[4], -year, name, task_id)
+        return (-year, name, task_id)
+
+    @staticmethod
+    def _cursor(row, ranked):
+        """Keyset cursor of a row, in the form _after() expects."""
+        if ranked:
+            return (row[4], row[2], row[1], row[0])
+        return (row[2], row[1], row[0])
+
+    def _select(self, session):
+        """Query of the list columns (plus rank when searching) with the filters applied."""
+        query, rank = self._query(session, [Task.id, Task.name, Task.year, Task.unit])
+        if rank is not None:
+            query = query.add_columns(rank)
+        return query, rank
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted:
+            return
+
+        session = get_session()
+        try:
+            query, rank = self._select(session)
+            if self._last_key is not None:
+                query = query.filter(self._after(rank, self._last_key))
+
+            order = [Task.year.desc(), Task.name, Task.id]
+            if rank is not None:
+                order.insert(0, rank)
+            page = query.order_by(*order).limit(PAGE_SIZE).all()
+        finally:
+            session.close()
+
+        if len(page) < PAGE_SIZE:
+            self._exhausted = True
+        if not page:
+            return
+
+        ranked = rank is not None
+        self._last_key = self._cursor(page[-1], ranked)
+
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(page) - 1)
+        self._rows.extend(tuple(row[:4]) for row in page)
+        self._keys.extend(self._sort_key(row, ranked) for row in page)
+        self.endInsertRows()
+
+    def _row_of(self, task_id):
+        for row, values in enumerate(self._rows):
+            if values[0] == task_id:
+                return row
+        return None
+
+    def remove_task(self, task_id):
+        """Drop a task from the loaded rows (e.g. after it was deleted)."""
+        row = self._row_of(task_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        del self._keys[row]
+        self.endRemoveRows()
+
+    def apply_task(self, task_id):
+        """
+        Bring one created or updated task up to date without reloading.
+
+        The task is re-read with the current filters and moved to its place
+        in the sort order. If it now sorts after the loaded rows it is left
+        to a later page, which will pick it up since pages continue after
+        the last loaded key.
+        """
+        session = get_session()
+        try:
+            query, rank = self._select(session)
+            found = query.filter(Task.id == task_id).first()
+        finally:
+            session.close()
+
+        self.remove_task(task_id)
+        if found is None:
+            return
+
+        key = self._sort_key(found, rank is not None)
+        position = bisect.bisect_left(self._keys, key)
+        if position == len(self._rows) and not self._exhausted:
+            return
+        self.beginInsertRows(QModelIndex(), position, position)
+        self._rows.insert(position, tuple(found[:4]))
+        self._keys.insert(position, key)
+        self.endInsertRows()
+
+    def total_count(self):
+        """Number of tasks matching the current filters (loaded or not)."""
+        session = get_session()
+        try:
+            query, _ = self._query(session, [func.count(Task.id)])
+            return query.scalar() or 0
+        finally:
+            session.close()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role != Qt.DisplayRole:
+            return None
+        value = self._rows[index.row()][index.column()]
+        return "" if value is None else str(value)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return HEADERS[section]
+        return str(section + 1)
+
+    def task_id(self, row):
+        """Id of the task shown in a row."""
+        return self._rows[row][0]
+
+    def task_name(self, row):
+        """Name of the task shown in a row."""
+        return self._rows[row][1]
@@ -2,13 +2,21 @@ import os
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QLabel, 
     QFileDialog, QMessageBox, QListWidget, QListWidgetItem,
-    QGroupBox, QComboBox
+    QGroupBox, QComboBox, QProgressBar
 )
 from PySide6.QtCore import Qt
 
 from database.db_manager import get_session
 from models.task import Task
-from utils.excel_manager import merge_excel_files, import_excel_data
+from ui.events import domain_events
+from ui.merge_jobs import MergeJobQueue
+
+# Tên các bước hiển thị trên thanh tiến trình
+STAGE_LABELS = {
+    "read": "Đang đọc file",
+    "import": "Đang import dữ liệu",
+    "write": "Đang ghi file gốc",
+}
 
 class TaskMergeWidget(QWidget):
     """Widget for merging Excel files and importing data."""
@@ -16,9 +24,29 @@ class TaskMergeWidget(QWidget):
     def __init__(self):
         super().__init__()
         self.selected_files = []
+        # job id -> (id nhiệm vụ, tên nhiệm vụ, file gốc) của các lần trộn đang chờ/chạy
+        self.job_info = {}
+        self.current_job = None
+
+        self.merge_queue = MergeJobQueue(self)
+        self.merge_queue.job_started.connect(self.on_job_started)
+        self.merge_queue.job_progress.connect(self.on_job_progress)
+        self.merge_queue.job_finished.connect(self.on_job_finished)
+        self.merge_queue.job_failed.connect(self.on_job_failed)
+        self.merge_queue.job_cancelled.connect(self.on_job_cancelled)
+
+        # Version of the event bus the task list was last brought up to date with
+        self.data_version = -1
         self.setup_ui()
         self.load_tasks()
         
+        # Cập nhật danh sách nhiệm vụ theo từng thay đổi
+        events = domain_events()
+        events.task_created.connect(self.on_task_changed)
+        events.task_updated.connect(self.on_task_changed)
+        events.task_deleted.connect(self.on_task_deleted)
+        events.import_finished.connect(self.mark_synced)
+        
     def setup_ui(self):
         """Set up the user interface."""
         main_layout = QVBoxLayout(self)
@@ -61,9 +89,22 @@ class TaskMergeWidget(QWidget):
         merge_button = QPushButton("Tiến hành trộn file")
         merge_button.clicked.connect(self.merge_and_import_files)
         
+        self.cancel_button = QPushButton("Hủy")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel_merge)
+        
         buttons_layout.addWidget(merge_button)
+        buttons_layout.addWidget(self.cancel_button)
         
         main_layout.addLayout(buttons_layout)
+        
+        # Progress section
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setValue(0)
+        main_layout.addWidget(self.progress_bar)
+        
+        self.status_label = QLabel("")
+        main_layout.addWidget(self.status_label)
     
     def load_tasks(self):
         """Load tasks from the database."""
@@ -74,11 +115,51 @@ class TaskMergeWidget(QWidget):
             
             self.task_combo.clear()
             for task in tasks:
-                self.task_combo.addItem(f"{task.name} ({task.year}) - {task.unit}", task.id)
+                self.task_combo.addItem(self.task_label(task), task.id)
+            self.mark_synced()
                 
         except Exception as e:
             QMessageBox.critical(self, "Lỗi", f"Không thể tải danh sách nhiệm vụ: {str(e)}")
     
+    @staticmethod
+    def task_label(task):
+        return f"{task.name} ({task.year}) - {task.unit}"
+    
+    def sync(self):
+        """Reload only if a change was missed since the last update."""
+        if self.data_version != domain_events().version:
+            self.load_tasks()
+    
+    def mark_synced(self, *args):
+        self.data_version = domain_events().version
+    
+    def on_task_changed(self, task_id):
+        """Add or relabel one task in the task selector."""
+        try:
+            session = get_session()
+            task = session.query(Task).filter(Task.id == task_id).first()
+            session.close()
+        except Exception as e:
+            print(f"Lỗi khi cập nhật danh sách nhiệm vụ: {str(e)}")
+            return
+        
+        index = self.task_combo.findData(task_id)
+        if task is None:
+            if index >= 0:
+                self.task_combo.removeItem(index)
+        elif index >= 0:
+            self.task_combo.setItemText(index, self.task_label(task))
+        else:
+            self.task_combo.addItem(self.task_label(task), task.id)
+        self.mark_synced()
+    
+    def on_task_deleted(self, task_id):
+        """Remove one task from the task selector."""
+        index = self.task_combo.findData(task_id)
+        if index >= 0:
+            self.task_combo.removeItem(index)
+        self.mark_synced()
+    
     def add_files(self):
         """Open a file dialog to select Excel files."""
         files, _ = QFileDialog.getOpenFileNames(
@@ -115,50 +196,85 @@ class TaskMergeWidget(QWidget):
         task_name = self.task_combo.currentText()
         
         try:
-            # Open a session for getting the task
             session = get_session()
             task = session.query(Task).filter(Task.id == task_id).first()
-            
-            if not task:
-                session.close()
-                QMessageBox.warning(self, "Lỗi", "Không tìm thấy nhiệm vụ")
-                return
-            
-            # Get the original task Excel file
-            original_file = task.excel_path
-            if not os.path.exists(original_file):
-                session.close()
-                QMessageBox.warning(self, "Lỗi", f"Không tìm thấy file gốc của nhiệm vụ: {original_file}")
-                return
-            
-            # Add the original file to the list of files to merge if not already included
-            all_files = self.selected_files.copy()
-            if original_file not in all_files:
-                all_files.insert(0, original_file)  # Insert at the beginning to ensure it's processed first
-            
-            # Sử dụng file nguồn làm file đầu ra
-            output_file = original_file
-            
-            # Merge files
-            merge_excel_files(all_files, output_file)
-            
-            # Import data from merged file
-            import_excel_data(output_file, task, session)
-            
-            # Commit changes and close session
-            session.commit()
+            original_file = task.excel_path if task else None
             session.close()
-            
-            # Clear selected files after successful merge and import
-            num_files = len(self.selected_files)
-            self.selected_files = []
-            self.files_list.clear()
-            
-            QMessageBox.information(
-                self, "Thành công", 
-                f"Đã trộn {num_files} file Excel trực tiếp vào file gốc và import dữ liệu vào nhiệm vụ '{task_name}'\n"
-                f"Dữ liệu đã được cập nhật trong file: {os.path.basename(output_file)}"
-            )
-            
         except Exception as e:
-            QMessageBox.critical(self, "Lỗi", f"Không thể trộn file và import dữ liệu: {str(e)}")
+            QMessageBox.critical(self, "Lỗi", f"Không thể tải nhiệm vụ: {str(e)}")
+            return
+        
+        if not original_file:
+            QMessageBox.warning(self, "Lỗi", "Không tìm thấy nhiệm vụ")
+            return
+        
+        # Get the original task Excel file
+        if not os.path.exists(original_file):
+            QMessageBox.warning(self, "Lỗi", f"Không tìm thấy file gốc của nhiệm vụ: {original_file}")
+            return
+        
+        # Trộn chạy nền; chỉ các file chưa từng được trộn vào nhiệm vụ mới được import
+        job_id = self.merge_queue.enqueue(task_id, task_name, self.selected_files)
+        self.job_info[job_id] = (task_id, task_name, original_file)
+        self.cancel_button.setEnabled(True)
+        if self.current_job is not None:
+            self.status_label.setText(f"Đã xếp hàng: {task_name} ({self.merge_queue.pending_count()} lượt trộn)")
+        
+        # Danh sách file đã được giao cho hàng đợi
+        self.selected_files = []
+        self.files_list.clear()
+    
+    def cancel_merge(self):
+        """Cancel the running merge and every queued one."""
+        self.merge_queue.cancel_all()
+        self.status_label.setText("Đang hủy...")
+    
+    def on_job_started(self, job_id):
+        self.current_job = job_id
+        _, task_name, _ = self.job_info.get(job_id, (None, "", None))
+        self.progress_bar.setRange(0, 0)
+        self.status_label.setText(f"Đang trộn: {task_name}")
+    
+    def on_job_progress(self, job_id, stage, done, total):
+        _, task_name, _ = self.job_info.get(job_id, (None, "", None))
+        self.progress_bar.setRange(0, max(total, 1))
+        self.progress_bar.setValue(done)
+        self.status_label.setText(f"{task_name}: {STAGE_LABELS.get(stage, stage)} ({done}/{total})")
+    
+    def on_job_finished(self, job_id, result):
+        task_id, task_name, original_file = self.end_job(job_id)
+        if result['rows']:
+            domain_events().import_finished.emit(task_id)
+        
+        message = (
+            f"Đã trộn {len(result['merged'])} file Excel ({result['rows']} dòng mới) vào file gốc "
+            f"và import dữ liệu vào nhiệm vụ '{task_name}'\n"
+            f"Dữ liệu đã được cập nhật trong file: {os.path.basename(original_file)}"
+        )
+        if result['skipped']:
+            skipped_names = "\n".join(os.path.basename(file) for file in result['skipped'])
+            message += f"\n\nBỏ qua {len(result['skipped'])} file đã được trộn trước đó:\n{skipped_names}"
+        if result['failed']:
+            failed_names = "\n".join(f"{os.path.basename(file)}: {error}" for file, error in result['failed'])
+            message += f"\n\nKhông đọc được {len(result['failed'])} file:\n{failed_names}"
+        
+        QMessageBox.information(self, "Thành công", message)
+    
+    def on_job_failed(self, job_id, error):
+        _, task_name, _ = self.end_job(job_id)
+        QMessageBox.critical(self, "Lỗi", f"Không thể trộn file và import dữ liệu vào '{task_name}': {error}")
+    
+    def on_job_cancelled(self, job_id):
+        _, task_name, _ = self.end_job(job_id)
+        self.status_label.setText(f"Đã hủy: {task_name}")
+    
+    def end_job(self, job_id):
+        """Reset the progress display after a job ended; returns its info."""
+        info = self.job_info.pop(job_id, (None, "", ""))
+        if job_id == self.current_job:
+            self.current_job = None
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.status_label.setText("")
+        self.cancel_button.setEnabled(bool(self.job_info))
+        return info
@@ -0,0 +1,101 @@
+import itertools
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from utils.task_dataset import save_row_patches
+
+# Edits made within this delay of each other are saved together
+SAVE_DELAY_MS = 1000
+
+
+class WriteBackSignals(QObject):
+    """Signals emitted by a WriteBackTask (QRunnable cannot emit by itself)."""
+    saved = Signal(int, str, int)
+    failed = Signal(int, str, str)
+
+
+class WriteBackTask(QRunnable):
+    """Applies one batch of row patches to a workbook (and row store) on a pool thread."""
+
+    def __init__(self, batch_id, file_path, task_id, patches, snapshot):
+        super().__init__()
+        self.batch_id = batch_id
+        self.file_path = file_path
+        self.task_id = task_id
+        self.patches = patches
+        self.snapshot = snapshot
+        self.signals = WriteBackSignals()
+
+    def run(self):
+        try:
+            count = save_row_patches(self.file_path, self.task_id, self.patches, self.snapshot)
+        except Exception as e:
+            self.signals.failed.emit(self.batch_id, self.file_path, str(e))
+            return
+        self.signals.saved.emit(self.batch_id, self.file_path, count)
+
+
+class WorkbookWriteBack(QObject):
+    """
+    Batched, background saving of a TaskDataset's edits into its workbook.
+
+    schedule() is called after each edit and restarts a short timer; when it
+    fires, every edit recorded in the dataset is written with a single load
+    and save of the workbook, plus the task's row store (see
+    utils.task_dataset.save_row_patches), on a worker thread, so the GUI
+    never waits for openpyxl. Batches run one after another in the order
+    they were made. flush(wait=True) saves synchronously, e.g. before the
+    view is closed or the dataset is reloaded.
+    """
+
+    saved = Signal(str, int)
+    failed = Signal(str, str)
+
+    def __init__(self, dataset, delay_ms=SAVE_DELAY_MS, parent=None):
+        super().__init__(parent)
+        self.dataset = dataset
+        self._ids = itertools.count(1)
+        # batch id -> signals of batches not yet reported; the thread pool
+        # owns the tasks themselves
+        self._batches = {}
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(delay_ms)
+        self._timer.timeout.connect(self.flush)
+
+        # One thread keeps the batches of a workbook in order
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+    def schedule(self):
+        """Save the dataset's edits once no further edit follows for a moment."""
+        self._timer.start()
+
+    def flush(self, wait=False):
+        """
+        Save the recorded edits now.
+
+        Args:
+            wait: Block until every batch, including earlier ones, is on disk
+        """
+        self._timer.stop()
+        if self.dataset.pending_count() and self.dataset.file_path:
+            patches, snapshot = self.dataset.take_patches()
+            task = WriteBackTask(
+                next(self._ids), self.dataset.file_path, self.dataset.task_id, patches, snapshot
+            )
+            task.signals.saved.connect(self._on_saved)
+            task.signals.failed.connect(self._on_failed)
+            self._batches[task.batch_id] = task.signals
+            self._pool.start(task)
+        if wait:
+            self._pool.waitForDone()
+
+    def _on_saved(self, batch_id, file_path, count):
+        self._batches.pop(batch_id, None)
+        self.saved.emit(file_path, count)
+
+    def _on_failed(self, batch_id, file_path, message):
+        self._batches.pop(batch_id, None)
+        self.failed.emit(file_path, message)
@@ -0,0 +1,78 @@
+"""
+Export of task rows to Excel, CSV or Parquet.
+
+The rows come straight from the DataFrame (usually the filtered slice shown
+in a detail view), so numbers and dates keep their types instead of being
+turned into the text the grid displays. Excel output goes through the
+streaming writer in chunks; CSV and Parquet are written by pandas.
+"""
+import importlib.util
+import os
+
+import pandas as pd
+
+from utils.excel_stream import CHUNK_SIZE, write_excel_streaming
+
+# Extension -> file dialog filter, in the order offered to the user
+EXPORT_FORMATS = {
+    ".xlsx": "Excel Files (*.xlsx)",
+    ".csv": "CSV UTF-8 (*.csv)",
+    ".parquet": "Parquet (*.parquet)",
+}
+
+
+def parquet_available():
+    """Whether pandas has a Parquet engine (pyarrow or fastparquet) installed."""
+    return any(importlib.util.find_spec(engine) is not None for engine in ("pyarrow", "fastparquet"))
+
+
+def export_formats():
+    """Return the {extension: dialog filter} of formats usable here."""
+    formats = dict(EXPORT_FORMATS)
+    if not parquet_available():
+        del formats[".parquet"]
+    return formats
+
+
+def _iter_chunks(df, chunk_size):
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def _parquet_frame(df):
+    """Make a frame Parquet can store: string column names, one type per column."""
+    df = df.rename(columns=str)
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and pd.api.types.infer_dtype(values, skipna=True).startswith("mixed"):
+            # e.g. text typed into a numeric column during an edit
+            df[column] = values.astype(str).where(values.notna(), None)
+    return df
+
+
+def export_dataframe(df, file_path, chunk_size=CHUNK_SIZE):
+    """
+    Write a DataFrame to a file, choosing the format by its extension.
+
+    Args:
+        df: Rows to export; its column order is kept
+        file_path: Target path ending in .xlsx, .csv or .parquet
+        chunk_size: Rows per chunk handed to the Excel writer
+
+    Returns:
+        Number of rows written
+
+    Raises:
+        ValueError: If the extension is not a supported format
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension == ".xlsx":
+        return write_excel_streaming(file_path, list(df.columns), _iter_chunks(df, chunk_size))
+    if extension == ".csv":
+        # The BOM lets Excel detect UTF-8 and show Vietnamese text correctly
+        df.to_csv(file_path, index=False, encoding="utf-8-sig", chunksize=chunk_size)
+        return len(df)
+    if extension == ".parquet":
+        _parquet_frame(df).to_parquet(file_path, index=False)
+        return len(df)
+    raise ValueError(f"Unsupported export format: {extension}")
@@ -0,0 +1,161 @@
+"""
+On-disk cache of parsed task workbooks.
+
+Parsing an .xlsx with pd.read_excel is slow, so the resulting DataFrame is
+pickled under CACHE_DIR. Entries are keyed by the workbook's fingerprint
+(absolute path, size, mtime and a content hash): an unchanged file loads from
+the pickle, any rewrite of the file produces a new key. Writers in this
+project also call invalidate_cache() so stale entries are removed
+immediately. The directory is capped at MAX_CACHE_BYTES with
+least-recently-used eviction; a cache hit refreshes the entry's mtime.
+"""
+import glob
+import hashlib
+import os
+import threading
+
+import pandas as pd
+
+from utils.excel_stream import read_excel_streaming
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'workbooks')
+
+# Upper bound for the whole cache directory
+MAX_CACHE_BYTES = 512 * 1024 * 1024
+
+# Workbooks at least this large are parsed with the streaming reader
+STREAMING_MIN_BYTES = 20 * 1024 * 1024
+
+_HASH_CHUNK = 1024 * 1024
+
+# (path, size, mtime_ns) -> content hash, so a file is hashed once per session
+_hash_memo = {}
+_lock = threading.Lock()
+
+
+def _path_key(file_path):
+    return hashlib.sha1(os.path.abspath(file_path).encode('utf-8')).hexdigest()[:16]
+
+
+def file_fingerprint(file_path):
+    """
+    Return (absolute path, size, mtime_ns, content hash) of a file.
+
+    The content hash is memoized per (path, size, mtime) for the lifetime
+    of the process.
+    """
+    abs_path = os.path.abspath(file_path)
+    stat = os.stat(abs_path)
+    stat_key = (abs_path, stat.st_size, stat.st_mtime_ns)
+
+    with _lock:
+        content_hash = _hash_memo.get(stat_key)
+    if content_hash is None:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(abs_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK), b''):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()
+        with _lock:
+            _hash_memo[stat_key] = content_hash
+
+    return abs_path, stat.st_size, stat.st_mtime_ns, content_hash
+
+
+def _cache_file(fingerprint):
+    abs_path, size, mtime_ns, content_hash = fingerprint
+    entry_key = hashlib.sha1(f"{size}|{mtime_ns}|{content_hash}".encode('utf-8')).hexdigest()[:16]
+    return os.path.join(CACHE_DIR, f"{_path_key(abs_path)}_{entry_key}.pkl")
+
+
+def read_excel_cached(file_path, **read_kwargs):
+    """
+    Read a workbook like pd.read_excel, using the on-disk cache when possible.
+
+    Args:
+        file_path: Path to the Excel file
+        read_kwargs: Extra arguments for pd.read_excel; calls with arguments
+            bypass the cache since they change the result
+
+    Returns:
+        DataFrame with the sheet contents
+    """
+    if read_kwargs:
+        return pd.read_excel(file_path, **read_kwargs)
+
+    fingerprint = file_fingerprint(file_path)
+    cache_file = _cache_file(fingerprint)
+
+    if os.path.exists(cache_file):
+        try:
+            df = pd.read_pickle(cache_file)
+            os.utime(cache_file, None)  # Mark as recently used
+            return df
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry {cache_file}: {str(e)}")
+
+    if fingerprint[1] >= STREAMING_MIN_BYTES:
+        df = read_excel_streaming(file_path)
+    else:
+        df = pd.read_excel(file_path)
+    store_cached(file_path, df, fingerprint)
+    return df
+
+
+def store_cached(file_path, df, fingerprint=None):
+    """Save a DataFrame as the cache entry for the current state of a workbook."""
+    if fingerprint is None:
+        fingerprint = file_fingerprint(file_path)
+    cache_file = _cache_file(fingerprint)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Older entries of the same workbook can never be hit again
+        invalidate_cache(file_path)
+
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        df.to_pickle(tmp_file)
+        os.replace(tmp_file, cache_file)
+        evict_cache()
+    except Exception as e:
+        # The cache is an optimization only; never fail the caller
+        print(f"Could not cache {file_path}: {str(e)}")
+
+
+def invalidate_cache(file_path):
+    """Remove all cache entries of a workbook, e.g. after it was rewritten."""
+    for cache_file in glob.glob(os.path.join(CACHE_DIR, f"{_path_key(file_path)}_*.pkl")):
+        try:
+            os.remove(cache_file)
+        except OSError:
+            pass
+
+
+def evict_cache(max_bytes=None):
+    """Delete least-recently-used entries until the cache fits in max_bytes."""
+    if max_bytes is None:
+        max_bytes = MAX_CACHE_BYTES
+
+    entries = []
+    for cache_file in glob.glob(os.path.join(CACHE_DIR, "*.pkl")):
+        try:
+            stat = os.stat(cache_file)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, cache_file))
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, cache_file in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(cache_file)
+            total -= size
+        except OSError:
+            pass
+
+
+def clear_cache():
+    """Remove every cache entry."""
+    evict_cache(max_bytes=0)
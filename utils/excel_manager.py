@@ -1,12 +1,37 @@
 import os
+import re
+import numpy as np
 import pandas as pd
 from datetime import datetime
-from openpyxl import Workbook, load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
+from database.award_catalog import catalog_ids
+from database.db_manager import IN_BATCH
+from database.person_registry import link_identities, people_by_key, task_name_matcher
+from database.task_rows import append_rows, mark_rows_current, rows_current, store_rows
+from utils.excel_cache import file_fingerprint, invalidate_cache
+from utils.excel_stream import iter_excel_chunks, read_excel_header, write_excel_streaming
 from models.person import Person
 from models.award import Award
+from models.merge_ledger import MergeLedgerEntry
+from utils.names import normalize_name
+
+# Rows imported per batch when a merge reports progress / checks for cancel
+IMPORT_BATCH_ROWS = 2000
+
+# Empty bordered rows a new task template starts with
+TEMPLATE_BLANK_ROWS = 10
+
+# "Name (Year)": the name is everything before the first "(", the year the
+# digits right after it (same rules as parse_award_text)
+AWARD_PATTERN = re.compile(r'^(?P<name>[^(]*)\((?P<year>[0-9]+)(?=[()]|$)')
+
+class MergeCancelled(Exception):
+    """Raised when a merge or import is cancelled between two chunks."""
+
+def _check_cancelled(is_cancelled):
+    if is_cancelled is not None and is_cancelled():
+        raise MergeCancelled()
 
 def create_excel_template(file_path, columns):
     """
@@ -16,218 +41,481 @@ def create_excel_template(file_path, columns):
         file_path: Path to save the Excel file
         columns: List of column names
     """
-    # Create a new workbook and select the active worksheet
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Nhiệm vụ"
-    
-    # Define styles
-    header_font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
-    header_fill = PatternFill(start_color='4CAF50', end_color='4CAF50', fill_type='solid')
-    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-    border = Border(
-        left=Side(style='thin'), 
-        right=Side(style='thin'), 
-        top=Side(style='thin'), 
-        bottom=Side(style='thin')
-    )
+    # Header plus 10 empty bordered rows for data, in the shared task styles
+    blank_rows = pd.DataFrame([[None] * len(columns)] * TEMPLATE_BLANK_ROWS, columns=columns)
+    write_excel_streaming(file_path, list(columns), [blank_rows])
+    invalidate_cache(file_path)
+
+def parse_award_text(award_text):
+    """
+    Split an award cell into its name and year.
     
-    # Add header row
-    for col_idx, column in enumerate(columns, start=1):
-        cell = ws.cell(row=1, column=col_idx)
-        cell.value = column
-        cell.font = header_font
-        cell.fill = header_fill
-        cell.alignment = header_alignment
-        cell.border = border
+    Args:
+        award_text: Raw cell value, e.g. "Giấy khen (2023)"
         
-        # Set column width
-        column_letter = get_column_letter(col_idx)
-        ws.column_dimensions[column_letter].width = 20
+    Returns:
+        Tuple (award_name, award_year). The year defaults to the current year
+        when the text carries no "(Year)" suffix.
+    """
+    award_name = str(award_text).strip()
+    award_year = datetime.now().year  # Default to current year
     
-    # Add 10 empty rows for data
-    for row_idx in range(2, 12):
-        for col_idx in range(1, len(columns) + 1):
-            cell = ws.cell(row=row_idx, column=col_idx)
-            cell.border = border
+    # Check if award has year in parentheses
+    if "(" in award_name and ")" in award_name:
+        try:
+            year_text = award_name.split("(")[1].split(")")[0]
+            if year_text.isdigit():
+                award_year = int(year_text)
+                award_name = award_name.split("(")[0].strip()
+        except Exception:
+            pass
     
-    # Save the workbook
-    wb.save(file_path)
+    return award_name, award_year
+
+def _strip_text(values):
+    """Stripped str() of each value; missing values become ""."""
+    text = pd.Series(values, dtype=object)
+    return text.where(text.notna(), "").astype(str).str.strip()
 
-def merge_excel_files(input_files, output_file):
+def extract_awards(df):
     """
-    Merge multiple Excel files into one by appending all rows.
+    Turn the award columns of a task sheet into one row per award.
+    
+    The award columns are flattened into a long, row-major sequence of cells.
+    Award titles repeat a lot, so the cell texts are factorized first and the
+    AWARD_PATTERN extract runs once per distinct text; empty cells and
+    repeats of the same award for the same person are then dropped on the
+    integer codes. Cells are turned into text before they are factorized,
+    since factorize treats 5 and 5.0 as one value while str() does not.
     
     Args:
-        input_files: List of input Excel file paths
-        output_file: Path to save the merged Excel file
+        df: DataFrame with the person name in the first column and awards
+            in the others
+        
+    Returns:
+        DataFrame with columns person, award_name, year and category (the
+        header of the column the award came from), in sheet order
     """
-    # Check if input files exist
-    for file in input_files:
-        if not os.path.exists(file):
-            raise FileNotFoundError(f"File not found: {file}")
+    columns = ["person", "award_name", "year", "category"]
+    if df.empty or len(df.columns) < 2:
+        return pd.DataFrame(columns=columns)
     
-    # Validate input
-    if not input_files:
-        raise ValueError("No input files provided")
+    award_columns = np.asarray(df.columns[1:], dtype=object)
+    width = len(award_columns)
     
-    # Read all dataframes with explicit sheet name
-    all_data = []
-    headers = None
+    # Person code of every row, -1 for rows without a name
+    person_codes, people = pd.factorize(_strip_text(df.iloc[:, 0]))
+    people = np.asarray(people, dtype=object)
+    person_codes = np.where(people[person_codes] == "", -1, person_codes)
     
-    # First, get headers from the first file to ensure consistency
-    first_df = pd.read_excel(input_files[0])
-    headers = list(first_df.columns)
-    all_data.append(first_df)
+    # Long frame: one cell per (row, award column), row by row
+    cell_codes, cell_texts = pd.factorize(_strip_text(df.iloc[:, 1:].to_numpy(dtype=object).ravel()))
+    text = pd.Series(cell_texts, dtype=object)
     
-    # Process remaining files
-    for file in input_files[1:]:
-        try:
-            # Read with the same column structure
-            df = pd.read_excel(file)
-            
-            # Check if columns match, if not, try to align them
-            if list(df.columns) != headers:
-                # Reorder columns if possible, or fill missing ones
-                df = df.reindex(columns=headers, fill_value=None)
-            
-            all_data.append(df)
-        except Exception as e:
-            print(f"Error reading {file}: {str(e)}")
+    # Sheets listing names without awards yet (or awards without names)
+    if (person_codes < 0).all() or (text == "").all():
+        return pd.DataFrame(columns=columns)
     
-    # Concatenate all dataframes, preserving all rows
-    if all_data:
-        try:
-            # Use axis=0 to append rows (default)
-            merged_df = pd.concat(all_data, ignore_index=True, sort=False)
-            
-            # Apply styling to the output file
-            with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-                merged_df.to_excel(writer, index=False, sheet_name="Nhiệm vụ")
-                
-                # Apply styling to the header
-                workbook = writer.book
-                worksheet = writer.sheets["Nhiệm vụ"]
-                
-                # Define styles
-                header_font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
-                header_fill = PatternFill(start_color='4CAF50', end_color='4CAF50', fill_type='solid')
-                header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-                border = Border(
-                    left=Side(style='thin'), 
-                    right=Side(style='thin'), 
-                    top=Side(style='thin'), 
-                    bottom=Side(style='thin')
-                )
-                
-                # Apply styles to header row
-                for col_idx, column in enumerate(merged_df.columns, start=1):
-                    cell = worksheet.cell(row=1, column=col_idx)
-                    cell.font = header_font
-                    cell.fill = header_fill
-                    cell.alignment = header_alignment
-                    cell.border = border
-                    
-                    # Set column width
-                    column_letter = get_column_letter(col_idx)
-                    worksheet.column_dimensions[column_letter].width = 20
-                
-                # Apply borders to all data cells
-                for row_idx in range(2, len(merged_df) + 2):  # +2 because Excel is 1-indexed and we have a header row
-                    for col_idx in range(1, len(merged_df.columns) + 1):
-                        cell = worksheet.cell(row=row_idx, column=col_idx)
-                        cell.border = border
-                        
-        except Exception as e:
-            raise Exception(f"Error merging files: {str(e)}")
-    else:
-        # Create an empty Excel file if no data
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Nhiệm vụ"
-        wb.save(output_file)
+    parts = text.str.extract(AWARD_PATTERN)
+    has_year = parts["year"].notna() & text.str.contains(")", regex=False)
+    award_names = text.where(~has_year, parts["name"].str.strip())
+    award_years = parts["year"].where(has_year, datetime.now().year).astype(int)
+    
+    # Distinct texts that parse to the same award share one code
+    award_codes, _ = pd.factorize(pd.MultiIndex.from_arrays([award_names, award_years]))
+    award_codes = np.where(text.to_numpy() == "", -1, award_codes)
+    
+    cell_awards = award_codes[cell_codes]
+    cell_people = np.repeat(person_codes, width)
+    keep = (cell_awards >= 0) & (cell_people >= 0)
+    
+    positions = np.flatnonzero(keep)
+    pair_keys = cell_people[positions].astype(np.int64) * (len(text) + 1) + cell_awards[positions]
+    positions = positions[~pd.Series(pair_keys).duplicated().to_numpy()]
+    
+    cells = cell_codes[positions]
+    return pd.DataFrame({
+        "person": people[cell_people[positions]],
+        "award_name": award_names.to_numpy(dtype=object)[cells],
+        "year": award_years.to_numpy()[cells],
+        "category": award_columns[positions % width],
+    }, columns=columns)
+
+def _load_person_ids(session, task_id, names=None):
+    """Map person names of a task to their ids (all people, or just `names`)."""
+    query = session.query(Person.name, Person.id).filter(Person.task_id == task_id)
+    if names is None:
+        return dict(query.all())
+    
+    # Indexed IN lookups, batched to stay under SQLite's bound-parameter limit
+    person_ids = {}
+    for start in range(0, len(names), IN_BATCH):
+        batch = names[start:start + IN_BATCH]
+        person_ids.update(query.filter(Person.name.in_(batch)).all())
+    return person_ids
+
+def _resolve_people(session, task_id, names, name_matcher=None):
+    """
+    Map each spelling of a name to a person of the task, creating new people.
+    
+    A name is matched, in order, to the person with exactly that name, to
+    one whose name only differs in diacritics, case or spacing, and, with a
+    name_matcher, to the most similar name above its threshold. Spellings
+    left over that share a normalized name become one new person, stored
+    under the first spelling.
+    
+    Returns:
+        Dict name -> person id covering every name
+    """
+    person_ids = _load_person_ids(session, task_id, names)
+    missing = [name for name in names if name not in person_ids]
+    if not missing:
+        return person_ids
+    
+    keys = {name: normalize_name(name) for name in missing}
+    existing = people_by_key(session, task_id, set(keys.values()))
+    
+    new_people = {}
+    for name in missing:
+        key = keys[name]
+        if key in existing:
+            person_ids[name] = existing[key]
+            continue
+        if name_matcher is not None and key not in new_people:
+            match = name_matcher.best(name)
+            if match is not None:
+                person_ids[name] = existing[key] = match
+                continue
+        new_people.setdefault(key, name)
+    
+    if new_people:
+        canonical = list(new_people.values())
+        session.execute(
+            sqlite_insert(Person).on_conflict_do_nothing(index_elements=["task_id", "name"]),
+            [{"name": name, "task_id": task_id} for name in canonical]
+        )
+        # New people join their cross-task identity
+        link_identities(session, task_id, canonical)
+        created = _load_person_ids(session, task_id, canonical)
+        for name in missing:
+            if name not in person_ids:
+                person_ids[name] = created[new_people[keys[name]]]
+        if name_matcher is not None:
+            for name in canonical:
+                name_matcher.add(name, created[name])
+    return person_ids
 
-def import_excel_data(file_path, task, session):
+def import_excel_data(file_path, task, session, chunk_size=None, fuzzy_threshold=None):
     """
     Import data from an Excel file into the database.
     
+    All rows are resolved in memory and written with batched
+    INSERT ... ON CONFLICT DO NOTHING statements (people, award titles,
+    awards); the unique indexes on people (task_id, name), award_catalog (name)
+    and awards (person_id, catalog_id, year) skip rows that already exist, so
+    nothing is looked up per row.
+    
     Args:
         file_path: Path to the Excel file
         task: Task object to associate with the imported data
         session: Database session
+        chunk_size: If given, stream the sheet in chunks of this many rows
+            so memory use does not grow with the file size
+        fuzzy_threshold: If given, a name without an exact or accent/case
+            insensitive match joins the most similar person of the task with
+            at least this trigram similarity (0..1)
     """
     # Check if file exists
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
     
+    name_matcher = None
+    if fuzzy_threshold is not None:
+        name_matcher = task_name_matcher(session, task.id, fuzzy_threshold)
+    
+    # Importing the task's own workbook also fills its row store
+    content_hash = None
+    if task.excel_path and os.path.abspath(file_path) == os.path.abspath(task.excel_path):
+        content_hash = file_fingerprint(file_path)[3]
+    
+    if chunk_size:
+        for index, chunk in enumerate(iter_excel_chunks(file_path, chunk_size)):
+            import_dataframe(chunk, task, session, name_matcher)
+            if content_hash is not None:
+                if index == 0:
+                    store_rows(session, task.id, chunk, content_hash)
+                else:
+                    append_rows(session, task.id, chunk, content_hash)
+        return
+    
     # Read Excel file
     df = pd.read_excel(file_path)
     
+    import_dataframe(df, task, session, name_matcher)
+    if content_hash is not None:
+        store_rows(session, task.id, df, content_hash)
+
+def import_dataframe(df, task, session, name_matcher=None):
+    """
+    Import the rows of a task sheet that is already loaded as a DataFrame.
+    
+    The first column holds the person name, every other column an award.
+    Names are matched to existing people ignoring diacritics, case and
+    spacing (see _resolve_people).
+    
+    Args:
+        df: DataFrame with the sheet rows
+        task: Task object to associate with the imported data
+        session: Database session
+        name_matcher: Optional NameMatcher of the task's people for
+            approximate name matches
+    """
     # Check if the dataframe is empty
     if df.empty:
         return
     
-    # Get the name column (assuming the first column is always the name)
-    name_column = df.columns[0]
-    
-    # Clear existing people for this task to avoid duplicates when reimporting
-    # This is optional and depends on whether you want to replace or append data
-    # Uncomment the following lines if you want to clear existing data before import
-    # existing_people = session.query(Person).filter(Person.task_id == task.id).all()
-    # for person in existing_people:
-    #     session.delete(person)
-    # session.flush()
-    
-    # Process each row
-    for _, row in df.iterrows():
-        name = row[name_column]
-        if not pd.isna(name) and name.strip():
-            # Check if person already exists
-            person = session.query(Person).filter(
-                Person.name == name.strip(),
-                Person.task_id == task.id
-            ).first()
-            
-            # Create a new person if not exists
-            if not person:
-                person = Person(name=name.strip(), task_id=task.id)
-                session.add(person)
-                session.flush()  # Flush to get the person ID
+    # Unique non-empty names in sheet order
+    names = _strip_text(df.iloc[:, 0])
+    people = names[names != ""].drop_duplicates().tolist()
+    
+    # One row per (person, award, year), parsed column-wise
+    awards = extract_awards(df)
+    
+    # Every spelling of a name maps to one person of the task
+    person_ids = _resolve_people(session, task.id, people, name_matcher)
+    
+    # Insert awards in one batch, skipping those already stored; titles are
+    # stored once in the catalog and referenced by id
+    if not awards.empty:
+        title_ids = catalog_ids(session, zip(awards["award_name"], awards["category"]))
+        session.execute(
+            sqlite_insert(Award).on_conflict_do_nothing(index_elements=["person_id", "catalog_id", "year"]),
+            [
+                {"catalog_id": title_ids[(award_name, category)], "year": int(award_year), "person_id": person_ids[name]}
+                for name, award_name, award_year, category in zip(
+                    awards["person"], awards["award_name"], awards["year"], awards["category"]
+                )
+            ]
+        )
+
+def append_rows_to_excel(file_path, chunks):
+    """
+    Append rows below the existing data of a task workbook.
+    
+    The workbook is streamed into a new one (existing rows, then the new
+    chunks) through write_excel_streaming, so memory use does not grow with
+    the sheet and every cell gets the shared task styles. Blank template
+    rows after the last data row are dropped.
+    
+    Args:
+        file_path: Path to the Excel file
+        chunks: Iterable of DataFrames to append, with the sheet's columns
+        
+    Returns:
+        Number of rows appended
+    """
+    headers = read_excel_header(file_path)
+    appended = 0
+    
+    def rows():
+        nonlocal appended
+        yield from iter_excel_chunks(file_path)
+        for chunk in chunks:
+            appended += len(chunk)
+            yield chunk
+    
+    write_excel_streaming(file_path, headers, rows())
+    invalidate_cache(file_path)
+    return appended
+
+def _aligned_chunks(file_path, headers, skip_rows=0):
+    """
+    Stream the rows of an input file in the column order of the task sheet.
+    
+    Args:
+        file_path: Input workbook
+        headers: Column names of the task sheet
+        skip_rows: Number of leading data rows to leave out
+    """
+    position = 0
+    for chunk in iter_excel_chunks(file_path, IMPORT_BATCH_ROWS):
+        start = position
+        position += len(chunk)
+        if position <= skip_rows:
+            continue
+        if start < skip_rows:
+            chunk = chunk.iloc[skip_rows - start:].reset_index(drop=True)
+        if list(chunk.columns) != headers:
+            chunk = chunk.reindex(columns=headers, fill_value=None)
+        yield chunk
+
+def _count_rows(file_path):
+    """Number of data rows of a workbook, streamed."""
+    return sum(len(chunk) for chunk in iter_excel_chunks(file_path, IMPORT_BATCH_ROWS))
+
+def merge_incremental(task, input_files, session, progress=None, is_cancelled=None):
+    """
+    Merge only files that were not merged into the task before.
+    
+    Every merged file is recorded in the task's merge ledger by content hash,
+    file name and row count. Files already in the ledger (or repeated in
+    input_files) are skipped. A changed copy of a file merged before (same
+    file name, new content) only contributes the rows beyond those merged
+    from the earlier copy: teams re-send their sheet with rows added at the
+    end, and the rows above are already in the task.
+    
+    The input files are streamed in chunks of IMPORT_BATCH_ROWS rows: each
+    chunk is imported, appended to the task's row store (database.task_rows)
+    and written into the new task workbook before the next one is read, so
+    memory use does not grow with the size of the files. On the task's first
+    merge the workbook's own rows are imported and stored as well. The caller
+    commits the session.
+    
+    Cancellation is checked between chunks. The new workbook only replaces
+    the task workbook after the last chunk, so rolling back the session after
+    MergeCancelled leaves everything unchanged. Files that cannot be opened
+    are reported in 'failed'; a file that breaks off while it is being read
+    fails the whole merge, with the same guarantee.
+    
+    Args:
+        task: Task whose workbook (task.excel_path) receives the rows
+        input_files: List of Excel file paths sent by the teams
+        session: Database session
+        progress: Optional callback(stage, done, total); stage is "read"
+            (files opened), "import" (files merged) or "write"
+        is_cancelled: Optional callable returning True to stop the merge
+        
+    Returns:
+        Dict with 'merged' and 'skipped' file lists, 'failed' as
+        (file, error) pairs and the number of 'rows' appended
+    """
+    def report(stage, done, total):
+        if progress is not None:
+            progress(stage, done, total)
+    
+    output_file = task.excel_path
+    if not os.path.exists(output_file):
+        raise FileNotFoundError(f"File not found: {output_file}")
+    for file in input_files:
+        if not os.path.exists(file):
+            raise FileNotFoundError(f"File not found: {file}")
+    
+    ledger = (
+        session.query(MergeLedgerEntry.file_name, MergeLedgerEntry.content_hash, MergeLedgerEntry.row_count)
+        .filter(MergeLedgerEntry.task_id == task.id)
+        .order_by(MergeLedgerEntry.id)
+        .all()
+    )
+    merged_hashes = {content_hash for _, content_hash, _ in ledger}
+    # Rows taken from the latest merged copy of each file name
+    merged_rows = {os.path.basename(name): row_count for name, _, row_count in ledger}
+    
+    # First merge of the task: rows typed straight into its workbook have
+    # never been imported either; they also seed the task's row store
+    if not merged_hashes:
+        content_hash = file_fingerprint(output_file)[3]
+        stored = False
+        for chunk in iter_excel_chunks(output_file, IMPORT_BATCH_ROWS):
+            _check_cancelled(is_cancelled)
+            import_dataframe(chunk, task, session)
+            if stored:
+                append_rows(session, task.id, chunk, content_hash)
+            else:
+                store_rows(session, task.id, chunk, content_hash)
+                stored = True
+        # A workbook without data rows (a fresh template) still seeds the
+        # store with its header, so the merged rows can be appended to it
+        if not stored:
+            store_rows(session, task.id, pd.DataFrame(columns=read_excel_header(output_file)), content_hash)
+    
+    # Pick the files whose content is new for this task
+    new_files = []
+    skipped = []
+    for file in input_files:
+        content_hash = file_fingerprint(file)[3]
+        if os.path.abspath(file) == os.path.abspath(output_file) or content_hash in merged_hashes:
+            skipped.append(file)
+            continue
+        merged_hashes.add(content_hash)
+        new_files.append((file, content_hash))
+    
+    result = {"merged": [], "skipped": skipped, "failed": [], "rows": 0}
+    
+    # Open every new file before anything is written; unreadable ones are left out
+    readable = []
+    for done, (file, content_hash) in enumerate(new_files, start=1):
+        _check_cancelled(is_cancelled)
+        try:
+            read_excel_header(file)
+        except Exception as e:
+            print(f"Error reading {file}: {str(e)}")
+            result["failed"].append((file, e))
+        else:
+            readable.append((file, content_hash))
+        report("read", done, len(new_files))
+    
+    # Rows of an earlier copy of a file are already in the task
+    file_names = [os.path.basename(file) for file, _ in readable]
+    pending = []
+    for (file, content_hash), file_name in zip(readable, file_names):
+        skip_rows = merged_rows.get(file_name, 0)
+        # Counted up front only for re-sent copies and for a file name that
+        # comes again later in this batch
+        if not skip_rows and file_names.count(file_name) == 1:
+            pending.append((file, content_hash, skip_rows))
+            continue
+        row_count = _count_rows(file)
+        merged_rows[file_name] = max(row_count, skip_rows)
+        if row_count > skip_rows:
+            pending.append((file, content_hash, skip_rows))
+            continue
+        # Nothing new: only remember this copy
+        session.add(MergeLedgerEntry(
+            task_id=task.id,
+            file_name=os.path.abspath(file),
+            content_hash=content_hash,
+            row_count=row_count,
+            merged_at=datetime.now()
+        ))
+        result["merged"].append(file)
+    if not pending:
+        return result
+    
+    # The task workbook's header is the canonical schema
+    headers = read_excel_header(output_file)
+    
+    # Only a store that mirrors the workbook as it is now can be appended to;
+    # otherwise it is rebuilt from the file the next time the task is opened
+    store_is_current = rows_current(session, task.id, file_fingerprint(output_file)[3])
+    
+    def new_chunks():
+        for done, (file, content_hash, skip_rows) in enumerate(pending, start=1):
+            row_count = skip_rows
+            for chunk in _aligned_chunks(file, headers, skip_rows):
+                _check_cancelled(is_cancelled)
+                import_dataframe(chunk, task, session)
+                if store_is_current:
+                    append_rows(session, task.id, chunk)
+                row_count += len(chunk)
+                result["rows"] += len(chunk)
+                yield chunk
             
-            # Process all other columns as potential award columns
-            # Skip the first column (name) and process all others
-            for col in df.columns[1:]:
-                award_text = row[col]
-                if not pd.isna(award_text) and str(award_text).strip():
-                    # Try to extract year from award text (format: "Award Name (Year)")
-                    award_name = str(award_text).strip()
-                    award_year = datetime.now().year  # Default to current year
-                    
-                    # Check if award has year in parentheses
-                    if "(" in award_name and ")" in award_name:
-                        try:
-                            year_text = award_name.split("(")[1].split(")")[0]
-                            if year_text.isdigit():
-                                award_year = int(year_text)
-                                award_name = award_name.split("(")[0].strip()
-                        except:
-                            pass
-                    
-                    # Use column name as award category if needed
-                    award_category = col
-                    
-                    # Check if award already exists
-                    award = session.query(Award).filter(
-                        Award.name == award_name,
-                        Award.year == award_year,
-                        Award.person_id == person.id
-                    ).first()
-                    
-                    # Create a new award if not exists
-                    if not award:
-                        award = Award(
-                            name=award_name,
-                            year=award_year,
-                            person_id=person.id
-                        )
-                        session.add(award)
+            session.add(MergeLedgerEntry(
+                task_id=task.id,
+                file_name=os.path.abspath(file),
+                content_hash=content_hash,
+                row_count=row_count,
+                merged_at=datetime.now()
+            ))
+            result["merged"].append(file)
+            report("import", done, len(pending))
+        
+        # Last point where the merge can still be cancelled without side effects
+        _check_cancelled(is_cancelled)
+        report("write", 0, 1)
+    
+    append_rows_to_excel(output_file, new_chunks())
+    if store_is_current:
+        mark_rows_current(session, task.id, file_fingerprint(output_file)[3])
+    report("write", 1, 1)
+    return result
@@ -0,0 +1,128 @@
+"""
+In-place edits of a task workbook.
+
+Rewriting the whole sheet through pd.ExcelWriter for one edited row is slow
+and drops the template's header styling. The functions here change only the
+affected cells and rows with openpyxl, so every other cell keeps its value and
+style. Row `position` of a DataFrame read from the workbook (pd.read_excel or
+utils.excel_stream) is sheet row position + 2, since row 1 is the header.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from utils.excel_cache import invalidate_cache, store_cached
+
+# Sheet row holding the column names
+HEADER_ROW = 1
+
+
+def sheet_row(position):
+    """Sheet row (1-based) of a DataFrame row position."""
+    return position + HEADER_ROW + 1
+
+
+def cell_value(value):
+    """Convert a DataFrame value to something openpyxl can store."""
+    if value is None:
+        return None
+    if isinstance(value, np.generic):
+        value = value.item()
+    try:
+        if pd.isna(value):
+            return None
+    except (TypeError, ValueError):
+        pass
+    return value
+
+
+def _typed_value(dtype, text):
+    """Parse edited text into the type of its column where it fits."""
+    if not text.strip():
+        return None
+    try:
+        if pd.api.types.is_integer_dtype(dtype):
+            return int(text)
+        if pd.api.types.is_float_dtype(dtype):
+            return float(text)
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return pd.Timestamp(text)
+    except ValueError:
+        pass
+    return text
+
+
+def assign_row_text(df, position, texts):
+    """
+    Write edited text into one row of a DataFrame, in place.
+
+    Cells whose text is unchanged are left alone. Other values are parsed to
+    the column's type when possible (an empty field becomes a missing value);
+    a column that cannot hold the new value is widened to object first.
+
+    Args:
+        df: DataFrame read from the workbook
+        position: Row position in df
+        texts: {column_index: text} as shown in the edit form
+
+    Returns:
+        {column_index: value} of the cells that changed
+    """
+    changed = {}
+    for column, text in texts.items():
+        current = df.iat[position, column]
+        if text == (str(current) if pd.notna(current) else ""):
+            continue
+        value = _typed_value(df.dtypes.iloc[column], text)
+        try:
+            df.iat[position, column] = value
+        except (TypeError, ValueError):
+            # e.g. text typed into a numeric column
+            df.isetitem(column, df.iloc[:, column].astype(object))
+            df.iat[position, column] = value
+        changed[column] = value
+    return changed
+
+
+def apply_row_patches(file_path, patches, snapshot=None):
+    """
+    Apply a batch of row edits with one load and one save of the workbook.
+
+    Args:
+        file_path: Path to the task workbook
+        patches: Sequence of ("update", position, {column_index: value}) and
+            ("delete", position, None) in the order they were made; each
+            position refers to the rows as they were at that moment
+        snapshot: Optional DataFrame equal to the sheet after the patches;
+            stored as the new cache entry so the next open skips parsing
+
+    Returns:
+        Number of patches applied
+    """
+    wb = load_workbook(file_path)
+    ws = wb.worksheets[0]
+    for operation, position, values in patches:
+        row = sheet_row(position)
+        if operation == "update":
+            for column, value in values.items():
+                # Existing cells keep their border/font, only the value changes
+                ws.cell(row=row, column=column + 1).value = cell_value(value)
+        elif operation == "delete":
+            ws.delete_rows(row)
+        else:
+            raise ValueError(f"Unknown patch operation: {operation}")
+
+    tmp_file = f"{file_path}.tmp.xlsx"
+    try:
+        wb.save(tmp_file)
+        os.replace(tmp_file, file_path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+    invalidate_cache(file_path)
+    if snapshot is not None:
+        store_cached(file_path, snapshot)
+    return len(patches)
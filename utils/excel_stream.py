@@ -0,0 +1,214 @@
+"""
+Streaming access to large workbooks.
+
+pd.read_excel builds the whole sheet in memory (openpyxl's cell objects plus
+the DataFrame). The reader here opens the workbook in openpyxl read-only
+mode and yields DataFrames of at most chunk_size rows, so callers can process
+arbitrarily large sheets with roughly constant peak memory.
+
+The writer is the mirror image: an openpyxl write-only workbook that
+serializes each row as soon as it is appended. Header and cell formatting
+come from two shared named styles, so styling costs nothing per cell.
+"""
+import os
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.utils import get_column_letter
+
+# Default number of rows per chunk
+CHUNK_SIZE = 5000
+
+SHEET_NAME = "Nhiệm vụ"
+HEADER_STYLE = "task_header"
+CELL_STYLE = "task_cell"
+COLUMN_WIDTH = 20
+
+
+def _header_names(values):
+    """Column names as pandas would produce them (Unnamed: i, X.1 for repeats)."""
+    names = []
+    seen = {}
+    for idx, value in enumerate(values):
+        name = f"Unnamed: {idx}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def read_excel_header(file_path):
+    """Return the column names of the first sheet without reading its rows."""
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        for values in ws.iter_rows(min_row=1, max_row=1, values_only=True):
+            # Trailing empty header cells are not columns
+            values = list(values)
+            while values and values[-1] is None:
+                values.pop()
+            return _header_names(values)
+        return []
+    finally:
+        wb.close()
+
+
+def iter_excel_chunks(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Yield the rows of the first sheet as DataFrames of at most chunk_size rows.
+
+    The first row is the header. Completely empty rows after the last data
+    row (e.g. the bordered blank rows of a fresh template) are dropped; empty
+    rows between data rows are kept, as pd.read_excel does, so row i of the
+    result is always sheet row i + 2.
+
+    Args:
+        file_path: Path to the Excel file
+        chunk_size: Maximum number of rows per DataFrame
+    """
+    wb = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        ws = wb.worksheets[0]
+        rows = ws.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        header = list(header)
+        while header and header[-1] is None:
+            header.pop()
+        columns = _header_names(header)
+        width = len(columns)
+
+        buffer = []
+        # Empty rows seen since the last data row; kept only if data follows
+        blank_rows = 0
+        for values in rows:
+            values = list(values[:width])
+            if all(value is None for value in values):
+                blank_rows += 1
+                continue
+            if len(values) < width:
+                values.extend([None] * (width - len(values)))
+            pending = [[None] * width for _ in range(blank_rows)] + [values]
+            blank_rows = 0
+            for row in pending:
+                buffer.append(row)
+                if len(buffer) >= chunk_size:
+                    yield pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+
+        if buffer:
+            yield pd.DataFrame(buffer, columns=columns)
+    finally:
+        wb.close()
+
+
+def read_excel_streaming(file_path, chunk_size=CHUNK_SIZE):
+    """
+    Read a whole sheet through iter_excel_chunks.
+
+    Used instead of pd.read_excel for very large files: only the final
+    DataFrame is held in memory, not openpyxl's full cell tree.
+    """
+    chunks = list(iter_excel_chunks(file_path, chunk_size))
+    if not chunks:
+        return pd.DataFrame(columns=read_excel_header(file_path))
+    if len(chunks) == 1:
+        return chunks[0]
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _task_styles():
+    """
+    Named styles for the green header row and bordered data cells.
+
+    This is the only place the task sheet look is defined; templates,
+    merges and exports are all written through write_excel_streaming.
+    """
+    border = Border(
+        left=Side(style='thin'), 
+        right=Side(style='thin'), 
+        top=Side(style='thin'), 
+        bottom=Side(style='thin')
+    )
+    header = NamedStyle(name=HEADER_STYLE)
+    header.font = Font(name='Arial', size=12, bold=True, color='FFFFFF')
+    header.fill = PatternFill(start_color='4CAF50', end_color='4CAF50', fill_type='solid')
+    header.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header.border = border
+
+    cell = NamedStyle(name=CELL_STYLE)
+    cell.border = border
+    return header, cell
+
+
+def write_excel_streaming(file_path, headers, chunks):
+    """
+    Write a styled task sheet from an iterable of DataFrame chunks.
+
+    Rows are serialized as they are appended to an openpyxl write-only
+    workbook; the file is written next to file_path and moved into place at
+    the end, so file_path may also be one of the inputs being read. If the
+    chunks raise (a cancelled merge), file_path is left as it was.
+
+    Args:
+        file_path: Path of the workbook to create
+        headers: Column names, in output order
+        chunks: Iterable of DataFrames; columns are aligned to headers
+
+    Returns:
+        Number of data rows written
+    """
+    wb = Workbook(write_only=True)
+    header_style, cell_style = _task_styles()
+    wb.add_named_style(header_style)
+    wb.add_named_style(cell_style)
+
+    ws = wb.create_sheet(SHEET_NAME)
+    for col_idx in range(1, len(headers) + 1):
+        ws.column_dimensions[get_column_letter(col_idx)].width = COLUMN_WIDTH
+
+    header_cells = []
+    for column in headers:
+        cell = WriteOnlyCell(ws, value=column)
+        cell.style = HEADER_STYLE
+        header_cells.append(cell)
+    ws.append(header_cells)
+
+    def styled_cell(value):
+        # A fresh cell per value: assigning a date to a cell also sets its
+        # number format, which a reused cell would carry over to the next
+        # value. The style goes first, since it resets the number format.
+        cell = WriteOnlyCell(ws)
+        cell.style = CELL_STYLE
+        cell.value = value
+        return cell
+
+    row_count = 0
+    try:
+        for chunk in chunks:
+            if list(chunk.columns) != list(headers):
+                chunk = chunk.reindex(columns=headers, fill_value=None)
+            values = chunk.astype(object).where(chunk.notna(), None)
+            for row in values.itertuples(index=False, name=None):
+                ws.append([styled_cell(value) for value in row])
+            row_count += len(chunk)
+    except BaseException:
+        # e.g. a cancelled merge: close the sheet's stream, file_path is untouched
+        ws.close()
+        raise
+
+    tmp_file = f"{file_path}.tmp.xlsx"
+    try:
+        wb.save(tmp_file)
+        os.replace(tmp_file, file_path)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+    return row_count
@@ -0,0 +1,166 @@
+"""
+Normalization of Vietnamese person names.
+
+Workbooks spell the same name with or without diacritics, in any case and
+with stray spaces ("Nguyễn Văn  A", "nguyen van a"). normalize_name() maps
+all of them to one key: Unicode NFD with the combining marks removed, "đ"
+folded to "d" (it has no decomposition), case-folded and with whitespace
+collapsed.
+
+NameMatcher adds approximate matching on top of that key ("Nguyen Van Anh"
+vs "Nguyễn Văn Ánh", a missing letter, swapped spacing) using the Jaccard
+similarity of character trigrams. Candidates come from an inverted trigram
+index probed with only the rarest trigrams of the query (prefix filtering),
+so a lookup touches a small part of the names instead of all of them.
+"""
+import math
+import re
+import unicodedata
+from functools import lru_cache
+
+_WHITESPACE = re.compile(r'\s+')
+# Combining diacritical marks; all Vietnamese tone and vowel marks are here
+_COMBINING = re.compile('[\u0300-\u036f]')
+
+# Default minimum trigram similarity of an approximate match
+DEFAULT_THRESHOLD = 0.6
+
+
+def fold_diacritics(text):
+    """Remove Vietnamese diacritics, e.g. "Đặng Thị Ánh" -> "Dang Thi Anh"."""
+    stripped = _COMBINING.sub('', unicodedata.normalize('NFD', text))
+    return stripped.replace('đ', 'd').replace('Đ', 'D')
+
+
+@lru_cache(maxsize=65536)
+def _normalize_text(text):
+    return _WHITESPACE.sub(' ', fold_diacritics(text).casefold()).strip()
+
+
+def normalize_name(name):
+    """
+    Return the matching key of a person name.
+    
+    Args:
+        name: Name as written in a workbook (None/NaN give "")
+        
+    Returns:
+        Diacritic-free, case-folded name with single spaces
+    """
+    if name is None or name != name:  # None or NaN
+        return ""
+    return _normalize_text(str(name))
+
+
+def name_trigrams(key):
+    """Set of character trigrams of a normalized name, padded at the ends."""
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class NameMatcher:
+    """
+    Index of names for diacritic-insensitive exact and approximate lookups.
+
+    Names are stored under their normalize_name() key; each key can carry
+    several values (e.g. person ids or row positions).
+    """
+
+    def __init__(self, names=(), threshold=DEFAULT_THRESHOLD):
+        """
+        Args:
+            names: Initial names; each is stored with itself as value
+            threshold: Default minimum similarity (0..1) for match()
+        """
+        self.threshold = threshold
+        self._key_ids = {}    # key -> key id
+        self._keys = []       # key id -> key
+        self._values = []     # key id -> list of values
+        self._grams = []      # key id -> trigram set
+        self._postings = {}   # trigram -> list of key ids
+        for name in names:
+            self.add(name)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, name, value=None):
+        """Index a name; value defaults to the name itself."""
+        key = normalize_name(name)
+        if not key:
+            return
+        if value is None:
+            value = name
+
+        key_id = self._key_ids.get(key)
+        if key_id is None:
+            key_id = len(self._keys)
+            self._key_ids[key] = key_id
+            self._keys.append(key)
+            self._values.append([])
+            grams = name_trigrams(key)
+            self._grams.append(grams)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(key_id)
+        self._values[key_id].append(value)
+
+    def exact(self, name):
+        """Values stored under the same normalized name."""
+        key_id = self._key_ids.get(normalize_name(name))
+        return [] if key_id is None else list(self._values[key_id])
+
+    def match(self, name, threshold=None, limit=None):
+        """
+        Find names similar to the given one.
+
+        Args:
+            name: Name to look up
+            threshold: Minimum trigram similarity; defaults to self.threshold
+            limit: Maximum number of keys returned (None for all)
+
+        Returns:
+            List of (value, score) pairs, best score first; values of the
+            same key share its score
+        """
+        key = normalize_name(name)
+        if not key:
+            return []
+        if threshold is None:
+            threshold = self.threshold
+
+        results = []
+        key_id = self._key_ids.get(key)
+        if key_id is not None:
+            results.append((key_id, 1.0))
+
+        grams = name_trigrams(key)
+        size = len(grams)
+        # Jaccard >= threshold needs at least this many shared trigrams, so
+        # every match shares one of the (size - overlap + 1) rarest ones
+        overlap = max(1, math.ceil(threshold * size))
+        probes = sorted(grams, key=lambda gram: len(self._postings.get(gram, ())))
+        candidates = set()
+        for gram in probes[:size - overlap + 1]:
+            candidates.update(self._postings.get(gram, ()))
+        candidates.discard(key_id)
+
+        min_size = threshold * size
+        max_size = size / threshold if threshold > 0 else math.inf
+        for candidate in candidates:
+            other = self._grams[candidate]
+            if not min_size <= len(other) <= max_size:
+                continue
+            shared = len(grams & other)
+            score = shared / (size + len(other) - shared)
+            if score >= threshold:
+                results.append((candidate, score))
+
+        results.sort(key=lambda item: (-item[1], self._keys[item[0]]))
+        if limit is not None:
+            results = results[:limit]
+        return [(value, score) for key_id, score in results for value in self._values[key_id]]
+
+    def best(self, name, threshold=None):
+        """Value of the most similar name, or None if none reaches the threshold."""
+        matches = self.match(name, threshold, limit=1)
+        return matches[0][0] if matches else None
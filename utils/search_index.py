@@ -0,0 +1,253 @@
+"""
+In-memory search over the rows of a task sheet.
+
+SearchIndex keeps the display text of every cell (as typed, lower-cased and,
+on demand, folded by normalize_name) so the detail views can filter on each
+keystroke with vectorized pandas string operations instead of converting
+the sheet again.
+"""
+import numpy as np
+import pandas as pd
+
+from utils.names import NameMatcher, normalize_name
+
+# Separator between cells in the per-row text; never typed into a search box
+ROW_SEPARATOR = "\x1f"
+
+
+def _column_text(series):
+    """Convert a column to display strings, with empty strings for missing cells."""
+    return series.astype(str).where(series.notna(), "").to_numpy(dtype=object)
+
+
+def _fold_column(text):
+    """normalize_name() of every cell, computed once per distinct value."""
+    codes, uniques = pd.factorize(text)
+    folded = np.array([normalize_name(value) for value in uniques] + [""], dtype=object)
+    return pd.Series(folded[codes], index=text.index, dtype=object)
+
+
+class SearchIndex:
+    """
+    Precomputed text of a DataFrame for fast substring/equality filtering.
+
+    The string conversion and lower-casing of every cell is done once when the
+    index is built. Each query is then a single vectorized contains/equals over
+    arrays that already exist, and returns a boolean row mask aligned with the
+    DataFrame rows, so nothing is copied per keystroke.
+
+    Approximate queries ignore diacritics, case and spacing, and also match
+    the first (name) column by trigram similarity through a NameMatcher. The
+    folded text and the matcher are built on the first such query.
+    """
+
+    def __init__(self, dataframe):
+        self.columns = [str(column) for column in dataframe.columns]
+        self.row_count = len(dataframe)
+
+        self._text = {}
+        self._lower = {}
+        for name, column in zip(self.columns, dataframe.columns):
+            text = _column_text(dataframe[column])
+            self._text[name] = pd.Series(text, dtype=object)
+            self._lower[name] = self._text[name].str.lower()
+
+        # One string per row holding all of its cells, for global searches
+        if self.columns:
+            row_text = self._text[self.columns[0]]
+            for name in self.columns[1:]:
+                row_text = row_text + ROW_SEPARATOR + self._text[name]
+        else:
+            row_text = pd.Series([""] * self.row_count, dtype=object)
+        self._row_text = row_text
+        self._row_lower = row_text.str.lower()
+
+        # Built lazily for approximate queries
+        self._folded = {}
+        self._row_folded = None
+        self._name_matcher = None
+
+    def _folded_column(self, name):
+        if name not in self._folded:
+            self._folded[name] = _fold_column(self._text[name])
+        return self._folded[name]
+
+    def _folded_rows(self):
+        if self._row_folded is None:
+            if self.columns:
+                row_folded = self._folded_column(self.columns[0])
+                for name in self.columns[1:]:
+                    row_folded = row_folded + ROW_SEPARATOR + self._folded_column(name)
+            else:
+                row_folded = pd.Series([""] * self.row_count, dtype=object)
+            self._row_folded = row_folded
+        return self._row_folded
+
+    def _similar_names(self, term):
+        """Mask of rows whose name (first column) is similar to the term."""
+        mask = np.zeros(self.row_count, dtype=bool)
+        if not self.columns:
+            return mask
+        if self._name_matcher is None:
+            matcher = NameMatcher()
+            for position, name in enumerate(self._text[self.columns[0]]):
+                matcher.add(name, position)
+            self._name_matcher = matcher
+        positions = [position for position, _ in self._name_matcher.match(term)]
+        mask[positions] = True
+        return mask
+
+    def _row_string(self, texts, position):
+        return ROW_SEPARATOR.join(texts[name].iat[position] for name in self.columns)
+
+    def update_row(self, position, dataframe):
+        """
+        Re-index one edited row of the DataFrame.
+
+        The arrays are copied and replaced rather than changed in place, so a
+        query already running on a worker thread sees consistent data.
+        """
+        for name, column in zip(self.columns, dataframe.columns):
+            value = dataframe[column].iat[position]
+            text = self._text[name].copy()
+            text.iat[position] = str(value) if pd.notna(value) else ""
+            lower = self._lower[name].copy()
+            lower.iat[position] = text.iat[position].lower()
+            self._text[name] = text
+            self._lower[name] = lower
+            if name in self._folded:
+                folded = self._folded[name].copy()
+                folded.iat[position] = normalize_name(text.iat[position])
+                self._folded[name] = folded
+
+        row_text = self._row_text.copy()
+        row_text.iat[position] = self._row_string(self._text, position)
+        row_lower = self._row_lower.copy()
+        row_lower.iat[position] = row_text.iat[position].lower()
+        self._row_text = row_text
+        self._row_lower = row_lower
+        if self._row_folded is not None:
+            row_folded = self._row_folded.copy()
+            row_folded.iat[position] = self._row_string(self._folded, position)
+            self._row_folded = row_folded
+        # Rebuilt on the next approximate query
+        self._name_matcher = None
+
+    def remove_row(self, position):
+        """Drop one row; later rows move up by one position."""
+        def drop(series):
+            return series.drop(series.index[position]).reset_index(drop=True)
+
+        self._text = {name: drop(text) for name, text in self._text.items()}
+        self._lower = {name: drop(lower) for name, lower in self._lower.items()}
+        self._folded = {name: drop(folded) for name, folded in self._folded.items()}
+        self._row_text = drop(self._row_text)
+        self._row_lower = drop(self._row_lower)
+        if self._row_folded is not None:
+            self._row_folded = drop(self._row_folded)
+        self._name_matcher = None
+        self.row_count -= 1
+
+    def all_rows(self):
+        """Return a mask selecting every row."""
+        return np.ones(self.row_count, dtype=bool)
+
+    def global_mask(self, term, case_sensitive=False, exact_match=False, approximate=False):
+        """
+        Match a term against every column.
+
+        Args:
+            term: Text to search for
+            case_sensitive: Compare without lower-casing
+            exact_match: Require a whole cell to equal the term
+            approximate: Ignore diacritics/case/spacing and match similar
+                names (case_sensitive is ignored)
+
+        Returns:
+            Boolean numpy array, True for rows where any cell matches
+        """
+        if not term:
+            return self.all_rows()
+
+        if exact_match:
+            mask = np.zeros(self.row_count, dtype=bool)
+            for name in self.columns:
+                mask |= self.column_mask(name, term, case_sensitive, True, approximate)
+            return mask
+
+        if approximate:
+            needle = normalize_name(term)
+            mask = self._folded_rows().str.contains(needle, regex=False).to_numpy(dtype=bool)
+            return mask | self._similar_names(term)
+
+        haystack = self._row_text if case_sensitive else self._row_lower
+        needle = term if case_sensitive else term.lower()
+        return haystack.str.contains(needle, regex=False).to_numpy(dtype=bool)
+
+    def column_mask(self, column, term, case_sensitive=False, exact_match=False, approximate=False):
+        """
+        Match a term against a single column.
+
+        Args:
+            column: Column name
+            term: Text to search for
+            case_sensitive: Compare without lower-casing
+            exact_match: Require the cell to equal the term
+            approximate: Ignore diacritics/case/spacing; in the name column
+                similar names match too (case_sensitive is ignored)
+
+        Returns:
+            Boolean numpy array, True for rows whose cell matches
+        """
+        if not term:
+            return self.all_rows()
+
+        if approximate:
+            values = self._folded_column(str(column))
+            needle = normalize_name(term)
+            if exact_match:
+                return (values == needle).to_numpy(dtype=bool)
+            mask = values.str.contains(needle, regex=False).to_numpy(dtype=bool)
+            if self.columns and str(column) == self.columns[0]:
+                mask = mask | self._similar_names(term)
+            return mask
+
+        values = self._text[str(column)] if case_sensitive else self._lower[str(column)]
+        needle = term if case_sensitive else term.lower()
+        if exact_match:
+            return (values == needle).to_numpy(dtype=bool)
+        return values.str.contains(needle, regex=False).to_numpy(dtype=bool)
+
+    def filter(self, global_term="", column=None, column_term="", case_sensitive=False,
+               exact_match=False, global_exact_match=None, approximate=False, is_cancelled=None):
+        """
+        Combine a global search and a single-column filter into one row mask.
+
+        Args:
+            global_term: Text searched in every column ("" to skip)
+            column: Column name for the column filter (None to skip)
+            column_term: Text for the column filter ("" to skip)
+            case_sensitive: Compare without lower-casing
+            exact_match: Require whole-cell equality in the column filter
+            global_exact_match: Same for the global search; defaults to exact_match
+            approximate: Diacritic-insensitive, fuzzy name matching
+            is_cancelled: Optional callable checked between steps; when it
+                returns True the query is abandoned
+
+        Returns:
+            Boolean numpy array, or None if the query was cancelled
+        """
+        if global_exact_match is None:
+            global_exact_match = exact_match
+
+        mask = self.global_mask(global_term, case_sensitive, global_exact_match, approximate)
+        if is_cancelled is not None and is_cancelled():
+            return None
+
+        if column is not None and column_term:
+            # Not in place: masks built by pandas can be read-only views
+            mask = mask & self.column_mask(column, column_term, case_sensitive, exact_match, approximate)
+            if is_cancelled is not None and is_cancelled():
+                return None
+
+        return mask
@@ -0,0 +1,262 @@
+"""
+The rows of one task workbook, independent of any UI.
+
+TaskDataset owns everything the detail views do with a task's data: loading
+(from the task's row store in SQLite, or by parsing the workbook), the search
+index, filtering, sorting, editing and writing edits back, and exporting. The
+Qt widgets only show it; scripts and benchmarks can use it directly without
+Qt.
+"""
+import numpy as np
+import pandas as pd
+
+from database import task_rows
+from database.db_manager import session_scope
+from utils.data_export import export_dataframe
+from utils.excel_cache import file_fingerprint, read_excel_cached
+from utils.excel_patch import apply_row_patches, assign_row_text
+from utils.search_index import SearchIndex
+
+
+def sort_positions(values, positions, ascending=True):
+    """
+    Order row positions by the values of one column.
+
+    The sort is stable and puts missing values last. Columns mixing types
+    (e.g. numbers and text) are compared as text.
+
+    Args:
+        values: Array of the column's values, indexed by row position
+        positions: Array of row positions to order
+        ascending: Sort direction
+
+    Returns:
+        The positions, reordered
+    """
+    if len(positions) == 0:
+        return positions
+
+    keys = pd.Series(values[positions])
+    try:
+        ordered = keys.sort_values(ascending=ascending, kind="mergesort", na_position="last")
+    except TypeError:
+        ordered = keys.astype(str).where(keys.notna()).sort_values(
+            ascending=ascending, kind="mergesort", na_position="last"
+        )
+    return positions[ordered.index.to_numpy()]
+
+
+def read_task_rows(file_path, task_id=None):
+    """
+    Read a task sheet, preferring the task's row store over parsing the file.
+
+    When the store does not mirror the workbook (first open, or the file
+    was changed outside the application) the workbook is parsed and the
+    store rebuilt from it.
+
+    Args:
+        file_path: The task workbook
+        task_id: Task whose row store to use (None to always parse the file)
+
+    Returns:
+        DataFrame of the sheet rows
+    """
+    if task_id is None:
+        return read_excel_cached(file_path)
+
+    content_hash = file_fingerprint(file_path)[3]
+    with session_scope() as session:
+        if task_rows.rows_current(session, task_id, content_hash):
+            df = task_rows.load_rows(session, task_id)
+            if df is not None:
+                return df
+
+    df = read_excel_cached(file_path)
+    try:
+        with session_scope() as session:
+            task_rows.store_rows(session, task_id, df, content_hash)
+    except Exception as e:
+        # The workbook was read; a later open simply tries again
+        print(f"Could not store rows of task {task_id}: {str(e)}")
+    return df
+
+
+def save_row_patches(file_path, task_id, patches, snapshot=None):
+    """
+    Write row edits into the workbook and, if it mirrors it, the task's row store.
+
+    Args:
+        file_path: The task workbook
+        task_id: Task whose row store to update (None for the workbook only)
+        patches: Edits as recorded by TaskDataset (see utils.excel_patch)
+        snapshot: Optional DataFrame equal to the sheet after the edits
+
+    Returns:
+        Number of patches applied
+    """
+    before_hash = file_fingerprint(file_path)[3] if task_id is not None else None
+    count = apply_row_patches(file_path, patches, snapshot)
+    if task_id is not None:
+        with session_scope() as session:
+            # A stale store is rebuilt from the workbook on the next open
+            if task_rows.rows_current(session, task_id, before_hash):
+                task_rows.apply_row_patches(session, task_id, patches, file_fingerprint(file_path)[3])
+    return count
+
+
+def is_filtering(query):
+    """Whether a filter query (as passed to TaskDataset.filter) selects anything less than all rows."""
+    return bool(query.get("global_term") or (query.get("column") is not None and query.get("column_term")))
+
+
+class TaskDataset:
+    """
+    Rows of a task workbook plus their search index and unsaved edits.
+
+    Edits change the DataFrame and the index row by row and are recorded as
+    patches (see utils.excel_patch); save() writes them in one pass, or a
+    caller such as ui.workbook_writer takes them with take_patches() to
+    write them elsewhere.
+    """
+
+    def __init__(self, file_path=None, task_id=None):
+        self.file_path = file_path
+        # Task whose row store backs the data (None: the workbook only)
+        self.task_id = task_id
+        self.df = None
+        self.search_index = None
+        self._patches = []
+
+    def load(self, file_path=None, task_id=None):
+        """
+        Read the rows (see read_task_rows) and index them.
+
+        Args:
+            file_path: Workbook to read; defaults to the current one
+            task_id: Task whose row store to use; defaults to the current one
+
+        Returns:
+            The loaded DataFrame
+        """
+        if file_path is not None:
+            self.file_path = file_path
+        if task_id is not None:
+            self.task_id = task_id
+        self.set_dataframe(read_task_rows(self.file_path, self.task_id))
+        return self.df
+
+    def set_dataframe(self, df):
+        """Use an already loaded DataFrame, discarding unsaved edits."""
+        self.df = df
+        self.search_index = SearchIndex(df) if df is not None else None
+        self._patches = []
+
+    def is_empty(self):
+        return self.df is None or self.df.empty
+
+    def row_count(self):
+        return 0 if self.df is None else len(self.df)
+
+    def columns(self):
+        return [] if self.df is None else list(self.df.columns)
+
+    def all_rows(self):
+        """Mask selecting every row."""
+        return np.ones(self.row_count(), dtype=bool)
+
+    def filter(self, **query):
+        """
+        Row mask of a filter query; see SearchIndex.filter for the arguments.
+
+        Returns None if the query was cancelled through is_cancelled.
+        """
+        if self.search_index is None:
+            return self.all_rows()
+        return self.search_index.filter(**query)
+
+    def positions(self, mask=None, sort_column=None, ascending=True):
+        """
+        Row positions selected by a mask, in display order.
+
+        Args:
+            mask: Boolean row mask (None for every row)
+            sort_column: Column index to sort by (None keeps file order)
+            ascending: Sort direction
+        """
+        positions = np.arange(self.row_count()) if mask is None else np.flatnonzero(mask)
+        if sort_column is None:
+            return positions
+        values = self.df.iloc[:, sort_column].to_numpy(dtype=object)
+        return sort_positions(values, positions, ascending)
+
+    def rows(self, positions):
+        """The given rows as a DataFrame slice with the original dtypes."""
+        if self.df is None:
+            return pd.DataFrame()
+        return self.df.iloc[positions]
+
+    def row_texts(self, position):
+        """(column, text) pairs of one row, as shown in an edit form."""
+        return [
+            (column, str(value) if pd.notna(value) else "")
+            for column, value in zip(self.df.columns, self.df.iloc[position].tolist())
+        ]
+
+    def update_row(self, position, texts):
+        """
+        Apply edited text to one row.
+
+        Args:
+            position: Row position
+            texts: {column_index: text}
+
+        Returns:
+            {column_index: value} of the cells that changed
+        """
+        changed = assign_row_text(self.df, position, texts)
+        if changed:
+            self.search_index.update_row(position, self.df)
+            self._patches.append(("update", position, changed))
+        return changed
+
+    def delete_row(self, position):
+        """Remove one row; later rows move up by one position."""
+        self.df = self.df.drop(self.df.index[position]).reset_index(drop=True)
+        self.search_index.remove_row(position)
+        self._patches.append(("delete", position, None))
+
+    def pending_count(self):
+        """Number of edits not yet written to the workbook."""
+        return len(self._patches)
+
+    def take_patches(self):
+        """
+        Hand over the unsaved edits, e.g. to write them on another thread.
+
+        Returns:
+            (patches, snapshot): the recorded patches in order and a copy of
+            the current DataFrame, which equals the sheet once they are applied
+        """
+        patches, self._patches = self._patches, []
+        return patches, self.df.copy() if patches else None
+
+    def save(self):
+        """Write the unsaved edits into the workbook and row store; returns how many there were."""
+        patches, snapshot = self.take_patches()
+        if not patches:
+            return 0
+        return save_row_patches(self.file_path, self.task_id, patches, snapshot)
+
+    def export(self, file_path, positions=None):
+        """
+        Write rows to an .xlsx, .csv or .parquet file.
+
+        Args:
+            file_path: Target file; the format follows its extension
+            positions: Row positions to export, in order (None for all rows)
+
+        Returns:
+            Number of rows written
+        """
+        rows = self.df if positions is None else self.rows(positions)
+        return export_dataframe(rows, file_path)